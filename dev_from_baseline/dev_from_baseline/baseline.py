@@ -52,8 +52,7 @@ class Baseline():
         for linter_name in db_manager.iter_linters_names():
             linter_counter = Counter()
             result_files = {}
-            for file_name in db_manager.iter_files_names(linter_name):
-                file_counter = db_manager.get_issues_counter_per_file(linter_name, file_name)
+            for file_name, file_counter in db_manager.iter_files_counters(linter_name):
                 result_files[file_name] = file_counter.asdict()
                 linter_counter.add_counters([file_counter])
             result[linter_name] = {
@@ -3,13 +3,18 @@ Module: dev_from_baseline.database_manager
 
 This module defines the DatabaseManager class, which handles querying issues
 from a database and generating counters.
+
+The queries run on the normalized tables of SqliteDatabase: the linter and the
+file are looked up once by name, then the issue_rows are filtered and grouped
+by their integer ids from the index of (linter_id, file_id, severity).
 """
 
+from itertools import groupby
 from logging import getLogger
 from typing import Generator
 from typing_extensions import NamedTuple
 
-from you_shall_not_parse.observers.database_observer import Database
+from you_shall_not_parse.observers.sqlite_observer import SqliteDatabase
 from dev_from_baseline.counter import Counter, Severity
 
 class IssuesType(NamedTuple):
@@ -18,6 +23,8 @@ class IssuesType(NamedTuple):
 
 ListOfIssues = list['IssuesType']
 
+_LINTER_ID = "(SELECT id FROM linters WHERE name = :linter_name)"
+
 logger = getLogger("dev-from-baseline")
 
 class DatabaseManager():
@@ -25,10 +32,10 @@ class DatabaseManager():
     A class to manage querying issues from a database and generating counters.
 
     Attributes:
-        database (Database): The database instance to query.
+        database (SqliteDatabase): The database instance to query.
     """
 
-    def __init__(self, database: Database) -> None:
+    def __init__(self, database: SqliteDatabase) -> None:
         self.database = database
 
     def get_issues_counter_per_file(self, linter_name: str, file_name: str) -> Counter:
@@ -37,15 +44,17 @@ class DatabaseManager():
 
         Args:
             linter_name (str): The name of the linter.
-            file_name (str): The name of the file.
+            file_name (str): The name of the file, None for the issues without a file.
 
         Returns:
             Counter: The counter for issues per file.
         """
         issues: ListOfIssues = self.database.query(
-            'SELECT\n    severity,\n    COUNT(*) AS amount\n' +
-            'FROM issues\n' +
-            'WHERE linter_name = :linter_name AND file_path = :file_name GROUP BY severity',
+            'SELECT\n    severities.name AS severity,\n    COUNT(*) AS amount\n' +
+            'FROM issue_rows JOIN severities ON severities.id = issue_rows.severity\n' +
+            f'WHERE linter_id = {_LINTER_ID}\n' +
+            '    AND file_id IS (SELECT id FROM files WHERE name = :file_name)\n' +
+            'GROUP BY issue_rows.severity',
             {'linter_name': linter_name, 'file_name': file_name}
         )
         file_counter: Counter = Counter()
@@ -63,7 +72,11 @@ class DatabaseManager():
             list[dict]: A list of dictionaries containing details about the issues (file, severity, message).
         """
         issues_details = self.database.query(
-            'SELECT file_path, severity, message, location FROM issues WHERE linter_name = :linter_name',
+            'SELECT files.name AS file_path, severities.name AS severity, message, location\n' +
+            'FROM issue_rows\n' +
+            'LEFT JOIN files ON files.id = issue_rows.file_id\n' +
+            'LEFT JOIN severities ON severities.id = issue_rows.severity\n' +
+            f'WHERE linter_id = {_LINTER_ID} ORDER BY issue_rows.id',
             {'linter_name': linter_name}
         )
         details = [
@@ -89,15 +102,43 @@ class DatabaseManager():
             Counter: The counter for issues per linter.
         """
         issues: ListOfIssues = self.database.query(
-            'SELECT\n    severity,\n    COUNT(*) AS amount\n' +
-            'FROM issues\n' +
-            'WHERE linter_name = :linter_name GROUP BY severity',
+            'SELECT\n    severities.name AS severity,\n    COUNT(*) AS amount\n' +
+            'FROM issue_rows JOIN severities ON severities.id = issue_rows.severity\n' +
+            f'WHERE linter_id = {_LINTER_ID} GROUP BY issue_rows.severity',
             {'linter_name': linter_name}
         )
         linter_counter: Counter = Counter()
         self._add_findings_to_counter(linter_counter, issues)
         return linter_counter
 
+    def iter_files_counters(self, linter_name: str) -> Generator[tuple[str, Counter], None, None]:
+        """
+        Iterate over the files of a linter with the counter of each one, from a
+        single query grouping the issues by file and severity.
+
+        Args:
+            linter_name (str): The name of the linter.
+
+        Yields:
+            tuple[str, Counter]: A file name and its counter, like iter_files_names and
+            get_issues_counter_per_file. The issues without a file are counted under None.
+        """
+        issues = self.database.query(
+            'SELECT files.name AS file_path, severities.name AS severity, counts.amount\n' +
+            'FROM (\n' +
+            '    SELECT file_id, severity, COUNT(*) AS amount FROM issue_rows\n' +
+            f'    WHERE linter_id = {_LINTER_ID} GROUP BY file_id, severity\n' +
+            ') AS counts\n' +
+            'LEFT JOIN files ON files.id = counts.file_id\n' +
+            'JOIN severities ON severities.id = counts.severity\n' +
+            'ORDER BY counts.file_id',
+            {'linter_name': linter_name}
+        )
+        for file_name, file_issues in groupby(issues, key=lambda issue: issue.file_path):
+            file_counter: Counter = Counter()
+            self._add_findings_to_counter(file_counter, list(file_issues))
+            yield file_name, file_counter
+
     def _add_findings_to_counter(self, count: Counter, findings: ListOfIssues) -> None:
         for issue in findings:
             try:
@@ -113,7 +154,10 @@ class DatabaseManager():
         Yields:
             str: A linter name.
         """
-        linters: list[str] = self.database.query("SELECT DISTINCT linter_name FROM issues")
+        linters: list[str] = self.database.query(
+            "SELECT name FROM linters\n" +
+            "WHERE EXISTS (SELECT 1 FROM issue_rows WHERE linter_id = linters.id) ORDER BY id"
+        )
         for linter in linters:
             yield linter[0]
 
@@ -128,7 +172,9 @@ class DatabaseManager():
             str: A file name.
         """
         files: list[str] = self.database.query(
-            "SELECT DISTINCT file_path FROM issues WHERE linter_name = :linter_name",
+            "SELECT files.name FROM (\n" +
+            f"    SELECT DISTINCT file_id FROM issue_rows WHERE linter_id = {_LINTER_ID}\n" +
+            ") AS ids LEFT JOIN files ON files.id = ids.file_id ORDER BY ids.file_id",
             {'linter_name': linter_name}
         )
         for file in files:
@@ -40,8 +40,7 @@ class LinterComparison():
         """
         Compare issues within a linter and update the comparison result.
         """
-        for file_name in self.db_manager.iter_files_names(self.comparison_params.linter_name):
-            file_counter = self.db_manager.get_issues_counter_per_file(self.comparison_params.linter_name, file_name)
+        for file_name, file_counter in self.db_manager.iter_files_counters(self.comparison_params.linter_name):
             if file_name in self.comparison_params.old_files:
                 self.comparison_params.old_files.remove(file_name)
                 self.compare_tracked_files(file_counter, file_name)
@@ -3,25 +3,57 @@
 import argparse
 import sys
 import logging
+from typing import Optional
 from rich.console import Console
 
 from you_shall_not_parse.parser import Parser
-from you_shall_not_parse.observers.database_observer import DBObserver
+from you_shall_not_parse.parse_cache import ParseCache
+from you_shall_not_parse.parse_stats import ParseStats
+from you_shall_not_parse.document import FAST_VALIDATION, STRICT_VALIDATION
+from you_shall_not_parse.observers.sqlite_observer import SqliteObserver
 from dev_from_baseline.database_manager import DatabaseManager
 from dev_from_baseline.baseline import Baseline
 from dev_from_baseline.comparison_result import ComparisonResult, ResultCode
 from dev_from_baseline.common import ERROR_CODE
-from dev_from_baseline.result_table import ResultTable, ResultTableIssues
+from dev_from_baseline.result_table import ResultTable, ResultTableIssues, ParseStatsTable
 
 args_parser = argparse.ArgumentParser()
 console = Console()
 logging.basicConfig()
 logger = logging.getLogger("dev-from-baseline")
 
-def generate_baseline(basefile: str, reports: list[str]) -> None:
+def _jobs(value: str) -> int:
+    """--jobs: a number of processes, 0 for every CPU."""
+    jobs = int(value)
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 (every CPU) or more, not {jobs}")
+    return jobs
+
+
+def _get_parser(strict: bool, cache_dir: Optional[str] = None,
+                parse_stats: bool = False, pipelined: bool = False) -> Parser:
+    cache = ParseCache(cache_dir) if cache_dir else None
+    stats = ParseStats() if parse_stats else None
+    return Parser(STRICT_VALIDATION if strict else FAST_VALIDATION, cache, stats, pipelined)
+
+
+def _parse_reports(reports: list[str], jobs: int, strict: bool, cache_dir: Optional[str],
+                   parse_stats: bool, pipelined: bool) -> SqliteObserver:
+    # pylint:disable=too-many-arguments,too-many-positional-arguments
+    observer = SqliteObserver()
+    parser = _get_parser(strict, cache_dir, parse_stats, pipelined)
+    parser.parse_from_filenames(reports, observer, jobs=jobs)
+    if parser.stats is not None:
+        ParseStatsTable(console).print_stats(parser.stats)
+    return observer
+
+
+def generate_baseline(basefile: str, reports: list[str], jobs: int = 1,
+                      strict: bool = False, cache_dir: Optional[str] = None,
+                      parse_stats: bool = False, pipelined: bool = False) -> None:
     """it creates a basefile file with the results in --report_file."""
-    observer = DBObserver()
-    Parser().parse_from_filenames(reports, observer)
+    # pylint:disable=too-many-arguments,too-many-positional-arguments
+    observer = _parse_reports(reports, jobs, strict, cache_dir, parse_stats, pipelined)
     db_manager = DatabaseManager(observer.get_database())
     baseline = Baseline(basefile)
     baseline.generate_baseline_from_db(db_manager)
@@ -29,13 +61,18 @@ def generate_baseline(basefile: str, reports: list[str]) -> None:
 
 
 def compare(basefile: str,
-            report_files: list[str]) -> tuple[ComparisonResult, dict]:
+            report_files: list[str],
+            jobs: int = 1,
+            strict: bool = False,
+            cache_dir: Optional[str] = None,
+            parse_stats: bool = False,
+            pipelined: bool = False) -> tuple[ComparisonResult, dict]:
     """
     It will compare the results already stored in --basefile with the new
     report --report_file
     """
-    observer = DBObserver()
-    Parser().parse_from_filenames(report_files, observer)
+    # pylint:disable=too-many-arguments,too-many-positional-arguments
+    observer = _parse_reports(report_files, jobs, strict, cache_dir, parse_stats, pipelined)
     old_baseline = Baseline(basefile)
     old_baseline.read_baseline()
     db_manager = DatabaseManager(observer.get_database())
@@ -102,7 +139,10 @@ def process_issue_details(issue, worsened_severities, issues_data):
 
 def handle_comparison_result(
         result: ComparisonResult, basefile: str, report_file: list[str],
-        worsened_severities: dict, details: bool = False) -> None:
+        worsened_severities: dict, details: bool = False, jobs: int = 1,
+        strict: bool = False, cache_dir: Optional[str] = None,
+        pipelined: bool = False) -> None:
+    # pylint:disable=too-many-arguments,too-many-positional-arguments
     status_code = result.status_code
 
     if status_code == ResultCode.SAME:
@@ -117,12 +157,12 @@ def handle_comparison_result(
             display_worsened_issues(result, worsened_severities)
         else:
             logger.info("Use the --details flag to see the details of the issues")
-        generate_baseline(basefile, report_file)
+        generate_baseline(basefile, report_file, jobs, strict, cache_dir, pipelined=pipelined)
 
     else:
         logger.info("Code quality has improved: Fewer issues detected compared to the baseline."
                     "A new baseline has been generated. Consider updating the baseline to reflect the improvements.")
-        generate_baseline(basefile, report_file)
+        generate_baseline(basefile, report_file, jobs, strict, cache_dir, pipelined=pipelined)
 
     sys.exit(status_code.value)
 
@@ -130,15 +170,23 @@ def main(basefile: str,
          report_file: list[str],
          generate: bool = False,
          verbose: bool = False,
-         details: bool = False) -> None:
-
+         details: bool = False,
+         jobs: int = 1,
+         strict: bool = False,
+         cache_dir: Optional[str] = None,
+         parse_stats: bool = False,
+         pipelined: bool = False) -> None:
+    # pylint:disable=too-many-arguments,too-many-positional-arguments
     if verbose:
         logger.setLevel(logging.DEBUG)
     if generate:
-        generate_baseline(basefile, report_file)
+        generate_baseline(basefile, report_file, jobs, strict, cache_dir, parse_stats, pipelined)
     else:
-        result, worsened_severities = compare(basefile, report_file)
-        handle_comparison_result(result, basefile, report_file, worsened_severities, details)
+        result, worsened_severities = compare(basefile, report_file, jobs, strict, cache_dir,
+                                              parse_stats, pipelined)
+        handle_comparison_result(
+            result, basefile, report_file, worsened_severities, details, jobs, strict, cache_dir,
+            pipelined)
 
 def main_cli() -> None:
     args_parser.add_argument("-b",
@@ -165,6 +213,32 @@ def main_cli() -> None:
                              action='store_true',
                              default=False,
                              help="Details")
+    args_parser.add_argument("-j",
+                             "--jobs",
+                             type=_jobs,
+                             default=1,
+                             help="Number of processes parsing the reports, 0 uses every CPU")
+    args_parser.add_argument("-s",
+                             "--strict",
+                             action='store_true',
+                             default=False,
+                             help="Validate the reports against the whole schema of their format")
+    args_parser.add_argument("-c",
+                             "--cache-dir",
+                             default=None,
+                             help="Directory where the issues of parsed reports are kept, "
+                                  "unchanged reports aren't parsed again")
+    args_parser.add_argument("--parse-stats",
+                             action='store_true',
+                             default=False,
+                             help="Show where the time parsing the reports goes, "
+                                  "per handler and for the slowest reports")
+    args_parser.add_argument("--pipeline",
+                             action='store_true',
+                             default=False,
+                             help="Read the next reports while parsing the current one, "
+                                  "it helps when the reports are on a slow filesystem")
 
     args = args_parser.parse_args()
-    main(args.basefile, args.report_file, args.generate, args.verbose, args.details)
+    main(args.basefile, args.report_file, args.generate, args.verbose, args.details, args.jobs,
+         args.strict, args.cache_dir, args.parse_stats, args.pipeline)
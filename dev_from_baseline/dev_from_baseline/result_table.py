@@ -9,6 +9,7 @@ from rich.console import Console
 from rich.table import Table
 from rich.text import Text
 from rich.box import ROUNDED
+from you_shall_not_parse.parse_stats import ParseStats
 from dev_from_baseline.counter import Counter, Severity
 from dev_from_baseline.common import FileComparison
 from dev_from_baseline.results_printer import ResultsPrinter
@@ -111,3 +112,42 @@ class ResultTableIssues:
             detail['message'],
             detail['location']
         )
+
+class ParseStatsTable:
+    """Where the parse of the reports spent its time, for --parse-stats."""
+    SLOWEST_REPORTS = 10
+
+    def __init__(self, console: Console = Console()) -> None:
+        self.console = console
+
+    def print_stats(self, stats: ParseStats) -> None:
+        self.console.print(self.handlers_table(stats))
+        self.console.print(self.reports_table(stats))
+
+    def handlers_table(self, stats: ParseStats) -> Table:
+        table = Table(title="Parse time per handler", box=ROUNDED)
+        table.add_column("Handler", style="cyan")
+        table.add_column("Tried", justify="right")
+        table.add_column("Accepted", justify="right")
+        table.add_column("Validation (s)", justify="right")
+        table.add_column("Extraction (s)", justify="right")
+        table.add_column("Issues", justify="right")
+        for name, totals in stats.handlers().items():
+            table.add_row(name, str(totals.tried), str(totals.accepted),
+                          f"{totals.validation:.3f}", f"{totals.extraction:.3f}",
+                          str(totals.issues))
+        return table
+
+    def reports_table(self, stats: ParseStats) -> Table:
+        table = Table(title="Slowest reports", box=ROUNDED)
+        table.add_column("Report", style="cyan", overflow="fold")
+        table.add_column("Bytes", justify="right")
+        table.add_column("Time (s)", justify="right")
+        table.add_column("Handler")
+        table.add_column("Rejected by", overflow="fold")
+        table.add_column("Issues", justify="right")
+        for report in stats.slowest(self.SLOWEST_REPORTS):
+            handler = "cache" if report.cached else report.handler or "none"
+            table.add_row(report.filename, str(report.size), f"{report.seconds:.3f}",
+                          handler, ", ".join(report.rejected), str(report.issues))
+        return table
@@ -1,5 +1,7 @@
 from unittest.mock import patch
+import argparse
 import os
+import sys
 import pytest
 
 from rich.console import Console
@@ -14,6 +16,7 @@ import json
 import dev_from_baseline.main as main
 from dev_from_baseline.result_table import ResultTable
 from dev_from_baseline.comparison_result import ComparisonResult
+from dev_from_baseline.database_manager import DatabaseManager
 
 test_console = Console(record=True)
 
@@ -247,3 +250,76 @@ def test_none_baseline_logs_error(mock_logger) -> None:
 
     # Should exit with error code
     assert excinfo.value.code != 0
+
+
+def test_parse_stats_are_shown(tmp_path) -> None:
+    main.console = Console(record=True, width=200)
+    main.main(
+        basefile="tests/testing.json",
+        report_file=[npm.FILENAME_V1, trivy.FILENAME_V1],
+        generate=True,
+        verbose=False,
+        cache_dir=str(tmp_path),
+        parse_stats=True
+    )
+    output = main.console.export_text()
+    assert "Parse time per handler" in output
+    assert "NpmHandler" in output and "SarifHandler" in output
+    assert trivy.FILENAME_V1 in output
+    created = open("tests/testing.json", 'r', encoding='utf-8')
+    expected = open("test_files/basefile.json", 'r', encoding='utf-8')
+    assert created.read() == expected.read()
+
+
+def test_pipelined_basefile_generation() -> None:
+    main.main(
+        basefile="tests/testing.json",
+        report_file=[npm.FILENAME_V1, trivy.FILENAME_V1],
+        generate=True,
+        verbose=False,
+        pipelined=True
+    )
+    created = open("tests/testing.json", 'r', encoding='utf-8')
+    expected = open("test_files/basefile.json", 'r', encoding='utf-8')
+    assert created.read() == expected.read()
+
+
+def test_files_counters_match_the_counters_per_file() -> None:
+    observer = main._parse_reports([npm.FILENAME_V1, trivy.FILENAME_V1, golangci.FILENAME_V1],
+                                   1, False, None, False, False)
+    db_manager = DatabaseManager(observer.get_database())
+    for linter_name in db_manager.iter_linters_names():
+        counters = list(db_manager.iter_files_counters(linter_name))
+        assert [file_name for file_name, _ in counters] == list(
+            db_manager.iter_files_names(linter_name))
+        for file_name, counter in counters:
+            assert counter.counter == db_manager.get_issues_counter_per_file(
+                linter_name, file_name).counter
+
+
+def test_issues_without_file_are_counted() -> None:
+    from you_shall_not_parse.base_classes import Severity as IssueSeverity
+    from you_shall_not_parse.observers.sqlite_observer import SqliteDatabase
+    database = SqliteDatabase()
+    database.add_issues("linter", [(IssueSeverity.HIGH, "a.py", "R1", "in a file", 1),
+                                   (IssueSeverity.HIGH, None, "R1", "without file", None),
+                                   (IssueSeverity.LOW, None, "R2", "without file", None)])
+    db_manager = DatabaseManager(database)
+    counters = dict(db_manager.iter_files_counters("linter"))
+    assert list(counters) == list(db_manager.iter_files_names("linter")) == [None, "a.py"]
+    assert counters[None].total() == 2
+    for file_name, counter in counters.items():
+        assert counter.counter == db_manager.get_issues_counter_per_file(
+            "linter", file_name).counter
+    assert sum(counter.total() for counter in counters.values()) == (
+        db_manager.get_issues_counter_per_linter("linter").total())
+
+
+def test_negative_jobs_are_rejected(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(main, "args_parser", argparse.ArgumentParser())
+    monkeypatch.setattr(sys, "argv", ["dev-from-baseline", "-b", "tests/testing.json",
+                                      "-r", npm.FILENAME_V1, "-g", "-j", "-2"])
+    with pytest.raises(SystemExit):
+        main.main_cli()
+    assert "must be 0 (every CPU) or more, not -2" in capsys.readouterr().err
+    assert not os.path.exists("tests/testing.json")
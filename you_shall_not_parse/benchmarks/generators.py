@@ -0,0 +1,218 @@
+"""
+Deterministic generators of large reports.
+
+Each generator writes a report of one format with exactly the requested number
+of issues, the same bytes for the same size and seed, so the timings of two
+commits are measured on the same reports.
+"""
+from __future__ import annotations
+from random import Random
+from typing import Callable, TextIO
+import json
+
+# Formats, each with the linter name its handler gives the issues
+SARIF = "sarif"
+PYLINT = "pylint"
+GOLANGCI = "golangci"
+NPM = "npm"
+PIP_AUDIT = "pip-audit"
+LIZARD = "lizard"
+MYPY = "mypy"
+
+Generator = Callable[[TextIO, int, Random], None]
+
+_WORDS = ("value", "handler", "report", "result", "index", "buffer", "stream", "issue",
+          "parser", "schema", "token", "config", "request", "session", "cache", "option")
+_SARIF_LEVELS = ("error", "warning", "note")
+_SARIF_RULES = 50
+# Steps of the thread flow of each result, the part of a SARIF report no issue reads
+_CODE_FLOW_STEPS = 6
+
+
+def _words(rng: Random, count: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(count))
+
+
+def _path(rng: Random, extension: str) -> str:
+    return f"src/{rng.choice(_WORDS)}/{rng.choice(_WORDS)}_{rng.randrange(200)}{extension}"
+
+
+def _write_items(stream: TextIO, items: Callable[[int], object], count: int) -> None:
+    """The items as the elements of a JSON array, written one by one."""
+    stream.write("[")
+    for index in range(count):
+        if index:
+            stream.write(",")
+        stream.write(json.dumps(items(index)))
+    stream.write("]")
+
+
+def write_sarif(stream: TextIO, issues: int, rng: Random) -> None:
+    rules = [
+        {
+            "id": f"rule-{index}",
+            "name": f"Rule{index}",
+            "shortDescription": {"text": _words(rng, 4)},
+            "fullDescription": {"text": _words(rng, 12)},
+            "defaultConfiguration": {"level": rng.choice(_SARIF_LEVELS)},
+        }
+        for index in range(_SARIF_RULES)
+    ]
+
+    def location(path: str, line: int) -> dict[str, object]:
+        return {"physicalLocation": {"artifactLocation": {"uri": path},
+                                     "region": {"startLine": line, "startColumn": 1}}}
+
+    def result(_index: int) -> object:
+        rule = rng.randrange(_SARIF_RULES)
+        path = _path(rng, ".py")
+        steps = [
+            {"location": dict(location(path, rng.randrange(1, 2000)),
+                              message={"text": _words(rng, 5)})}
+            for _ in range(_CODE_FLOW_STEPS)
+        ]
+        return {
+            "ruleId": f"rule-{rule}",
+            "ruleIndex": rule,
+            "level": rng.choice(_SARIF_LEVELS),
+            "message": {"text": _words(rng, 10)},
+            "locations": [location(path, rng.randrange(1, 2000))],
+            "codeFlows": [{"threadFlows": [{"locations": steps}]}],
+        }
+
+    stream.write('{"version": "2.1.0", "$schema": '
+                 '"https://json.schemastore.org/sarif-2.1.0.json", "runs": [{"tool": ')
+    stream.write(json.dumps({"driver": {"name": "benchmark", "rules": rules}}))
+    stream.write(', "results": ')
+    _write_items(stream, result, issues)
+    stream.write("}]}")
+
+
+def write_pylint(stream: TextIO, issues: int, rng: Random) -> None:
+    def message(_index: int) -> object:
+        path = _path(rng, ".py")
+        line = rng.randrange(1, 2000)
+        return {
+            "type": rng.choice(("error", "warning", "refactor", "convention")),
+            "module": path[:-3].replace("/", "."),
+            "obj": rng.choice(_WORDS),
+            "line": line,
+            "column": rng.randrange(80),
+            "endLine": line,
+            "endColumn": rng.randrange(80, 120),
+            "path": path,
+            "symbol": f"{rng.choice(_WORDS)}-{rng.choice(_WORDS)}",
+            "message": _words(rng, 8),
+            "message-id": f"C{rng.randrange(100, 1000)}",
+        }
+    _write_items(stream, message, issues)
+
+
+def write_golangci(stream: TextIO, issues: int, rng: Random) -> None:
+    def issue(_index: int) -> object:
+        line = rng.randrange(1, 2000)
+        return {
+            "FromLinter": rng.choice(("revive", "errcheck", "govet", "staticcheck")),
+            "Text": _words(rng, 9),
+            "Severity": rng.choice(("error", "warning", "")),
+            "SourceLines": [_words(rng, 6)],
+            "Replacement": None,
+            "LineRange": {"From": line, "To": line},
+            "Pos": {"Filename": _path(rng, ".go"), "Offset": rng.randrange(100000),
+                    "Line": line, "Column": rng.randrange(1, 80)},
+            "ExpectNoLint": False,
+            "ExpectedNoLintLinter": "",
+        }
+    stream.write('{"Issues": ')
+    _write_items(stream, issue, issues)
+    stream.write(', "Report": {"Linters": [{"Name": "revive"}]}}')
+
+
+def write_npm(stream: TextIO, issues: int, rng: Random) -> None:
+    # One advisory per vulnerable package, so each package gives one issue
+    stream.write('{"auditReportVersion": 2, "vulnerabilities": {')
+    for index in range(issues):
+        name = f"{rng.choice(_WORDS)}-{index}"
+        severity = rng.choice(("low", "moderate", "high", "critical"))
+        package = {
+            "name": name, "severity": severity, "isDirect": False,
+            "via": [{"source": 1000000 + index, "name": name, "dependency": name,
+                     "title": _words(rng, 6), "url": f"https://example.com/{index}",
+                     "severity": severity, "cwe": ["CWE-20"], "range": "<1.2.3"}],
+            "effects": [], "range": "1.0.0 - 1.2.2", "nodes": [f"node_modules/{name}"],
+            "fixAvailable": True,
+        }
+        stream.write(("," if index else "") + json.dumps(name) + ": " + json.dumps(package))
+    counts = {"info": 0, "low": 0, "moderate": 0, "high": 0, "critical": 0, "total": issues}
+    dependencies = {"prod": issues, "dev": 0, "optional": 0, "peer": 0, "peerOptional": 0,
+                    "total": issues}
+    stream.write('}, "metadata": ')
+    stream.write(json.dumps({"vulnerabilities": counts, "dependencies": dependencies}))
+    stream.write("}")
+
+
+def write_pip_audit(stream: TextIO, issues: int, rng: Random) -> None:
+    def dependency(index: int) -> object:
+        return {
+            "name": f"{rng.choice(_WORDS)}-{index}",
+            "version": f"1.{rng.randrange(20)}.{rng.randrange(20)}",
+            "vulns": [{"id": f"GHSA-{index:04x}-{rng.randrange(16 ** 4):04x}",
+                       "fix_versions": ["2.0.0"], "description": _words(rng, 20)}],
+        }
+    stream.write('{"dependencies": ')
+    _write_items(stream, dependency, issues)
+    stream.write(', "fixes": []}')
+
+
+def write_lizard(stream: TextIO, issues: int, rng: Random) -> None:
+    # Every function is over the default complexity threshold of 5
+    for _ in range(issues):
+        path = _path(rng, ".c")
+        function = f"{rng.choice(_WORDS)}_{rng.randrange(10000)}"
+        start = rng.randrange(1, 2000)
+        nloc = rng.randrange(5, 200)
+        ccn = rng.randrange(5, 40)
+        stream.write(f'{nloc},{ccn},{nloc * 7},{rng.randrange(6)},{nloc + 5},'
+                     f'"{function}@{start}-{start + nloc}@{path}","{path}","{function}",'
+                     f'"{function}( x )",{start},{start + nloc}\n')
+
+
+def write_mypy(stream: TextIO, issues: int, rng: Random) -> None:
+    # The issues spread over test cases of at most 100 messages, like one per module
+    stream.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n'
+                 f'<testsuite errors="0" failures="{issues}" name="mypy" skips="0" '
+                 f'tests="{issues}" time="1.0">\n')
+    written = 0
+    while written < issues:
+        messages = min(100, issues - written)
+        path = _path(rng, ".py")
+        stream.write(f'<testcase classname="mypy" file="{path}" line="1" name="{path}" '
+                     'time="0.0">\n<failure message="mypy produced messages">')
+        stream.write("\n".join(
+            f"{path}:{rng.randrange(1, 2000)}: error: {_words(rng, 8)}  [misc]"
+            for _ in range(messages)))
+        stream.write("</failure>\n</testcase>\n")
+        written += messages
+    stream.write("</testsuite>\n</testsuites>\n")
+
+
+GENERATORS: dict[str, tuple[Generator, str]] = {
+    SARIF: (write_sarif, ".sarif"),
+    PYLINT: (write_pylint, ".json"),
+    GOLANGCI: (write_golangci, ".json"),
+    NPM: (write_npm, ".json"),
+    PIP_AUDIT: (write_pip_audit, ".json"),
+    LIZARD: (write_lizard, ".csv"),
+    MYPY: (write_mypy, ".xml"),
+}
+
+
+def generate(report_format: str, issues: int, directory: str, seed: int = 0) -> str:
+    """Write a report of the format with that many issues in the directory, return its path."""
+    write, extension = GENERATORS[report_format]
+    path = f"{directory}/{report_format}-{issues}{extension}"
+    # Not used for security, only to make varied but reproducible reports
+    rng = Random(f"{report_format}:{seed}") # nosec
+    with open(path, "w", encoding="utf-8") as stream:
+        write(stream, issues, rng)
+    return path
@@ -0,0 +1,210 @@
+"""
+Parser benchmarks.
+
+    python -m benchmarks.run --issues 10000 100000 --output results.json
+    python -m benchmarks.run --issues 10000 100000 --compare results.json
+
+Every report format is generated at each size (see generators.py) and parsed
+into each observer. Each case runs in a fresh process, so its peak memory is
+its own: the handlers and schemas are loaded first, then the time and the
+growth of the peak resident memory of the parse are measured. A second parse
+with ParseStats gives the handler and its validation and extraction time.
+
+The results are saved as JSON, with the commit they were measured on, and
+--compare prints the ratio of each case to the results of another commit.
+"""
+from __future__ import annotations
+from time import perf_counter
+from typing import Any, Callable, Iterable, Optional
+import argparse
+import json
+import os
+import platform
+import subprocess # nosec
+import sys
+import tempfile
+
+from you_shall_not_parse.base_classes import IssueTupleType
+from you_shall_not_parse.handler_classes import warm_schema_cache
+from you_shall_not_parse.observer import Observer
+from you_shall_not_parse.observers.batch_observer import BatchObserver
+from you_shall_not_parse.observers.database_observer import DBObserver
+from you_shall_not_parse.observers.sarif_observer import SarifObserver
+from you_shall_not_parse.observers.sqlite_observer import SqliteObserver
+from you_shall_not_parse.parse_stats import ParseStats
+from you_shall_not_parse.parser import Parser
+from benchmarks.generators import GENERATORS, generate
+
+RESULTS_FORMAT = 1
+DEFAULT_ISSUES = (10000,)
+# A case this much slower than in the compared results is a regression
+DEFAULT_MAX_SLOWDOWN = 1.2
+
+Case = dict[str, Any]
+
+
+class CountingObserver(Observer):
+    """Drops the issues, so only the parse itself is measured."""
+    def __init__(self) -> None:
+        self.issues = 0
+
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        self.issues += 1
+
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        for _ in issues:
+            self.issues += 1
+
+
+OBSERVERS: dict[str, Callable[[], Observer]] = {
+    "count": CountingObserver,
+    "batch": BatchObserver,
+    "database": DBObserver,
+    "sqlite": SqliteObserver,
+    "sarif": SarifObserver,
+}
+
+
+def _peak_memory() -> int:
+    """The peak resident memory of this process, in bytes."""
+    # Only the processes of a case need it, and resource isn't on Windows
+    # pylint:disable=import-outside-toplevel
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux counts kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(path: str, observer_name: str, validation: str) -> Case:
+    """Parse the report into a new observer, in this process."""
+    Parser().handlers # pylint:disable=expression-not-assigned
+    warm_schema_cache()
+    observer = OBSERVERS[observer_name]()
+    memory_before = _peak_memory()
+    start = perf_counter()
+    Parser(validation).parse_from_filenames([path], observer)
+    seconds = perf_counter() - start
+    memory = _peak_memory() - memory_before
+    stats = ParseStats()
+    Parser(validation, stats=stats).parse_from_filenames([path], CountingObserver())
+    report = stats.reports[0]
+    handler = stats.handlers().get(report.handler or "")
+    return {
+        "seconds": seconds,
+        "peak_memory": memory,
+        "issues": report.issues,
+        "issues_per_second": report.issues / seconds if seconds else 0.0,
+        "bytes": report.size,
+        "handler": report.handler,
+        "validation_seconds": handler.validation if handler else 0.0,
+        "extraction_seconds": handler.extraction if handler else 0.0,
+    }
+
+
+def _run_case_process(path: str, observer_name: str, validation: str) -> Case:
+    command = [sys.executable, "-m", "benchmarks.run", "--case", path, observer_name,
+               "--validation", validation]
+    output = subprocess.run(command, check=True, capture_output=True, text=True, # nosec
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    case: Case = json.loads(output.stdout)
+    return case
+
+
+def run_benchmarks(formats: list[str], observers: list[str], sizes: list[int],
+                   validation: str = "fast", repeat: int = 1) -> list[Case]:
+    """Every case, the fastest of its runs."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            for report_format in formats:
+                path = generate(report_format, size, directory)
+                for observer_name in observers:
+                    runs = [_run_case_process(path, observer_name, validation)
+                            for _ in range(repeat)]
+                    case = min(runs, key=lambda run: float(run["seconds"]))
+                    results.append({"format": report_format, "observer": observer_name,
+                                    "size": size, "validation": validation, **case})
+                    print(_describe(results[-1]), file=sys.stderr)
+    return results
+
+
+def _describe(case: Case) -> str:
+    return (f"{case['format']:>10} {case['observer']:>8} {case['size']:>9} issues: "
+            f"{case['seconds']:8.3f}s {case['peak_memory'] / 2 ** 20:8.1f} MiB "
+            f"{case['issues_per_second']:12.0f} issues/s ({case['handler']})")
+
+
+def _commit() -> Optional[str]:
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], check=True, # nosec
+                                capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def save_results(results: list[Case], filename: str) -> None:
+    document = {
+        "format": RESULTS_FORMAT,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+        file.write("\n")
+
+
+def compare_results(results: list[Case], filename: str, max_slowdown: float) -> bool:
+    """Print the ratio of each case to the same case in the file, False on a regression."""
+    with open(filename, encoding="utf-8") as file:
+        previous = json.load(file)
+    key = ("format", "observer", "size", "validation")
+    old_cases = {tuple(case[field] for field in key): case for case in previous["results"]}
+    passed = True
+    print(f"Compared with {previous.get('commit') or filename}")
+    for case in results:
+        old = old_cases.get(tuple(case[field] for field in key))
+        if old is None:
+            continue
+        ratio = case["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        memory = case["peak_memory"] / old["peak_memory"] if old["peak_memory"] else 1.0
+        regressed = ratio > max_slowdown
+        passed = passed and not regressed
+        print(f"{case['format']:>10} {case['observer']:>8} {case['size']:>9}: "
+              f"time x{ratio:.2f} memory x{memory:.2f}{'  REGRESSION' if regressed else ''}")
+    return passed
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the parsing of generated reports")
+    parser.add_argument("--formats", nargs="+", choices=sorted(GENERATORS),
+                        default=list(GENERATORS))
+    parser.add_argument("--observers", nargs="+", choices=sorted(OBSERVERS),
+                        default=["count", "database"])
+    parser.add_argument("--issues", nargs="+", type=int, default=list(DEFAULT_ISSUES),
+                        help="Sizes of the reports, in issues")
+    parser.add_argument("--validation", choices=("fast", "strict"), default="fast")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs of each case, the fastest is kept")
+    parser.add_argument("--output", help="Save the results in this JSON file")
+    parser.add_argument("--compare", help="Compare with the results saved in this JSON file")
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN)
+    parser.add_argument("--case", nargs=2, metavar=("REPORT", "OBSERVER"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(arguments)
+    if args.case:
+        print(json.dumps(run_case(args.case[0], args.case[1], args.validation)))
+        return 0
+    results = run_benchmarks(args.formats, args.observers, args.issues, args.validation,
+                             args.repeat)
+    if args.output:
+        save_results(results, args.output)
+    if args.compare and not compare_results(results, args.compare, args.max_slowdown):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
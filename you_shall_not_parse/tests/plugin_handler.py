@@ -0,0 +1,18 @@
+from you_shall_not_parse.handler_classes import ParserHandlerImplementation
+from you_shall_not_parse.document import Document
+from you_shall_not_parse.base_classes import Severity
+
+
+class FindingsHandler(ParserHandlerImplementation):
+    def accepts(self, document: Document) -> bool:
+        return isinstance(document.json, dict) and "findings" in document.json
+
+    def parse(self, document: Document) -> None:
+        for finding in document.json["findings"]:
+            self.observer.add_issue(
+                "findings",
+                (Severity.LOW, finding["file"], finding["id"], finding["text"], finding["line"])
+            )
+
+
+HANDLER = FindingsHandler
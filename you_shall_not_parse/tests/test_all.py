@@ -3,6 +3,7 @@ import pytest
 from you_shall_not_parse.parser import Parser
 from you_shall_not_parse.observers.database_observer import DBObserver
 from you_shall_not_parse.observers.sarif_observer import SarifObserver
+from you_shall_not_parse.observer import Observer
 import tests.sarif_params as sarif
 import tests.pipaudit_params as pipaudit
 import tests.golangci_params as golangci
@@ -112,3 +113,24 @@ def test_sarif_observer(parser) -> None:
     parser.parse_from_filenames(["examples/trivy.sarif"], observer)
     expected = json.loads(open("tests/trivy_expected.sarif", 'r', encoding='utf-8').read())
     assert expected == observer.get_sarif_json()
+
+
+class OneByOneDBObserver(DBObserver):
+    add_issues = Observer.add_issues
+
+
+# pylint:disable=redefined-outer-name
+def test_batched_inserts_match_single_inserts(parser) -> None:
+    batched = DBObserver()
+    parser.parse_from_filenames(ALL_EXAMPLES, batched)
+    one_by_one = OneByOneDBObserver()
+    parser.parse_from_filenames(ALL_EXAMPLES, one_by_one)
+    assert batched.get_database().as_json() == one_by_one.get_database().as_json()
+
+
+def test_sarif_observer_has_a_run_per_linter(parser) -> None:
+    observer = SarifObserver()
+    parser.parse_from_filenames(sarif.ALL_EXAMPLES, observer)
+    runs = observer.get_sarif_json()["runs"]
+    assert len({run["tool"]["driver"]["name"] for run in runs}) == len(runs) == sarif.LINTERS_AMOUNT
+    assert sum(len(run["results"]) for run in runs) == sarif.ALL_AMOUNT
@@ -0,0 +1,52 @@
+import json
+import pytest
+from benchmarks import run
+from benchmarks.generators import GENERATORS, generate
+from you_shall_not_parse.observers.batch_observer import BatchObserver
+from you_shall_not_parse.parser import Parser
+
+HANDLERS = {
+    "sarif": "SarifHandler", "pylint": "PylintHandler", "golangci": "GolangCiHandler",
+    "npm": "NpmHandler", "pip-audit": "PipAuditHandler", "lizard": "LizardHandler",
+    "mypy": "MypyHandler",
+}
+
+
+@pytest.mark.parametrize("validation", ["fast", "strict"])
+@pytest.mark.parametrize("report_format", GENERATORS)
+def test_generated_reports_have_every_issue(tmp_path, report_format, validation) -> None:
+    path = generate(report_format, 150, str(tmp_path))
+    observer = BatchObserver()
+    Parser(validation).parse_from_filenames([path], observer)
+    assert sum(len(batch) for batch in observer.batches) == 150
+
+
+def test_generated_reports_are_reproducible(tmp_path) -> None:
+    def content(directory: str, seed: int = 0) -> bytes:
+        (tmp_path / directory).mkdir()
+        with open(generate("sarif", 20, str(tmp_path / directory), seed), 'rb') as file:
+            return file.read()
+    first = content("first")
+    assert content("second") == first
+    assert content("third", seed=1) != first
+
+
+@pytest.mark.parametrize("report_format", GENERATORS)
+def test_case(tmp_path, report_format) -> None:
+    case = run.run_case(generate(report_format, 50, str(tmp_path)), "count", "fast")
+    assert case["issues"] == 50
+    assert case["handler"] == HANDLERS[report_format]
+    assert case["seconds"] > 0
+
+
+def test_results_are_saved_and_compared(tmp_path, capsys) -> None:
+    output = str(tmp_path / "results.json")
+    arguments = ["--formats", "lizard", "--observers", "batch", "--issues", "100"]
+    assert run.main(arguments + ["--output", output]) == 0
+    with open(output, encoding="utf-8") as file:
+        results = json.load(file)
+    case, = results["results"]
+    assert (case["format"], case["observer"], case["size"], case["issues"]) == (
+        "lizard", "batch", 100, 100)
+    assert run.main(arguments + ["--compare", output, "--max-slowdown", "1000"]) == 0
+    assert "lizard" in capsys.readouterr().out
@@ -0,0 +1,149 @@
+import gzip
+import lzma
+import os
+import sys
+import pytest
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse import document as document_module
+from you_shall_not_parse.document import Document
+from you_shall_not_parse.compression import GZIP, XZ, ZSTD, CompressionError, ESTIMATED_RATIO
+from you_shall_not_parse.sniffer import SNIFF_SIZE, sniff_document
+from tests.test_parser import RecordingObserver
+
+EXAMPLES = [
+    "examples/trivy.sarif",
+    "examples/golangci-with-issues.json",
+    "examples/mypy.xml",
+    "examples/complexity.csv",
+]
+
+
+def zstd_compress(content: bytes) -> bytes:
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(content)
+
+
+COMPRESSORS = {GZIP: (gzip.compress, ".gz"), XZ: (lzma.compress, ".xz"),
+               ZSTD: (zstd_compress, ".zst")}
+
+
+def parse(file_name: str) -> list:
+    observer = RecordingObserver()
+    Parser().parse_from_filenames([file_name], observer)
+    return observer.issues
+
+
+def compressed_copy(tmp_path, file_name: str, compression: str, suffix=None) -> str:
+    compress, default_suffix = COMPRESSORS[compression]
+    with open(file_name, 'rb') as fd:
+        content = compress(fd.read())
+    path = tmp_path / (os.path.basename(file_name) + (default_suffix if suffix is None else suffix))
+    path.write_bytes(content)
+    return str(path)
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+@pytest.mark.parametrize("file_name", EXAMPLES)
+def test_compressed_reports_give_the_same_issues(tmp_path, compression, file_name) -> None:
+    expected = parse(file_name)
+    assert expected
+    assert parse(compressed_copy(tmp_path, file_name, compression)) == expected
+
+
+def test_compression_is_detected_by_content(tmp_path) -> None:
+    path = compressed_copy(tmp_path, "examples/trivy.sarif", GZIP, suffix="")
+    assert parse(path) == parse("examples/trivy.sarif")
+
+
+def test_compressed_document(tmp_path) -> None:
+    with open("examples/trivy.sarif", 'rb') as fd:
+        content = fd.read()
+    document = Document(gzip.compress(content), "trivy.sarif.gz")
+    assert document.compression == GZIP
+    assert document.size == len(content)
+    assert document.head(10) == content[:10].decode()
+    assert document.stream().read() == content
+    assert document.text == content.decode()
+    assert sniff_document(document).extension == ".sarif"
+
+
+def test_streamed_compressed_sarif(monkeypatch, tmp_path) -> None:
+    parser = Parser()
+    for handler in parser.handlers:
+        if type(handler).__name__ == "SarifHandler":
+            monkeypatch.setattr(type(handler), "STREAMING_THRESHOLD", 0)
+    path = compressed_copy(tmp_path, "examples/semgrep.sarif", GZIP)
+    observer = RecordingObserver()
+    parser.parse_from_filenames([path], observer)
+    assert observer.issues == parse("examples/semgrep.sarif")
+
+
+def test_zstd_needs_zstandard(monkeypatch) -> None:
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    document = Document(b"\x28\xb5\x2f\xfd" + b"\x00" * 8)
+    with pytest.raises(CompressionError):
+        document.stream()
+
+
+@pytest.mark.parametrize("compression, expected", [
+    (GZIP, lambda content, compressed: len(content)),
+    (ZSTD, lambda content, compressed: len(content)),
+    (XZ, lambda content, compressed: len(compressed) * ESTIMATED_RATIO),
+])
+def test_size_is_estimated_without_decompressing(monkeypatch, compression, expected) -> None:
+    with open("examples/trivy.sarif", 'rb') as fd:
+        content = fd.read()
+    compressed = COMPRESSORS[compression][0](content)
+    monkeypatch.setattr(document_module, "open_decompressed", None)
+    assert Document(compressed).size == expected(content, compressed)
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+def test_longer_than_is_exact(compression) -> None:
+    content = "{\"é\": 1}".encode("utf-8") * 10
+    document = Document(COMPRESSORS[compression][0](content))
+    assert document.longer_than(len(content) - 1)
+    assert not document.longer_than(len(content))
+
+
+def test_small_xz_lizard_report_keeps_its_last_row(tmp_path) -> None:
+    # A single row that doesn't compress well: its estimated size is over SNIFF_SIZE, not its size
+    name = f"héllo_{os.urandom(600).hex()}"
+    content = f'10,7,50,1,27,"{name}@6-32@src/a.c","src/a.c","{name}","{name}( x )",6,32'
+    compressed = lzma.compress(content.encode("utf-8"))
+    assert len(content.encode("utf-8")) < SNIFF_SIZE < len(compressed) * ESTIMATED_RATIO
+    path = tmp_path / "lizard.csv.xz"
+    path.write_bytes(compressed)
+    assert len(parse(str(path))) == 1
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+@pytest.mark.parametrize("file_name", EXAMPLES)
+def test_cut_compressed_report_is_not_parsed(tmp_path, compression, file_name) -> None:
+    path = compressed_copy(tmp_path, file_name, compression)
+    with open(path, 'rb') as fd:
+        content = fd.read()
+    with open(path, 'wb') as fd:
+        fd.write(content[:len(content) // 2])
+    observer = RecordingObserver()
+    Parser().parse_from_filenames([path, "examples/trivy.sarif"], observer)
+    # The next report is still parsed
+    assert observer.issues == parse("examples/trivy.sarif")
+
+
+@pytest.mark.parametrize("compression", COMPRESSORS)
+def test_corrupt_compressed_report_is_not_parsed(tmp_path, compression) -> None:
+    path = compressed_copy(tmp_path, "examples/trivy.sarif", compression)
+    with open(path, 'rb') as fd:
+        content = bytearray(fd.read())
+    # Garbage after the magic number
+    content[6:] = b"not compressed at all" * 100
+    with open(path, 'wb') as fd:
+        fd.write(content)
+    document = Document(bytes(content))
+    assert document.compression == compression
+    assert document.head(SNIFF_SIZE) == ""
+    with pytest.raises(CompressionError):
+        with document.stream() as stream:
+            stream.read()
+    assert parse(path) == []
@@ -0,0 +1,61 @@
+import json
+from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.observers.database_observer import Database, DBObserver
+from you_shall_not_parse.parser import Parser
+
+ISSUES = [(Severity.HIGH, f"src/{index % 3}.py", "R1", f"message {index}", str(index))
+          for index in range(25)]
+
+
+def rows(filename: str) -> list:
+    """The issues as another connection to the database file sees them."""
+    database = Database(filename)
+    try:
+        return database.query("SELECT linter_name, severity, file_path, name, message, location "
+                              "FROM issues ORDER BY id")
+    finally:
+        database.close()
+
+
+def test_issues_are_buffered_until_flushed(tmp_path) -> None:
+    filename = str(tmp_path / "issues.db")
+    observer = DBObserver(filename=filename)
+    observer.add_issue("linter", ISSUES[0])
+    observer.add_issues("linter", ISSUES[1:])
+    assert rows(filename) == []
+    observer.flush()
+    assert [tuple(row) for row in rows(filename)] == [
+        ("linter", "HIGH", *issue[1:]) for issue in ISSUES]
+    observer.close()
+
+
+def test_full_buffer_is_written(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(Database, "INSERT_CHUNK", 10)
+    filename = str(tmp_path / "issues.db")
+    observer = DBObserver(filename=filename)
+    for issue in ISSUES[:12]:
+        observer.add_issue("one", issue)
+    assert len(rows(filename)) == 10
+    observer.add_issues("two", ISSUES[12:])
+    assert len(rows(filename)) == 20
+    observer.close()
+    assert [row[0] for row in rows(filename)] == ["one"] * 12 + ["two"] * 13
+
+
+def test_queries_see_buffered_issues() -> None:
+    database = Database()
+    for issue in ISSUES:
+        database.add_issue("linter", issue)
+    assert database.count("linter_name = 'linter'") == len(ISSUES)
+    database.add_issues("other", ISSUES[:3])
+    assert len(database.query("SELECT * FROM issues WHERE linter_name = 'other'")) == 3
+    database.add_issue("last", ISSUES[0])
+    assert [issue["linter_name"] for issue in json.loads(database.as_json())][-1] == "last"
+
+
+def test_parser_flushes_the_observer(tmp_path) -> None:
+    filename = str(tmp_path / "issues.db")
+    observer = DBObserver(filename=filename)
+    Parser().parse_from_filenames(["examples/trivy.sarif", "examples/mypy.xml"], observer)
+    assert {row[0] for row in rows(filename)} == {"Trivy", "mypy"}
+    observer.close()
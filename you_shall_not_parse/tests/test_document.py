@@ -0,0 +1,102 @@
+import json
+import pytest
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.document import Document, EntitiesForbiddenError
+from you_shall_not_parse.observers.database_observer import DBObserver
+from you_shall_not_parse.sniffer import SNIFF_SIZE
+
+ENTITY_REPORT = """<?xml version="1.0"?>
+<!DOCTYPE testsuite [<!ENTITY lol "lol"><!ENTITY lol2 "&lol;&lol;&lol;">]>
+<testsuite errors="0" failures="1" name="mypy" skips="0" tests="1" time="1">
+  <testcase classname="mypy" file="mypy" line="1" name="mypy" time="1">
+    <failure message="mypy produced messages">a.py:1: error: &lol2;</failure>
+  </testcase>
+</testsuite>
+"""
+
+
+def test_report_is_decoded_once(monkeypatch) -> None:
+    with open("examples/radon.json", 'r', encoding='utf-8') as fd:
+        report = json.load(fd)
+    # Wrong guess: every JSON handler of the chain looks at the report
+    padded = json.dumps({"Padding": "x" * SNIFF_SIZE, **report})
+    calls = []
+    loads = json.loads
+
+    def counting_loads(text, *args, **kwargs):
+        if text == padded:
+            calls.append(text)
+        return loads(text, *args, **kwargs)
+
+    monkeypatch.setattr(json, "loads", counting_loads)
+    Parser().parse_from_str(padded, DBObserver())
+    assert len(calls) == 1
+
+
+def test_xml_entities_are_refused() -> None:
+    document = Document(ENTITY_REPORT)
+    with pytest.raises(EntitiesForbiddenError):
+        document.xml
+    observer = DBObserver()
+    Parser().parse_from_str(ENTITY_REPORT, observer)
+    assert observer.get_database().query("SELECT * FROM issues") == []
+
+
+def test_json_error_is_kept() -> None:
+    document = Document("{not json")
+    for _ in range(2):
+        with pytest.raises(json.JSONDecodeError):
+            document.json
+
+
+def test_buffer_document() -> None:
+    content = "{\"a\": \"é\"}".encode("utf-8")
+    document = Document(content, "report.json")
+    assert document.size == len(content)
+    assert document.head(4) == "{\"a\""
+    assert document.stream().read() == content
+    assert document.json == {"a": "é"}
+    assert document.text == "{\"a\": \"é\"}"
+
+
+@pytest.mark.parametrize(
+    "file_name, amount",
+    [
+        ("examples/trivy.sarif", 22),
+        ("examples/mypy.xml", 4),
+    ]
+)
+def test_files_are_read_without_decoding(monkeypatch, file_name, amount) -> None:
+    def fail(_):
+        raise AssertionError("the report should not be decoded to text")
+
+    monkeypatch.setattr(Document, "_decode", fail)
+    parser = Parser()
+    for handler in parser.handlers:
+        if type(handler).__name__ == "SarifHandler":
+            monkeypatch.setattr(type(handler), "STREAMING_THRESHOLD", 0)
+    observer = DBObserver()
+    parser.parse_from_filenames([file_name], observer)
+    assert len(observer.get_database().query("SELECT * FROM issues")) == amount
+
+
+def test_empty_file(tmp_path) -> None:
+    empty = tmp_path / "empty.json"
+    empty.write_bytes(b"")
+    observer = DBObserver()
+    Parser().parse_from_filenames([str(empty)], observer)
+    assert observer.get_database().query("SELECT * FROM issues") == []
+
+
+@pytest.mark.parametrize("content", [b"<report><item/></report>", b"plain text, no handler"])
+def test_unknown_files_are_not_kept_as_text(monkeypatch, tmp_path, content) -> None:
+    def fail(_):
+        raise AssertionError("no handler asked for the text of the report")
+
+    report = tmp_path / "unknown.txt"
+    report.write_bytes(content)
+    # The JSON handlers decode the report to read its JSON, without keeping the text
+    monkeypatch.setattr(Document, "text", property(fail))
+    observer = DBObserver()
+    Parser().parse_from_filenames([str(report)], observer)
+    assert observer.get_database().query("SELECT * FROM issues") == []
@@ -0,0 +1,69 @@
+import pickle
+from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.issue_batch import IssueBatch
+from you_shall_not_parse.observers.batch_observer import BatchObserver
+from you_shall_not_parse.parser import Parser
+from tests.test_parser import RecordingObserver
+
+LOCATIONS = [3, "3", "03", "", None, "1-2", 2 ** 70, -1, True, "١٢", 1.5, ["a"], {"line": 1}]
+
+
+def issues_with_locations():
+    return [(Severity.LOW, "a.py", "R1", f"message {index}", location)
+            for index, location in enumerate(LOCATIONS)]
+
+
+def test_issues_come_back_as_added() -> None:
+    issues = issues_with_locations() + [(Severity.HIGH, ["a.py"], 1, None, 2)]
+    batch = IssueBatch("linter", issues)
+    assert len(batch) == len(issues)
+    assert list(batch) == issues
+    for issue, expected in zip(batch, issues):
+        assert [type(value) for value in issue] == [type(value) for value in expected]
+
+
+def test_pickle_round_trip() -> None:
+    batch = IssueBatch("linter", issues_with_locations())
+    copy = pickle.loads(pickle.dumps(batch))
+    assert copy == batch
+    assert list(copy) == issues_with_locations()
+
+
+def test_paths_and_rules_are_shared() -> None:
+    batch = IssueBatch("linter", [(Severity.LOW, "".join(["a", ".py"]), "R1", "x", index)
+                                  for index in range(3)])
+    paths = {id(issue[1]) for issue in batch}
+    rules = {id(issue[2]) for issue in batch}
+    assert len(paths) == len(rules) == 1
+
+
+def test_equal_values_of_other_types_are_kept() -> None:
+    issues = [(Severity.LOW, 1, "R", "x", 1), (Severity.LOW, True, "R", "x", 1),
+              (Severity.LOW, 1.0, "R", "x", 1)]
+    assert [type(issue[1]) for issue in IssueBatch("linter", issues)] == [int, bool, float]
+
+
+def test_batches_follow_the_linter() -> None:
+    observer = BatchObserver()
+    observer.add_issue("a", (Severity.LOW, "a.py", "R1", "x", 1))
+    observer.add_issues("a", [(Severity.HIGH, "a.py", "R2", "y", 2)])
+    observer.add_issues("b", [(Severity.NOTE, "b.py", "R3", "z", "3")])
+    assert [(batch.linter_name, len(batch)) for batch in observer.batches] == [("a", 2), ("b", 1)]
+    recorded = RecordingObserver()
+    observer.replay(recorded)
+    assert recorded.issues == [
+        ("a", Severity.LOW, "a.py", "R1", "x", 1),
+        ("a", Severity.HIGH, "a.py", "R2", "y", 2),
+        ("b", Severity.NOTE, "b.py", "R3", "z", "3"),
+    ]
+
+
+def test_parallel_parse_matches_sequential() -> None:
+    files = ["examples/golangci-with-issues.json", "examples/bandit.sarif",
+             "examples/pylint.json", "examples/mypy.xml"]
+    sequential = RecordingObserver()
+    Parser().parse_from_filenames(files, sequential)
+    parallel = RecordingObserver()
+    Parser().parse_from_filenames(files, parallel, jobs=2)
+    assert sequential.issues
+    assert parallel.issues == sequential.issues
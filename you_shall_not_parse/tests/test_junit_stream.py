@@ -0,0 +1,68 @@
+import io
+import pytest
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.document import EntitiesForbiddenError
+from you_shall_not_parse.junit_stream import read_failures, InvalidJunitError
+from tests.test_document import ENTITY_REPORT
+from tests.test_parser import RecordingObserver
+
+TESTCASE = """
+    <testcase classname="mypy" name="case{index}">
+        <failure message="mypy produced messages">a{index}.py:{index}: error: first
+a{index}.py:{index}: note: second</failure>
+    </testcase>"""
+
+
+def report(cases: int, extra: str = "") -> str:
+    testcases = "".join(TESTCASE.format(index=index) for index in range(cases))
+    return (f'<testsuites><testsuite name="mypy" tests="{cases}">{testcases}{extra}'
+            '</testsuite></testsuites>')
+
+
+def parse(validation: str, content: str) -> list:
+    observer = RecordingObserver()
+    Parser(validation).parse_from_str(content, observer)
+    return observer.issues
+
+
+def test_streamed_report_matches_strict() -> None:
+    content = report(500)
+    issues = parse("fast", content)
+    assert len(issues) == 1000
+    assert issues == parse("strict", content)
+
+
+def test_failures_are_read_in_order() -> None:
+    failures = list(read_failures(io.BytesIO(report(3).encode())))
+    assert [failure.split(":")[0] for failure in failures] == ["a0.py", "a1.py", "a2.py"]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "<report/>",
+        report(3, "<unexpected/>"),
+        report(3).replace(' name="case2"', ""),
+        report(3).replace("</testsuites>", ""),
+        "{}",
+    ]
+)
+def test_invalid_reports_give_no_issues(content) -> None:
+    with pytest.raises(InvalidJunitError):
+        list(read_failures(io.BytesIO(content.encode())))
+    assert parse("fast", content) == []
+
+
+def test_entities_are_refused() -> None:
+    with pytest.raises(EntitiesForbiddenError):
+        list(read_failures(io.BytesIO(ENTITY_REPORT.encode())))
+
+
+def test_failure_text_over_libxml2_limit() -> None:
+    # mypy writes all its messages in one failure
+    lines = "\n".join(f"a.py:{index}: error: {'x' * 100}" for index in range(100000))
+    content = f'<testsuite name="mypy" tests="1"><testcase name="mypy"><failure>{lines}</failure></testcase></testsuite>'
+    assert len(lines) > 10 * 1024 * 1024
+    issues = parse("fast", content)
+    assert len(issues) == 100000
+    assert issues == parse("strict", content)
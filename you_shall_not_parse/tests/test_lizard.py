@@ -0,0 +1,75 @@
+from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.parsers.lizard import LizardHandler, LizardThresholds
+from you_shall_not_parse.sniffer import SNIFF_SIZE
+from tests.test_parser import RecordingObserver
+
+ROW = '{nloc},{ccn},{tokens},{parameters},27,"f@6-32@src/a.c","src/a.c","{name}","{name}( x )",{line},32\n'
+
+
+def row(name="f", nloc=10, ccn=1, tokens=50, parameters=1, line=6) -> str:
+    return ROW.format(name=name, nloc=nloc, ccn=ccn, tokens=tokens, parameters=parameters,
+                      line=line)
+
+
+def parse(content: str) -> list:
+    observer = RecordingObserver()
+    Parser().parse_from_str(content, observer)
+    return observer.issues
+
+
+def test_default_threshold_is_ccn() -> None:
+    content = row("simple", ccn=4) + row("complex", ccn=5, nloc=500) + row("hidden", ccn=9, line=0)
+    assert parse(content) == [
+        ("lizard", Severity.HIGH, "src/a.c", "high-complexity",
+         "Function 'complex' has high cyclomatic complexity: 5", "6"),
+    ]
+
+
+def test_configured_thresholds(monkeypatch) -> None:
+    monkeypatch.setattr(LizardHandler, "THRESHOLDS",
+                        LizardThresholds(ccn=None, nloc=100, tokens=1000, parameters=4))
+    content = row("long", nloc=100) + row("wide", tokens=2000, parameters=6) + row("fine", ccn=50)
+    assert [(issue[3], issue[4]) for issue in parse(content)] == [
+        ("long-function", "Function 'long' has too many lines of code: 100"),
+        ("too-many-tokens", "Function 'wide' has too many tokens: 2000"),
+        ("too-many-parameters", "Function 'wide' has too many parameters: 6"),
+    ]
+
+
+def test_rows_that_arent_functions_are_skipped() -> None:
+    content = row("first", ccn=7) + "nloc,CCN,token\n" + row("broken", ccn="x") + row("last", ccn=8)
+    assert [issue[4] for issue in parse(content)] == [
+        "Function 'first' has high cyclomatic complexity: 7",
+        "Function 'last' has high cyclomatic complexity: 8",
+    ]
+
+
+def test_report_is_sniffed_from_its_start() -> None:
+    long_name = "f" * SNIFF_SIZE
+    content = row("first", ccn=6) + row(long_name, ccn=6)
+    issues = parse(content)
+    assert len(issues) == 2
+    assert issues[1][4] == f"Function '{long_name}' has high cyclomatic complexity: 6"
+
+
+def test_non_ascii_report_file(tmp_path) -> None:
+    # Fewer characters than bytes, and no newline after the last row
+    report = tmp_path / "lizard.csv"
+    report.write_bytes(row("héllo", ccn=7).rstrip("\n").encode("utf-8"))
+    observer = RecordingObserver()
+    Parser().parse_from_filenames([str(report)], observer)
+    assert observer.issues == [
+        ("lizard", Severity.HIGH, "src/a.c", "high-complexity",
+         "Function 'héllo' has high cyclomatic complexity: 7", "6"),
+    ]
+
+
+def test_broken_report_sends_no_issue(tmp_path) -> None:
+    # The bytes that aren't UTF-8 come after many complete rows
+    content = "".join(row(f"f{index}", ccn=9) for index in range(500)).encode("utf-8")
+    report = tmp_path / "lizard.csv"
+    report.write_bytes(content + b"\xff\xfe" + row("last", ccn=9).encode("utf-8"))
+    observer = RecordingObserver()
+    Parser().parse_from_filenames([str(report)], observer)
+    assert observer.issues == []
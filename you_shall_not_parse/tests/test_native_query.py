@@ -0,0 +1,78 @@
+import json
+import jmespath
+import pytest
+from you_shall_not_parse.native_query import compile_query
+from you_shall_not_parse.registry import get_spec
+
+HANDLER_EXAMPLES = [
+    ("golangci", "examples/golangci-with-issues.json"),
+    ("npm", "examples/npm_audit.json"),
+    ("pip-audit", "examples/pip-audit.json"),
+    ("pip-audit", "examples/pip-audit-abram.json"),
+    ("poetry-audit", "examples/poetry-audit.json"),
+]
+
+ODD_TREES = [
+    None,
+    [],
+    {},
+    {"Issues": None, "vulnerabilities": "x", "dependencies": {}},
+    {"Issues": [None, 1, [], {}, [{"Severity": "low"}]]},
+    {"vulnerabilities": {"a": None, "b": {"via": "x"}, "c": {"via": [None, "y", {"name": 0}]}}},
+    {"dependencies": [{"name": "a", "vulns": []}, {"name": "b", "vulns": 0},
+                      {"name": "c", "vulns": [{"id": "X", "name": "other"}]}, [{"vulns": [{}]}]]},
+    {"vulnerabilities": [{"name": "a", "vulns": [[{"cve": "Y"}], {"None": "z"}]}]},
+]
+
+QUERIES = [
+    "a.b.c",
+    "a[].b",
+    "a[?b].c",
+    "a.*.b[]",
+    "a | [0]",
+    "{x: a, y: `1`}",
+    "a[].[@, b]",
+    "length(a)",
+    "a[?b == `1`]",
+]
+
+
+def outcome(search, tree):
+    try:
+        return search(tree)
+    except jmespath.exceptions.JMESPathError as error:
+        return type(error)
+
+
+@pytest.mark.parametrize("name, file_name", HANDLER_EXAMPLES)
+def test_handler_query_matches_jmespath(name, file_name) -> None:
+    handler = type(get_spec(name).load())
+    with open(file_name, 'r', encoding='utf-8') as fd:
+        report = json.load(fd)
+    search = compile_query(handler.JMESPATHQUERY, handler.OPTIONS)
+    assert search is not None
+    compiled = jmespath.compile(handler.JMESPATHQUERY)
+    for tree in [report, *ODD_TREES]:
+        expected = outcome(lambda tree: compiled.search(tree, options=handler.OPTIONS), tree)
+        assert outcome(search, tree) == expected
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_query_matches_jmespath_or_is_left_to_it(query) -> None:
+    search = compile_query(query)
+    if search is None:
+        return
+    for tree in [{"a": [{"b": 1, "c": 2}, {"b": [3], "c": 4}, {"c": 5}]},
+                 {"a": {"x": {"b": [1, [2]]}, "y": None}}, {"a": "text"}, None]:
+        assert outcome(search, tree) == outcome(jmespath.compile(query).search, tree)
+
+
+def test_wrong_argument_types_raise_like_jmespath() -> None:
+    handler = type(get_spec("pip-audit").load())
+    search = compile_query(handler.JMESPATHQUERY, handler.OPTIONS)
+    assert search is not None
+    tree = {"dependencies": [{"name": "a", "vulns": "not a list"}]}
+    with pytest.raises(jmespath.exceptions.JMESPathTypeError):
+        jmespath.search(handler.JMESPATHQUERY, tree, options=handler.OPTIONS)
+    with pytest.raises(jmespath.exceptions.JMESPathTypeError):
+        search(tree)
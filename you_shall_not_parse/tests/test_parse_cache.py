@@ -0,0 +1,121 @@
+import os
+import shutil
+import pytest
+from you_shall_not_parse import parse_cache
+from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.issue_batch import IssueBatch
+from you_shall_not_parse.parse_cache import ParseCache, decode_batches, encode_batches
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.registry import get_specs
+from tests.test_parser import RecordingObserver
+
+FILES = ["examples/trivy.sarif", "examples/mypy.xml", "examples/golangci-with-issues.json"]
+VALUES = [3, "3", "", None, True, False, 1.5, 2 ** 70, -1, "é\ud800"]
+
+
+def parse(parser: Parser, files: list[str], jobs: int = 1) -> list:
+    observer = RecordingObserver()
+    parser.parse_from_filenames(files, observer, jobs=jobs)
+    return observer.issues
+
+
+def forbid_parsing(monkeypatch) -> None:
+    def fail(*_args):
+        raise AssertionError("The report was parsed again")
+    monkeypatch.setattr(Parser, "_parse_document", fail)
+
+
+def test_batches_round_trip() -> None:
+    issues = [(Severity.LOW, "a.py", value, f"message {index}", value)
+              for index, value in enumerate(VALUES)]
+    issues += [(Severity.HIGH, f"{index}.py", "R1", "m", index) for index in range(70000)]
+    batches = [IssueBatch("first", issues), IssueBatch("empty"), IssueBatch("last", issues[:2])]
+    decoded = decode_batches(encode_batches(batches))
+    assert decoded == batches
+    for issue, expected in zip(decoded[0], issues):
+        assert [type(value) for value in issue] == [type(value) for value in expected]
+
+
+def test_other_values_are_not_cached(tmp_path) -> None:
+    with pytest.raises(parse_cache.UncacheableError):
+        encode_batches([IssueBatch("linter", [(Severity.LOW, "a.py", "R1", "m", {"line": 1})])])
+    cache = ParseCache(str(tmp_path))
+    cache.store("key", [IssueBatch("linter", [(Severity.LOW, "a.py", "R1", "m", ["a"])])])
+    assert os.listdir(tmp_path) == []
+
+
+def test_unchanged_reports_are_replayed(monkeypatch, tmp_path) -> None:
+    expected = parse(Parser(), FILES)
+    assert parse(Parser(cache=ParseCache(str(tmp_path))), FILES) == expected
+    forbid_parsing(monkeypatch)
+    assert parse(Parser(cache=ParseCache(str(tmp_path))), FILES) == expected
+
+
+def test_same_report_twice_is_parsed_once(tmp_path) -> None:
+    copy = tmp_path / "copy.sarif"
+    shutil.copy("examples/trivy.sarif", copy)
+    parser = Parser(cache=ParseCache(str(tmp_path / "cache")))
+    expected = parse(Parser(), ["examples/trivy.sarif"])
+    assert parse(parser, ["examples/trivy.sarif", str(copy)]) == expected
+    assert parse(parser, ["examples/trivy.sarif", str(copy), "examples/mypy.xml"], jobs=2) == (
+        expected + parse(Parser(), ["examples/mypy.xml"]))
+
+
+def test_corrupt_cache_files_are_misses(tmp_path) -> None:
+    expected = parse(Parser(), FILES)
+    parse(Parser(cache=ParseCache(str(tmp_path))), FILES)
+    for name in os.listdir(tmp_path):
+        path = tmp_path / name
+        path.write_bytes(path.read_bytes()[:-1])
+    assert parse(Parser(cache=ParseCache(str(tmp_path))), FILES) == expected
+    (tmp_path / os.listdir(tmp_path)[0]).write_bytes(b"not a cache file")
+    assert parse(Parser(cache=ParseCache(str(tmp_path))), FILES) == expected
+
+
+def test_key_depends_on_handlers_and_validation(monkeypatch) -> None:
+    cache = ParseCache.__new__(ParseCache)
+    key = cache.key(b"content", "fast")
+    assert key != cache.key(b"content", "strict")
+    assert key != cache.key(b"other content", "fast")
+    specs = [spec._replace(version="2") if spec.name == "sarif" else spec for spec in get_specs()]
+    monkeypatch.setattr(parse_cache, "get_specs", lambda: specs)
+    parse_cache.handlers_version.cache_clear()
+    try:
+        assert cache.key(b"content", "fast") != key
+    finally:
+        parse_cache.handlers_version.cache_clear()
+
+
+def test_key_depends_on_handler_settings(monkeypatch) -> None:
+    from you_shall_not_parse.parsers.lizard import LizardHandler, LizardThresholds
+    cache = ParseCache.__new__(ParseCache)
+    key = cache.key(b"content", "fast")
+    monkeypatch.setattr(LizardHandler, "THRESHOLDS", LizardThresholds(ccn=10))
+    assert cache.key(b"content", "fast") != key
+    monkeypatch.setattr(LizardHandler, "THRESHOLDS", LizardThresholds())
+    assert cache.key(b"content", "fast") == key
+
+
+def test_key_depends_on_handler_source(monkeypatch, tmp_path) -> None:
+    module = tmp_path / "cached_plugin.py"
+    module.write_text("HANDLER = None\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    specs = (*get_specs(), get_specs()[0]._replace(name="plugin", module="cached_plugin"))
+    monkeypatch.setattr(parse_cache, "get_specs", lambda: specs)
+    cache = ParseCache.__new__(ParseCache)
+    parse_cache.handlers_version.cache_clear()
+    try:
+        key = cache.key(b"content", "fast")
+        module.write_text("HANDLER = None  # changed\n", encoding="utf-8")
+        parse_cache.handlers_version.cache_clear()
+        assert cache.key(b"content", "fast") != key
+    finally:
+        parse_cache.handlers_version.cache_clear()
+
+
+def test_pool_uses_the_cache(monkeypatch, tmp_path) -> None:
+    expected = parse(Parser(), FILES)
+    assert parse(Parser(cache=ParseCache(str(tmp_path))), FILES, jobs=2) == expected
+    assert len(os.listdir(tmp_path)) == len(FILES)
+    forbid_parsing(monkeypatch)
+    assert parse(Parser(cache=ParseCache(str(tmp_path))), FILES, jobs=2) == expected
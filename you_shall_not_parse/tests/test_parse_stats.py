@@ -0,0 +1,69 @@
+import os
+from you_shall_not_parse.parse_cache import ParseCache
+from you_shall_not_parse.parse_stats import ParseStats
+from you_shall_not_parse.parser import Parser
+from tests.test_parser import RecordingObserver
+
+FILES = ["examples/trivy.sarif", "examples/mypy.xml", "examples/complexity.csv"]
+
+
+def parse(parser: Parser, files: list[str], jobs: int = 1) -> list:
+    observer = RecordingObserver()
+    parser.parse_from_filenames(files, observer, jobs=jobs)
+    return observer.issues
+
+
+def test_reports_are_recorded() -> None:
+    stats = ParseStats()
+    issues = parse(Parser(stats=stats), FILES)
+    assert issues == parse(Parser(), FILES)
+    assert [report.filename for report in stats.reports] == FILES
+    assert [report.handler for report in stats.reports] == [
+        "SarifHandler", "MypyHandler", "LizardHandler"]
+    assert sum(report.issues for report in stats.reports) == len(issues)
+    for report in stats.reports:
+        assert report.size == os.path.getsize(report.filename)
+        assert report.seconds > 0
+        assert not report.cached
+        accepted = [attempt for attempt in report.attempts if attempt.accepted]
+        assert len(accepted) == 1
+        assert accepted[0].validation > 0
+        assert accepted[0].extraction > 0
+
+
+def test_rejected_handlers(tmp_path) -> None:
+    unknown = tmp_path / "unknown.json"
+    unknown.write_text('"not a report"')
+    stats = ParseStats()
+    parse(Parser(stats=stats), [str(unknown)])
+    report, = stats.reports
+    assert report.handler is None
+    assert report.issues == 0
+    assert set(report.rejected) == {type(handler).__name__ for handler in Parser().handlers}
+
+
+def test_handler_totals() -> None:
+    stats = ParseStats()
+    parse(Parser(stats=stats), FILES + ["examples/semgrep.sarif"])
+    totals = stats.handlers()
+    assert totals["SarifHandler"].accepted == 2
+    assert totals["SarifHandler"].issues == stats.reports[0].issues + stats.reports[3].issues
+    assert sum(handler.tried for handler in totals.values()) == sum(
+        len(report.attempts) for report in stats.reports)
+    assert stats.slowest(1)[0].seconds == max(report.seconds for report in stats.reports)
+
+
+def test_pool_and_cache(tmp_path) -> None:
+    stats = ParseStats()
+    parser = Parser(cache=ParseCache(str(tmp_path)), stats=stats)
+    parse(parser, FILES, jobs=2)
+    assert [report.handler for report in stats.reports] == [
+        "SarifHandler", "MypyHandler", "LizardHandler"]
+    assert not any(report.cached for report in stats.reports)
+    stats.reports.clear()
+    parse(parser, FILES, jobs=2)
+    parse(parser, FILES)
+    assert len(stats.reports) == 2 * len(FILES)
+    assert all(report.cached and not report.attempts for report in stats.reports)
+    assert [report.issues for report in stats.reports[:3]] == [
+        report.issues for report in stats.reports[3:]]
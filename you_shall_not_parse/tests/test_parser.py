@@ -1,10 +1,14 @@
 import pytest
 from typing import Any
+import json
 from you_shall_not_parse.parser import Parser
 from you_shall_not_parse.observer import Observer
 from you_shall_not_parse.base_classes import IssueTupleType
+from you_shall_not_parse.handler_classes import get_json_validator, get_xml_schema, warm_schema_cache
+from you_shall_not_parse.observers.database_observer import DBObserver
+from you_shall_not_parse.observers.batch_observer import BatchObserver
 
-from tests.sarif_params import TRIVY_EXPECTED
+from tests.sarif_params import TRIVY_EXPECTED, ALL_EXAMPLES as SARIF_EXAMPLES
 from tests.golangci_params import GOLANGCI_EXPECTED
 from tests.npm_params import NPM_EXPECTED
 from tests.pipaudit_params import PIPAUDIT_EXPECTED, PIPAUDIT_ABRAM_EXPECTED
@@ -25,6 +29,30 @@ class ExpectedObserver(Observer):
         assert self.expected[self.index] == (linter_name, *issue)
         self.index += 1
 
+
+class RecordingObserver(Observer):
+    def __init__(self) -> None:
+        self.issues: list = []
+
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        self.issues.append((linter_name, *issue))
+
+
+ALL_EXPECTED = [
+    TRIVY_EXPECTED,
+    GOLANGCI_EXPECTED,
+    NPM_EXPECTED,
+    PIPAUDIT_EXPECTED,
+    PIPAUDIT_ABRAM_EXPECTED,
+    RADON_EXPECTED,
+    POETRYAUDIT_EXPECTED,
+    PYLINT_EXPECTED,
+    PYLINT_ABRAM_EXPECTED,
+    MYPY_EXPECTED,
+    MYPY_EXPECTED_2,
+    LIZARD_EXPECTED
+]
+
 @pytest.mark.parametrize(
     "expected",
     [
@@ -46,3 +74,121 @@ def test_parser(expected) -> None:
     parser = Parser()
     observer = ExpectedObserver(expected[0])
     parser.parse_from_filenames([expected[1]], observer)
+
+
+def test_schema_cache_is_shared() -> None:
+    warm_schema_cache()
+    misses = get_json_validator.cache_info().misses
+    parser = Parser()
+    parser.parse_from_filenames(["examples/pylint.json", "examples/mypy.xml"], DBObserver())
+    assert get_json_validator.cache_info().misses == misses
+    assert get_json_validator("sarif_schema.json") is get_json_validator("sarif_schema.json")
+    assert get_xml_schema("junit_schema.xsd") is get_xml_schema("junit_schema.xsd")
+
+
+def test_parallel_parse_matches_sequential() -> None:
+    files = [expected[1] for expected in ALL_EXPECTED] + ["examples/semgrep.sarif"]
+    sequential = RecordingObserver()
+    Parser().parse_from_filenames(files, sequential)
+    parallel = RecordingObserver()
+    Parser().parse_from_filenames(files, parallel, jobs=3)
+    assert parallel.issues == sequential.issues
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "examples/trivy.sarif",
+        "examples/bandit.sarif",
+        "examples/golangci-with-issues.json",
+        "examples/npm_audit.json",
+        "examples/pip-audit.json",
+        "examples/poetry-audit.json",
+    ]
+)
+def test_chunked_parse_matches_sequential(monkeypatch, file_name) -> None:
+    parser = Parser()
+    for handler in parser.handlers:
+        if hasattr(handler, "CHUNK_SIZE"):
+            monkeypatch.setattr(type(handler), "CHUNK_SIZE", 1)
+    sequential = RecordingObserver()
+    parser.parse_from_filenames([file_name], sequential)
+    chunked = RecordingObserver()
+    parser.parse_from_filenames([file_name], chunked, jobs=2)
+    assert sequential.issues
+    assert chunked.issues == sequential.issues
+
+
+@pytest.mark.parametrize("file_name", SARIF_EXAMPLES + [expected[1] for expected in ALL_EXPECTED])
+def test_fast_validation_matches_strict(file_name) -> None:
+    strict = RecordingObserver()
+    Parser("strict").parse_from_filenames([file_name], strict)
+    fast = RecordingObserver()
+    Parser("fast").parse_from_filenames([file_name], fast)
+    assert fast.issues == strict.issues
+
+
+def test_fast_validation_checks_what_is_read() -> None:
+    with open("examples/trivy.sarif", 'r', encoding='utf-8') as fd:
+        report = json.load(fd)
+    # Not valid SARIF, but everything the handler reads is there
+    del report["version"]
+    observer = RecordingObserver()
+    Parser().parse_from_str(json.dumps(report), observer)
+    assert len(observer.issues) == len(TRIVY_EXPECTED[0])
+    observer = RecordingObserver()
+    Parser("strict").parse_from_str(json.dumps(report), observer)
+    assert observer.issues == []
+    # The rule of a result is found by its ruleIndex
+    del report["runs"][0]["results"][0]["ruleId"]
+    report["version"] = "2.1.0"
+    observer = RecordingObserver()
+    Parser().parse_from_str(json.dumps(report), observer)
+    assert observer.issues == list(TRIVY_EXPECTED[0])
+    # Valid SARIF without the rule of a result
+    del report["runs"][0]["results"][0]["ruleIndex"]
+    observer = RecordingObserver()
+    Parser().parse_from_str(json.dumps(report), observer)
+    assert observer.issues == []
+
+
+def test_unknown_validation() -> None:
+    with pytest.raises(ValueError):
+        Parser("loose")
+
+
+@pytest.mark.parametrize("jobs", [-1, -2])
+def test_negative_jobs(jobs) -> None:
+    with pytest.raises(ValueError, match="jobs"):
+        Parser().parse_from_filenames(["examples/mypy.xml", "examples/trivy.sarif"],
+                                      BatchObserver(), jobs=jobs)
+    with pytest.raises(ValueError, match="jobs"):
+        Parser().parse_from_str("{}", BatchObserver(), jobs=jobs)
+
+
+def test_chunked_parse_shares_one_pool(monkeypatch, tmp_path) -> None:
+    from you_shall_not_parse import chunks
+    started = []
+
+    class CountedPool(chunks.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs) -> None:
+            started.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(chunks, "ProcessPoolExecutor", CountedPool)
+    parser = Parser()
+    for handler in parser.handlers:
+        if hasattr(handler, "CHUNK_SIZE"):
+            monkeypatch.setattr(type(handler), "CHUNK_SIZE", 1)
+    # Two runs, each split in chunks
+    with open("examples/trivy.sarif", encoding="utf-8") as file:
+        report = json.load(file)
+    report["runs"] = report["runs"] * 2
+    two_runs = tmp_path / "two_runs.sarif"
+    two_runs.write_text(json.dumps(report), encoding="utf-8")
+    sequential = RecordingObserver()
+    parser.parse_from_filenames([str(two_runs)], sequential)
+    chunked = RecordingObserver()
+    parser.parse_from_filenames([str(two_runs)], chunked, jobs=2)
+    assert chunked.issues == sequential.issues
+    assert len(started) == 1
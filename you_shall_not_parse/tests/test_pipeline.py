@@ -0,0 +1,82 @@
+import threading
+import pytest
+from you_shall_not_parse.base_classes import IssueTupleType
+from you_shall_not_parse.observers.database_observer import DBObserver
+from you_shall_not_parse.parse_cache import ParseCache
+from you_shall_not_parse.parse_stats import ParseStats
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.pipeline import Pipeline
+from tests.test_parser import ALL_EXPECTED, RecordingObserver
+
+FILES = [expected[1] for expected in ALL_EXPECTED] + ["examples/semgrep.sarif"]
+
+
+class ThreadObserver(RecordingObserver):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: set[int] = set()
+
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        self.threads.add(threading.get_ident())
+        super().add_issue(linter_name, issue)
+
+
+class FailingObserver(RecordingObserver):
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        raise RuntimeError("Storage failed")
+
+
+def parse(parser: Parser, files: list[str], observer=None) -> list:
+    observer = observer or RecordingObserver()
+    parser.parse_from_filenames(files, observer)
+    return observer.issues
+
+
+def pipeline_threads() -> list[threading.Thread]:
+    return [thread for thread in threading.enumerate() if thread.name.startswith("ysnp-")]
+
+
+def test_pipeline_matches_sequential() -> None:
+    observer = ThreadObserver()
+    assert parse(Parser(pipelined=True), FILES, observer) == parse(Parser(), FILES)
+    assert observer.threads == {threading.get_ident()}
+    assert not pipeline_threads()
+
+
+def test_small_queues_and_mapped_reports(monkeypatch) -> None:
+    monkeypatch.setattr(Pipeline, "PREFETCH", 1)
+    monkeypatch.setattr(Pipeline, "QUEUED_BATCHES", 1)
+    monkeypatch.setattr(Pipeline, "BATCH_SIZE", 3)
+    monkeypatch.setattr(Pipeline, "MAX_READ_SIZE", 10000)
+    assert parse(Parser(pipelined=True), FILES) == parse(Parser(), FILES)
+
+
+def test_database_observer() -> None:
+    sequential = DBObserver()
+    Parser().parse_from_filenames(FILES, sequential)
+    pipelined = DBObserver()
+    Parser(pipelined=True).parse_from_filenames(FILES, pipelined)
+    assert pipelined.get_database().count("1 = 1") == sequential.get_database().count("1 = 1")
+
+
+def test_cache_and_stats(tmp_path) -> None:
+    stats = ParseStats()
+    parser = Parser(cache=ParseCache(str(tmp_path)), stats=stats, pipelined=True)
+    expected = parse(Parser(), FILES)
+    assert parse(parser, FILES + FILES[:2]) == expected
+    assert parse(parser, FILES) == expected
+    assert [report.cached for report in stats.reports] == [False] * len(FILES) + [True] * len(FILES)
+
+
+def test_read_error_is_raised() -> None:
+    with pytest.raises(FileNotFoundError):
+        parse(Parser(pipelined=True), FILES[:2] + ["examples/missing.json"])
+    assert not pipeline_threads()
+
+
+def test_observer_error_stops_the_pipeline(monkeypatch) -> None:
+    monkeypatch.setattr(Pipeline, "QUEUED_BATCHES", 1)
+    monkeypatch.setattr(Pipeline, "BATCH_SIZE", 1)
+    with pytest.raises(RuntimeError, match="Storage failed"):
+        Parser(pipelined=True).parse_from_filenames(FILES, FailingObserver())
+    assert not pipeline_threads()
@@ -0,0 +1,66 @@
+import json
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+import pytest
+from you_shall_not_parse import registry
+from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.registry import HandlerSpec, get_specs
+from you_shall_not_parse.sniffer import Signature, JSON
+from tests.test_parser import RecordingObserver
+
+PLUGIN_SPEC = HandlerSpec("findings", "tests.plugin_handler",
+                          Signature(JSON, keys=("findings",), key_type="array"))
+FINDINGS = {"findings": [{"file": "a.py", "id": "F1", "text": "bad", "line": 3}]}
+
+LAZY_IMPORTS = """
+import sys
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.observers.batch_observer import BatchObserver
+loaded = lambda: sorted(name for name in sys.modules
+                        if name.startswith("you_shall_not_parse.parsers.") or name == "lxml")
+print(loaded())
+Parser().parse_from_filenames(["examples/golangci-with-issues.json"], BatchObserver())
+print(loaded())
+"""
+
+
+def test_handlers_are_imported_when_needed() -> None:
+    output = subprocess.run([sys.executable, "-c", LAZY_IMPORTS], capture_output=True,
+                            check=True, text=True).stdout.splitlines()
+    assert output == ["[]", "['you_shall_not_parse.parsers.golangci']"]
+
+
+def test_chain_is_built_once() -> None:
+    assert Parser().chain is Parser().chain
+    assert [type(handler).__module__ for handler in Parser().handlers] == [
+        spec.module for spec in get_specs()
+    ]
+
+
+@pytest.fixture
+def plugins(monkeypatch):
+    def install(*values):
+        found = [EntryPoint(f"plugin{index}", value, registry.ENTRY_POINT_GROUP)
+                 for index, value in enumerate(values)]
+        monkeypatch.setattr(registry, "entry_points", lambda group: found)
+        get_specs.cache_clear()
+    yield install
+    get_specs.cache_clear()
+
+
+def test_plugin_is_imported_when_a_report_matches(plugins) -> None:
+    plugins("tests.test_registry:PLUGIN_SPEC")
+    assert get_specs()[-1] == PLUGIN_SPEC
+    assert "tests.plugin_handler" not in sys.modules
+    observer = RecordingObserver()
+    Parser().parse_from_str(json.dumps(FINDINGS), observer)
+    assert observer.issues == [("findings", Severity.LOW, "a.py", "F1", "bad", 3)]
+    assert "tests.plugin_handler" in sys.modules
+
+
+def test_plugin_must_be_a_spec(plugins) -> None:
+    plugins("tests.test_registry:FINDINGS")
+    with pytest.raises(TypeError):
+        get_specs()
@@ -0,0 +1,167 @@
+import json
+import pytest
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.document import Document
+from you_shall_not_parse.sarif_stream import read_runs, DriverName, RunEnd, SarifResult
+from tests.test_parser import RecordingObserver
+import tests.sarif_params as sarif
+
+RULES_ONLY = {
+    "version": "2.1.0",
+    "runs": [{
+        "tool": {"driver": {"name": "rules-only", "rules": [
+            {"id": "R1", "name": "first", "fullDescription": {"text": "First rule"},
+             "defaultConfiguration": {"level": "error"}},
+            {"id": "R2", "name": "second", "fullDescription": {"text": "Second rule"}},
+        ]}},
+        "results": [],
+    }],
+}
+
+RESULTS_FIRST = {
+    "version": "2.1.0",
+    "runs": [{
+        "results": [{
+            "ruleId": "R1",
+            "level": "warning",
+            "message": {"text": "found"},
+            "codeFlows": [{"threadFlows": [{"locations": [{"location": {"message": {"text": "x"}}}]}]}],
+            "locations": [
+                {"physicalLocation": {"artifactLocation": {"uri": "a.py"}, "region": {"startLine": 3}}},
+                {"physicalLocation": {"artifactLocation": {"uri": "b.py"}, "region": {"startLine": 9}}},
+            ],
+        }],
+        "tool": {"driver": {"name": "late-tool"}},
+    }],
+}
+
+
+def parse(monkeypatch, threshold, file_name=None, content=None) -> list:
+    parser = Parser()
+    for handler in parser.handlers:
+        if type(handler).__name__ == "SarifHandler":
+            monkeypatch.setattr(type(handler), "STREAMING_THRESHOLD", threshold)
+    observer = RecordingObserver()
+    if file_name:
+        parser.parse_from_filenames([file_name], observer)
+    else:
+        parser.parse_from_str(content, observer)
+    return observer.issues
+
+
+@pytest.mark.parametrize("file_name", sarif.ALL_EXAMPLES)
+def test_stream_matches_full_parse(monkeypatch, file_name) -> None:
+    expected = parse(monkeypatch, None, file_name=file_name)
+    assert expected
+    assert parse(monkeypatch, 0, file_name=file_name) == expected
+
+
+@pytest.mark.parametrize("report", [RULES_ONLY, RESULTS_FIRST])
+def test_stream_matches_full_parse_synthetic(monkeypatch, report) -> None:
+    content = json.dumps(report)
+    expected = parse(monkeypatch, None, content=content)
+    assert expected
+    assert parse(monkeypatch, 0, content=content) == expected
+
+
+def test_read_runs_keeps_first_location_only() -> None:
+    items = list(read_runs(Document(json.dumps(RESULTS_FIRST)).stream()))
+    assert items == [
+        SarifResult("R1", "warning", "found", "a.py", 3),
+        DriverName("late-tool"),
+        RunEnd(),
+    ]
+
+
+RULE_DEFAULTS = {
+    "version": "2.1.0",
+    "runs": [{
+        "tool": {"driver": {"name": "defaults", "rules": [
+            {"id": "R1", "name": "first", "fullDescription": {"text": "First rule"},
+             "defaultConfiguration": {"level": "error"}},
+            {"id": "R2", "name": "second", "fullDescription": {"text": "Second rule"},
+             "defaultConfiguration": {"level": "note"}},
+        ]}},
+        "results": [
+            {"ruleIndex": 1, "message": {"id": "default"},
+             "locations": [{"physicalLocation": {"artifactLocation": {"uri": "a.py"},
+                                                 "region": {"startLine": 1}}}]},
+            {"ruleId": "R1", "level": "warning", "message": {"text": "own text"},
+             "locations": [{"physicalLocation": {"artifactLocation": {"uri": "b.py"},
+                                                 "region": {"startLine": 2}}}]},
+        ],
+    }],
+}
+
+
+def merged(*file_names: str) -> dict:
+    runs = []
+    for file_name in file_names:
+        with open(file_name, 'r', encoding='utf-8') as fd:
+            runs.extend(json.load(fd)["runs"])
+    return {"version": "2.1.0", "runs": runs}
+
+
+@pytest.mark.parametrize("threshold", [None, 0])
+def test_every_run_is_parsed(monkeypatch, threshold) -> None:
+    file_names = ["examples/trivy.sarif", "examples/semgrep.sarif", "examples/gitleaks.sarif"]
+    expected = [issue for file_name in file_names
+                for issue in parse(monkeypatch, None, file_name=file_name)]
+    content = json.dumps(merged(*file_names))
+    assert parse(monkeypatch, threshold, content=content) == expected
+
+
+@pytest.mark.parametrize("threshold", [None, 0])
+def test_results_default_to_their_rule(monkeypatch, threshold) -> None:
+    content = json.dumps(RULE_DEFAULTS)
+    assert parse(monkeypatch, threshold, content=content) == [
+        ("defaults", Severity.NOTE, "a.py", "R2", "Second rule", 1),
+        ("defaults", Severity.WARNING, "b.py", "R1", "own text", 2),
+    ]
+
+
+@pytest.mark.parametrize("threshold", [None, 0])
+def test_cut_report_is_rejected(monkeypatch, tmp_path, threshold) -> None:
+    content = json.dumps(merged("examples/trivy.sarif"))
+    report = tmp_path / "cut.sarif"
+    report.write_text(content[:len(content) // 2], encoding="utf-8")
+    issues = parse(monkeypatch, threshold, file_name=str(report))
+    # Streamed, the results before the cut were already sent
+    full = parse(monkeypatch, None, file_name="examples/trivy.sarif")
+    assert issues == full[:len(issues)]
+    if threshold is None:
+        assert issues == []
+    assert parse(monkeypatch, threshold, content=content[:len(content) // 2]) == issues
+
+
+@pytest.mark.parametrize("validation", ["fast", "strict"])
+@pytest.mark.parametrize("threshold", [None, 0])
+def test_results_without_locations(monkeypatch, validation, threshold) -> None:
+    results = [{"ruleId": "R1", "level": "error", "message": {"text": "empty"}, "locations": []},
+               {"ruleId": "R2", "level": "note", "message": {"text": "missing"}}]
+    content = json.dumps({"version": "2.1.0",
+                          "runs": [{"tool": {"driver": {"name": "tool"}}, "results": results}]})
+    parser = Parser(validation)
+    for handler in parser.handlers:
+        if type(handler).__name__ == "SarifHandler":
+            monkeypatch.setattr(type(handler), "STREAMING_THRESHOLD", threshold)
+    observer = RecordingObserver()
+    parser.parse_from_str(content, observer)
+    assert observer.issues == [("tool", Severity.HIGH, "", "R1", "empty", ""),
+                               ("tool", Severity.NOTE, "", "R2", "missing", "")]
+
+
+@pytest.mark.parametrize("report", [merged("examples/trivy.sarif", "examples/semgrep.sarif"),
+                                    RULES_ONLY, RESULTS_FIRST])
+def test_stream_converted_by_the_pool(monkeypatch, report) -> None:
+    content = json.dumps(report)
+    expected = parse(monkeypatch, None, content=content)
+    parser = Parser()
+    for handler in parser.handlers:
+        if type(handler).__name__ == "SarifHandler":
+            monkeypatch.setattr(type(handler), "STREAMING_THRESHOLD", 0)
+            monkeypatch.setattr(type(handler), "CHUNK_SIZE", 2)
+    observer = RecordingObserver()
+    parser.parse_from_str(content, observer, jobs=2)
+    assert observer.issues == expected
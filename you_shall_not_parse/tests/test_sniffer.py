@@ -0,0 +1,45 @@
+import json
+import pytest
+from you_shall_not_parse.parser import Parser
+from you_shall_not_parse.registry import get_specs
+from you_shall_not_parse.sniffer import sniff, likely_handlers, SNIFF_SIZE
+from tests.test_parser import ExpectedObserver
+from tests.golangci_params import GOLANGCI_EXPECTED
+
+
+@pytest.mark.parametrize(
+    "file_name, handler_name",
+    [
+        ("examples/bandit.sarif", "SarifHandler"),
+        ("examples/semgrep.sarif", "SarifHandler"),
+        ("examples/complexity.csv", "LizardHandler"),
+        ("examples/mypy.xml", "MypyHandler"),
+        ("examples/empty_mypy.xml", "MypyHandler"),
+        ("examples/golangci.json", "GolangCiHandler"),
+        ("examples/npm_audit.json", "NpmHandler"),
+        ("examples/pip-audit.json", "PipAuditHandler"),
+        ("examples/poetry-audit.json", "PoetryAuditHandler"),
+        ("examples/pylint.json", "PylintHandler"),
+        ("examples/radon.json", "RadonHandler"),
+    ]
+)
+def test_sniff_routes_to_handler(file_name, handler_name) -> None:
+    with open(file_name, 'r', encoding='utf-8') as fd:
+        content = fd.read()
+    specs = likely_handlers(get_specs(), sniff(content, file_name))
+    assert [type(spec.load()).__name__ for spec in specs] == [handler_name]
+
+
+def test_sniff_unknown_content() -> None:
+    assert sniff("plain text").kind is None
+    assert not likely_handlers(get_specs(), sniff(""))
+
+
+def test_wrong_guess_falls_back_to_chain() -> None:
+    with open(GOLANGCI_EXPECTED[1], 'r', encoding='utf-8') as fd:
+        report = json.load(fd)
+    # Pushes the "Issues" key out of the sniffed prefix
+    padded = json.dumps({"Padding": "x" * SNIFF_SIZE, **report})
+    observer = ExpectedObserver(GOLANGCI_EXPECTED[0])
+    Parser().parse_from_str(padded, observer)
+    assert observer.index == len(GOLANGCI_EXPECTED[0])
@@ -0,0 +1,125 @@
+import json
+import pytest
+from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.observers.database_observer import Database
+from you_shall_not_parse.observers.sqlite_observer import SqliteDatabase, SqliteObserver
+from you_shall_not_parse.parser import Parser
+
+ISSUES = [(Severity.HIGH, "a.py", "R1", "first", 3),
+          (Severity.LOW, "a.py", "R2", "second", None),
+          (Severity.HIGH, "b.py", "R1", "third", "4:2")]
+
+QUERIES = [
+    ("SELECT severity, COUNT(*) AS amount FROM issues WHERE linter_name = :linter_name "
+     "GROUP BY severity", {"linter_name": "linter"}),
+    ("SELECT DISTINCT file_path FROM issues WHERE linter_name = :linter_name",
+     {"linter_name": "linter"}),
+    ("SELECT file_path, severity, message, location FROM issues", None),
+]
+
+
+def filled(database):
+    database.add_issue("linter", ISSUES[0])
+    database.add_issues("linter", ISSUES[1:])
+    database.add_issues("other", ISSUES[:1])
+    return database
+
+
+@pytest.mark.parametrize("query, parameters", QUERIES)
+def test_same_rows_as_database(query, parameters) -> None:
+    expected = filled(Database()).query(query, parameters)
+    assert [tuple(row) for row in filled(SqliteDatabase()).query(query, parameters)] == [
+        tuple(row) for row in expected]
+
+
+def test_rows_by_attribute() -> None:
+    rows = filled(SqliteDatabase()).query(QUERIES[0][0], QUERIES[0][1])
+    assert {(row.severity, row.amount) for row in rows} == {("HIGH", 2), ("LOW", 1)}
+    assert rows[0][0] == rows[0].severity
+
+
+def test_same_count_and_json_as_database() -> None:
+    database, sqlite_database = filled(Database()), filled(SqliteDatabase())
+    for condition in ("linter_name = 'linter'", "severity = 'HIGH'", "file_path = 'c.py'"):
+        assert sqlite_database.count(condition) == database.count(condition)
+    assert json.loads(sqlite_database.as_json()) == json.loads(database.as_json())
+
+
+def test_names_are_stored_once() -> None:
+    database = filled(SqliteDatabase())
+    assert [tuple(row) for row in database.query("SELECT * FROM files ORDER BY id")] == [
+        (1, "a.py"), (2, "b.py")]
+    assert [tuple(row) for row in database.query("SELECT * FROM linters ORDER BY id")] == [
+        (1, "linter"), (2, "other")]
+    assert [tuple(row) for row in database.query(
+        "SELECT linter_id, file_id, severity, rule_id FROM issue_rows ORDER BY id")] == [
+            (1, 1, Severity.HIGH.value, 1), (1, 1, Severity.LOW.value, 2),
+            (1, 2, Severity.HIGH.value, 1), (2, 1, Severity.HIGH.value, 1)]
+
+
+def test_reopened_file_keeps_the_ids(tmp_path) -> None:
+    filename = str(tmp_path / "issues.db")
+    filled(SqliteDatabase(filename)).close()
+    database = SqliteDatabase(filename)
+    database.add_issue("new", (Severity.NOTE, "c.py", "R1", "fourth", None))
+    database.add_issues("linter", ISSUES[1:2])
+    assert database.count("linter_name = 'linter' AND file_path = 'a.py'") == 3
+    assert [tuple(row) for row in database.query(
+        "SELECT linter_name, file_path, severity, name FROM issues WHERE id > 4")] == [
+            ("new", "c.py", "NOTE", "R1"), ("linter", "a.py", "LOW", "R2")]
+    assert len(database.query("SELECT * FROM rules")) == 2
+    database.close()
+
+
+def test_observer_keeps_one_connection() -> None:
+    observer = SqliteObserver()
+    connection = observer.get_database().connection
+    Parser().parse_from_filenames(["examples/trivy.sarif", "examples/mypy.xml"], observer)
+    database = observer.get_database()
+    assert {row[0] for row in database.query("SELECT DISTINCT linter_name FROM issues")} == {
+        "Trivy", "mypy"}
+    assert database.connection is connection
+    observer.close()
+
+
+@pytest.mark.parametrize("backend, table, index, query", [
+    (Database, "issues", "ix_issues_linter_file_severity",
+     "SELECT severity, COUNT(*) FROM issues WHERE linter_name = 'l' AND file_path = 'a.py' "
+     "GROUP BY severity"),
+    (SqliteDatabase, "issue_rows", "ix_issue_rows_linter_file_severity",
+     "SELECT severity, COUNT(*) FROM issue_rows WHERE linter_id = 1 AND file_id = 1 "
+     "GROUP BY severity"),
+])
+def test_indexes_are_built_by_the_first_query(backend, table, index, query) -> None:
+    database = filled(backend())
+    indexes = ("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table "
+               "AND sql IS NOT NULL")
+    assert [row[0] for row in database.query(indexes, {"table": table})] == [index]
+    plan = database.query(f"EXPLAIN QUERY PLAN {query}")
+    assert f"USING COVERING INDEX {index}" in plan[0][-1]
+
+
+@pytest.mark.parametrize("backend", [Database, SqliteDatabase])
+def test_database_files_are_tuned(backend, tmp_path) -> None:
+    database = backend(str(tmp_path / "issues.db"))
+    assert database.query("PRAGMA journal_mode")[0][0] == "wal"
+    assert database.query("PRAGMA synchronous")[0][0] == 1
+    assert database.query("PRAGMA temp_store")[0][0] == 2
+    database.close()
+
+
+def test_failed_flush_is_written_again(tmp_path) -> None:
+    import sqlite3
+    path = str(tmp_path / "issues.db")
+    database = SqliteDatabase(path)
+    database.connection.execute("PRAGMA busy_timeout = 0")
+    database.add_issues("linter", ISSUES)
+    locker = sqlite3.connect(path)
+    locker.execute("BEGIN EXCLUSIVE")
+    with pytest.raises(sqlite3.OperationalError):
+        database.flush()
+    locker.rollback()
+    locker.close()
+    assert [tuple(row) for row in database.query(QUERIES[2][0])] == [
+        ("a.py", "HIGH", "first", "3"), ("a.py", "LOW", "second", None),
+        ("b.py", "HIGH", "third", "4:2")]
@@ -0,0 +1,92 @@
+"""
+Parallel conversion of one report.
+
+The array a handler iterates over (the results of a SARIF run, the issues of a
+golangci report...) is cut in chunks, a pool of processes converts each chunk to
+issues and the issues come back in the order of the report. A parse shares one
+pool (see shared_pool) between all the reports it splits. A report read as a
+stream gives its chunks one after the other, see convert_stream.
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+import os
+
+from you_shall_not_parse.issue_batch import IssueBatch
+
+Items = Union[list[Any], dict[str, Any]]
+ChunkConverter = Callable[[Any], IssueBatch]
+
+# The chunks of a stream each process may have waiting (see convert_stream)
+AHEAD = 2
+
+
+def split(items: Items, size: int) -> list[Items]:
+    """Consecutive chunks of at most size elements, a dict is split by its items."""
+    size = max(1, size)
+    if isinstance(items, dict):
+        iterator = iter(items.items())
+        return [dict(chunk) for chunk in iter(lambda: list(islice(iterator, size)), [])]
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def convert(converter: ChunkConverter, items: Items, size: int, jobs: int,
+            pool: Optional[Executor] = None) -> Iterator[IssueBatch]:
+    """
+    Run the converter over the chunks of items, in a pool of jobs processes
+    (0 uses every CPU) when there is more than one chunk: the pool given, or
+    else one started for this call.
+
+    The converter must be picklable: a module level function, or a partial of one.
+    """
+    if jobs == 1 or len(items) <= size:
+        yield converter(items)
+        return
+    if pool is not None:
+        yield from pool.map(converter, split(items, size))
+        return
+    with ProcessPoolExecutor(max_workers=jobs or None) as own_pool:
+        yield from own_pool.map(converter, split(items, size))
+
+
+def convert_stream(chunks: Iterable[tuple[ChunkConverter, Any]], jobs: int,
+                   pool: Optional[Executor] = None) -> Iterator[IssueBatch]:
+    """
+    Run each converter over its chunk, for chunks only known one after the
+    other: with jobs other than 1, each chunk is sent to the pool (the one given,
+    or else one started for this call) as soon as it is read, and the next ones
+    are read meanwhile. At most AHEAD chunks per process wait for their issues,
+    which come back in order.
+    """
+    if jobs == 1:
+        for converter, chunk in chunks:
+            yield converter(chunk)
+        return
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=jobs or None) as own_pool:
+            yield from convert_stream(chunks, jobs, own_pool)
+        return
+    waiting: deque[Future[IssueBatch]] = deque()
+    limit = AHEAD * (jobs or os.cpu_count() or 1)
+    for converter, chunk in chunks:
+        waiting.append(pool.submit(converter, chunk))
+        if len(waiting) >= limit:
+            yield waiting.popleft().result()
+    while waiting:
+        yield waiting.popleft().result()
+
+
+@contextmanager
+def shared_pool(jobs: int) -> Iterator[Optional[Executor]]:
+    """
+    The pool of jobs processes a parse hands to convert, None with a single job.
+    Its processes are only started by the first report split.
+    """
+    if jobs == 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=jobs or None) as pool:
+        yield pool
@@ -0,0 +1,128 @@
+"""
+Compressed reports.
+
+Reports archived with gzip, xz or zstd are recognized by their magic bytes, not
+their name, and decompressed as a stream while handlers read them: nothing is
+written to disk and only the parts a handler keeps are held in memory. zstd
+needs the optional zstandard package (the "zstd" extra). A corrupt or cut
+report raises CompressionError once the read reaches the damage.
+"""
+from __future__ import annotations
+from typing import Any, BinaryIO, Optional, TYPE_CHECKING, cast
+import io
+
+if TYPE_CHECKING:
+    from you_shall_not_parse.document import Buffer
+
+GZIP = "gzip"
+XZ = "xz"
+ZSTD = "zstd"
+
+_MAGIC_NUMBERS = (
+    (b"\x1f\x8b", GZIP),
+    (b"\xfd7zXZ\x00", XZ),
+    (b"\x28\xb5\x2f\xfd", ZSTD),
+)
+# File name suffixes of compressed reports, the extension of the report is the one before
+SUFFIXES = (".gz", ".xz", ".zst")
+# How many times bigger a compressed report is estimated to be, when its format
+# doesn't record its size: about what JSON and XML reports get from xz
+ESTIMATED_RATIO = 10
+# The longest header of a zstd frame, where it may record the decompressed size
+_ZSTD_FRAME_HEADER = 18
+
+
+class CompressionError(ValueError):
+    pass
+
+
+def detect(buffer: Buffer) -> Optional[str]:
+    """GZIP, XZ or ZSTD when the buffer starts with their magic number, else None."""
+    head = bytes(buffer[:6])
+    for magic, compression in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_decompressed(raw: BinaryIO, compression: str) -> BinaryIO:
+    """
+    A reader of the decompressed bytes of raw, decompressing as it is read. It
+    raises CompressionError when raw is corrupt or cut.
+    """
+    # Most reports aren't compressed, they don't pay for these imports
+    # pylint:disable=import-outside-toplevel
+    reader: Any
+    if compression == GZIP:
+        import gzip
+        import zlib
+        reader = gzip.GzipFile(fileobj=raw, mode="rb")
+        errors: tuple[type[Exception], ...] = (EOFError, OSError, zlib.error)
+    elif compression == XZ:
+        import lzma
+        reader = lzma.LZMAFile(raw)
+        errors = (EOFError, lzma.LZMAError)
+    elif compression == ZSTD:
+        try:
+            import zstandard # pylint:disable=import-error
+        except ImportError as error:
+            raise CompressionError("zstd reports need the zstandard package") from error
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        errors = (zstandard.ZstdError,)
+    else:
+        raise CompressionError(f"Unknown compression {compression!r}")
+    return cast(BinaryIO, io.BufferedReader(_CheckedReader(reader, compression, errors)))
+
+
+class _CheckedReader(io.RawIOBase):
+    """The reads of a decompressor, with the errors of a damaged report as CompressionError."""
+    def __init__(self, reader: Any, compression: str,
+                 errors: tuple[type[Exception], ...]) -> None:
+        super().__init__()
+        self._reader = reader
+        self._compression = compression
+        self._errors = errors
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        try:
+            read: int = self._reader.readinto(buffer)
+        except self._errors as error:
+            raise CompressionError(f"Corrupt {self._compression} report: {error}") from error
+        return read
+
+    def close(self) -> None:
+        self._reader.close()
+        super().close()
+
+
+def estimated_size(buffer: Buffer, compression: str) -> int:
+    """
+    Size of the decompressed bytes, without decompressing them. gzip records it
+    in its trailer (modulo 4 GiB, for its last member only) and zstd usually in
+    its frame header; otherwise, and for xz, it is ESTIMATED_RATIO times the
+    compressed size. Never less than the compressed size.
+    """
+    compressed = len(buffer)
+    size = compressed * ESTIMATED_RATIO
+    if compression == GZIP and compressed >= 4:
+        size = int.from_bytes(buffer[-4:], "little")
+    elif compression == ZSTD:
+        size = _zstd_content_size(bytes(buffer[:_ZSTD_FRAME_HEADER])) or size
+    return max(size, compressed)
+
+
+def _zstd_content_size(header: bytes) -> Optional[int]:
+    # pylint:disable=import-outside-toplevel
+    try:
+        import zstandard # pylint:disable=import-error
+    except ImportError:
+        return None
+    try:
+        size: int = zstandard.frame_content_size(header)
+    except zstandard.ZstdError:
+        return None
+    # -1 when the frame doesn't record it
+    return size if size >= 0 else None
@@ -0,0 +1,226 @@
+"""
+A report together with its decoded forms.
+
+Handlers in the chain share one Document per report, so the JSON or XML tree is
+built at most once no matter how many handlers look at it.
+"""
+from __future__ import annotations
+from typing import Any, BinaryIO, Optional, Union, TYPE_CHECKING
+import io
+import json
+import mmap
+
+from you_shall_not_parse.compression import (
+    CompressionError, detect, estimated_size, open_decompressed
+)
+
+if TYPE_CHECKING:
+    # pylint:disable=import-error
+    from concurrent.futures import Executor
+    from lxml.etree import _Element
+    from you_shall_not_parse.parse_stats import ReportStats
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+_NOT_LOADED = object()
+
+# How handlers check that a report is theirs: fast only checks what they read,
+# strict validates the whole report against the schema of the format.
+FAST_VALIDATION = "fast"
+STRICT_VALIDATION = "strict"
+VALIDATIONS = (FAST_VALIDATION, STRICT_VALIDATION)
+
+
+class EntitiesForbiddenError(ValueError):
+    pass
+
+
+class Document:
+    """
+    A report given either as text or as a byte buffer (usually a memory-mapped
+    file). A buffer is only decoded to text when a handler asks for it. A
+    compressed buffer (compression is then GZIP, XZ or ZSTD) is decompressed
+    each time it is read, handlers only see the decompressed report.
+
+    jobs is how many processes a handler may use to convert this one report
+    (0 uses every CPU), in pool when the parse shares one between its reports.
+    validation is FAST_VALIDATION or STRICT_VALIDATION.
+    stats records the handlers tried on the report when the parse has stats.
+    """
+    # pylint:disable=too-many-instance-attributes
+    def __init__(self, content: Union[str, Buffer], filename: str = "", jobs: int = 1,
+                 validation: str = FAST_VALIDATION) -> None:
+        if validation not in VALIDATIONS:
+            raise ValueError(f"Unknown validation {validation!r}, expected one of {VALIDATIONS}")
+        self.filename = filename
+        self.jobs = jobs
+        self.pool: Optional[Executor] = None
+        self.validation = validation
+        self.stats: Optional[ReportStats] = None
+        self._text: Optional[str] = None
+        self._buffer: Optional[Buffer] = None
+        self.compression: Optional[str] = None
+        self._size: Optional[int] = None
+        if isinstance(content, str):
+            self._text = content
+        else:
+            self._buffer = content
+            self.compression = detect(content)
+        self._json: Any = _NOT_LOADED
+        self._json_error: Optional[ValueError] = None
+        self._xml: Optional[_Element] = None
+        self._xml_error: Optional[Exception] = None
+
+    @property
+    def text(self) -> str:
+        """The whole report decoded as UTF-8, kept once decoded."""
+        if self._text is None:
+            self._text = self._decode()
+        return self._text
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the report, in bytes for buffers and in characters for text. The
+        size of a compressed report is an estimate of the decompressed one (see
+        estimated_size): counting it would decompress the whole report once more.
+        """
+        if self._buffer is None:
+            return len(self.text)
+        if self.compression is None:
+            return len(self._buffer)
+        if self._size is None:
+            self._size = estimated_size(self._buffer, self.compression)
+        return self._size
+
+    def longer_than(self, size: int) -> bool:
+        """
+        Whether the report has more than size bytes (or characters), exactly:
+        a compressed report is decompressed up to size + 1 bytes at most.
+        """
+        if self._buffer is None or self.compression is None:
+            return self.size > size
+        with self.stream() as stream:
+            return len(stream.read(size + 1)) > size
+
+    def head(self, size: int) -> str:
+        """
+        The first size bytes (or characters) of the report, as text. Empty for
+        a compressed report that is damaged there.
+        """
+        if self._buffer is None:
+            return self.text[:size]
+        if self.compression is None:
+            return self._buffer[:size].decode("utf-8", "ignore")
+        try:
+            with self.stream() as stream:
+                return stream.read(size).decode("utf-8", "ignore")
+        except CompressionError:
+            return ""
+
+    def stream(self) -> BinaryIO:
+        """The report as UTF-8 bytes, read in chunks without copying the whole report."""
+        if self._buffer is None:
+            return io.BufferedReader(_EncodedText(self.text))
+        if self.compression is None:
+            return _read_buffer(self._buffer)
+        return open_decompressed(_read_buffer(self._buffer), self.compression)
+
+
+    @property
+    def json(self) -> Any:
+        """
+        The decoded JSON tree. Raises json.JSONDecodeError if the report is not
+        JSON, or is compressed and can't be decompressed.
+        """
+        if self._json is _NOT_LOADED and self._json_error is None:
+            try:
+                # The text is only needed while decoding, unless a handler already kept it
+                self._json = json.loads(self._text if self._text is not None else self._decode())
+            except (json.JSONDecodeError, UnicodeDecodeError, CompressionError) as error:
+                self._json_error = _as_json_error(error)
+        if self._json_error is not None:
+            raise self._json_error
+        return self._json
+
+    @property
+    def xml(self) -> _Element:
+        """The root of the XML tree. Raises ValueError or XMLSyntaxError if it can't be parsed."""
+        if self._xml is None:
+            if self._xml_error is not None:
+                raise self._xml_error
+            try:
+                self._xml = _parse_xml(self.stream())
+            except Exception as error:
+                self._xml_error = error
+                raise
+        return self._xml
+
+    def _decode(self) -> str:
+        if self._buffer is None:
+            return ""
+        if self.compression is not None:
+            with self.stream() as stream:
+                return str(stream.read(), "utf-8")
+        return str(self._buffer, "utf-8")
+
+
+class _BufferReader(io.RawIOBase):
+    def __init__(self, buffer: Buffer) -> None:
+        super().__init__()
+        self._buffer = buffer
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        # Slicing copies the chunk, so no pointer into an mmap outlives the read
+        chunk = self._buffer[self._offset:self._offset + len(buffer)]
+        self._offset += len(chunk)
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class _EncodedText(io.RawIOBase):
+    def __init__(self, text: str) -> None:
+        super().__init__()
+        self._text = text
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        # A character takes at most 4 bytes in UTF-8, so the chunk always fits
+        chunk = self._text[self._offset:self._offset + max(1, len(buffer) // 4)]
+        self._offset += len(chunk)
+        encoded = chunk.encode("utf-8", "surrogatepass")
+        buffer[:len(encoded)] = encoded
+        return len(encoded)
+
+
+def _read_buffer(buffer: Buffer) -> BinaryIO:
+    return io.BufferedReader(_BufferReader(buffer))
+
+
+def _as_json_error(error: ValueError) -> json.JSONDecodeError:
+    if isinstance(error, json.JSONDecodeError):
+        return error
+    return json.JSONDecodeError(str(error), "", 0)
+
+
+def _parse_xml(stream: BinaryIO) -> _Element:
+    # lxml is only imported once a report is read as XML
+    # pylint:disable=import-error,import-outside-toplevel
+    from lxml.etree import XMLParser, parse as lxml_parse # nosec
+    # Same protections defusedxml gives by default: no network access, entities are
+    # never expanded and documents declaring entities are refused. huge_tree lifts
+    # the 10 MB limit of text nodes, a mypy report has all its messages in one.
+    parser = XMLParser(resolve_entities=False, no_network=True, load_dtd=False, huge_tree=True)
+    root = lxml_parse(stream, parser).getroot() # nosec
+    dtd = root.getroottree().docinfo.internalDTD
+    # lxml-stubs lacks DTD.iterentities
+    if dtd is not None and any(True for _ in dtd.iterentities()): # type: ignore[union-attr]
+        raise EntitiesForbiddenError("Entity declarations are not allowed in reports")
+    return root
@@ -1,20 +1,29 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Optional, Collection, List
+from functools import cache, partial
+from typing import Any, ClassVar, Iterable, Iterator, Optional, Collection, TYPE_CHECKING
 import json
 import os
 from pathlib import Path
-from xml.etree.ElementTree import Element  # nosec
 from jsonschema import validate, ValidationError
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 
 # pylint:disable=import-error
 import jmespath
-from defusedxml import ElementTree as ET  # type: ignore
-from lxml.etree import XMLSchema, parse as lxml_parse, fromstring # nosec
 
+if TYPE_CHECKING:
+    from lxml.etree import XMLSchema
 
 from you_shall_not_parse.base_classes import Severity, IssueTupleType
 from you_shall_not_parse.observer import Observer
+from you_shall_not_parse.document import Document, STRICT_VALIDATION
+from you_shall_not_parse.compression import CompressionError
+from you_shall_not_parse.issue_batch import IssueBatch
+from you_shall_not_parse.junit_stream import read_failures
+from you_shall_not_parse.parse_stats import start_attempt
+from you_shall_not_parse import chunks
+from you_shall_not_parse.native_query import Search, compile_query
 
 SearchedType = list["IssueType"]
 IssueType = list[str]
@@ -37,8 +46,24 @@ class ParserHandler(ABC):
         pass
 
     @abstractmethod
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
-        pass
+    def handle(self, request: str, observer: Observer,
+               document: Optional[Document] = None) -> ReturnHandleType:
+        """
+        The document holds the decoded forms of the request, it is shared along
+        the chain so the request is decoded only once. When a document is given
+        the request isn't read, it may be empty.
+        """
+
+    def settings(self) -> str:
+        """
+        The configuration changing the issues of the handler (thresholds...), as
+        text, empty while it is the default one. Part of the parse cache keys.
+        """
+        return ""
+
+    @abstractmethod
+    def try_handle(self, document: Document, observer: Observer) -> bool:
+        """Parse the document only if this handler understands it, without using the chain."""
 
 
 class ParserHandlerImplementation(ParserHandler):
@@ -54,41 +79,99 @@ class ParserHandlerImplementation(ParserHandler):
         self._next_handler = handler
         return handler
 
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
+    def handle(self, request: str, observer: Observer,
+               document: Optional[Document] = None) -> ReturnHandleType:
+        if document is None:
+            document = Document(request)
+        if self.try_handle(document, observer):
+            return None
         if self._next_handler:
-            return self._next_handler.handle(request, observer)
+            return self._next_handler.handle(request, observer, document)
         return None
 
+    def try_handle(self, document: Document, observer: Observer) -> bool:
+        attempt = start_attempt(document, self)
+        try:
+            accepted = self.accepts(document)
+        except CompressionError:
+            # A damaged compressed report is no more readable than one in another format
+            accepted = False
+        attempt.validated()
+        if not accepted:
+            return False
+        self.observer = observer
+        try:
+            self.parse(document)
+        except CompressionError:
+            return False
+        attempt.extracted()
+        return True
+
+    def accepts(self, document: Document) -> bool:
+        # pylint:disable=unused-argument
+        return False
+
+    def parse(self, document: Document) -> None:
+        pass
+
 
 class JmespathParserHandler(ParserHandlerImplementation):
     SCHEMA_FILENAME: str = ""
     JMESPATHQUERY: str = ""
     LINTER_NAME: str = ""
     OPTIONS: Optional[jmespath.Options] = None
-
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
-        schema = load_schema(self.SCHEMA_FILENAME)
-        self.observer = observer
-        if not validate_schema(request, schema):
-            return super().handle(request, observer)
-        self._parse(request)
-        return None
+    # Top level key the query projects element by element. Big reports are split
+    # there and converted in parallel, an empty key never splits.
+    SPLIT_KEY: str = ""
+    CHUNK_SIZE: int = 10000
+    # The query compiled once per class, to Python when it can be
+    _search_query: ClassVar[Optional[Search]] = None
+    _compiled_query: ClassVar[Optional[jmespath.parser.ParsedResult]] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.JMESPATHQUERY:
+            cls._search_query = compile_query(cls.JMESPATHQUERY, cls.OPTIONS)
+            cls._compiled_query = jmespath.compile(cls.JMESPATHQUERY)
+
+    def accepts(self, document: Document) -> bool:
+        return matches_schema(document, self.SCHEMA_FILENAME)
 
     @abstractmethod
     def parse_level(self, level: str) -> Severity:
         raise NotImplementedError
 
-    def _parse(self, request: str) -> None:
-        json_loaded = json.loads(request)
-        compiled = jmespath.compile(self.JMESPATHQUERY)
-        result = compiled.search(json_loaded, options=self.OPTIONS)
-        return self._check_vuln(result)
+    def parse(self, document: Document) -> None:
+        tree = document.json
+        items = tree.get(self.SPLIT_KEY) if self.SPLIT_KEY and isinstance(tree, dict) else None
+        if document.jobs == 1 or not isinstance(items, (list, dict)):
+            self._check_vuln(self._search(tree))
+            return
+        converter = partial(_convert_chunk, type(self), self.SPLIT_KEY)
+        for issues in chunks.convert(converter, items, self.CHUNK_SIZE, document.jobs,
+                                     document.pool):
+            self.observer.add_issues(self.LINTER_NAME, issues)
+
+    def _search(self, tree: Any) -> SearchedType:
+        result: SearchedType
+        # Read from the class, a function stored there would be bound to self
+        search = type(self)._search_query
+        if search is not None:
+            result = search(tree)
+        elif self._compiled_query is not None:
+            result = self._compiled_query.search(tree, options=self.OPTIONS)
+        else:
+            result = jmespath.search(self.JMESPATHQUERY, tree, options=self.OPTIONS)
+        return result
 
     def _check_vuln(self, vuln: SearchedType) -> None:
+        self.observer.add_issues(self.LINTER_NAME, self._get_issues(vuln))
+
+    def _get_issues(self, vuln: SearchedType) -> Iterator[IssueTupleType]:
         for issue in vuln:
             res = self._get_issue(issue)
             if res:
-                self.observer.add_issue(self.LINTER_NAME, res)
+                yield res
 
     def _get_issue(self, issue: list[str]) -> Optional[IssueTupleType]:
         if issue:
@@ -103,51 +186,66 @@ class JmespathParserHandler(ParserHandlerImplementation):
         return None
 
 
+def _convert_chunk(handler_class: type[JmespathParserHandler], key: str,
+                   chunk: chunks.Items) -> IssueBatch:
+    """Runs in the pool workers: the issues of one chunk of the split key."""
+    handler = handler_class()
+    return IssueBatch(handler.LINTER_NAME,
+                      handler._get_issues(handler._search({key: chunk}))) # pylint:disable=protected-access
+
+
 class JunitHandler(ParserHandlerImplementation):
+    """
+    Unless the validation is strict, the report is read in a single streamed
+    pass that checks its structure and collects the failures, whose issues are
+    only sent to the observer once the whole report turned out to be JUnit XML.
+    """
     linter_name: str = ""
 
     def __init__(self) -> None:
-        schema_doc = lxml_parse( # nosec
-            os.path.join(Path(__file__).parent, "schemas/junit_schema.xsd")
-        )
-        self._schema = XMLSchema(schema_doc.getroot())
+        self._schema = get_xml_schema("junit_schema.xsd")
 
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
+    def try_handle(self, document: Document, observer: Observer) -> bool:
+        if document.validation == STRICT_VALIDATION:
+            return super().try_handle(document, observer)
+        attempt = start_attempt(document, self)
+        try:
+            # Only the texts are kept, they are smaller than the issues and
+            # cheaper to hold for the garbage collector
+            failures = list(read_failures(document.stream()))
+        except ValueError:
+            attempt.validated()
+            return False
+        attempt.validated()
         self.observer = observer
-        if self._is_junit_xml(request):
-            self.parse(request)
-            return None
-        return super().handle(request, observer)
+        self.observer.add_issues(self.linter_name, self._get_issues(failures))
+        attempt.extracted()
+        return True
 
-    def _is_junit_xml(self, request: str) -> bool:
+    def accepts(self, document: Document) -> bool:
+        return self._is_junit_xml(document)
+
+    def _is_junit_xml(self, document: Document) -> bool:
         # pylint:disable=broad-exception-caught
         try:
-            root = fromstring(request.encode("utf-8")) # nosec
-            return self._schema.validate(root)
+            return self._schema.validate(document.xml)
         except Exception as _:
             return False
 
-    def parse(self, request: str) -> None:
-        root = ET.fromstring(request)
-        for elem in root.iter("testcase"):
-            self._process_testcases(elem)
-
-    def _process_testcases(self, root: Element) -> None:
-        for testcase in root.iter("testcase"):
-            self._process_failures(testcase)
-
-    def _process_failures(self, testcase: Element) -> None:
-        for failure in testcase.iter("failure"):
-            self._process_messages(failure)
+    def parse(self, document: Document) -> None:
+        failures = (failure.text or "" for failure in document.xml.iter("failure"))
+        self.observer.add_issues(self.linter_name, self._get_issues(failures))
 
-    def _process_messages(self, failure: Element) -> None:
-        messages: List[str] = failure.text.split("\n") if failure.text else []
-        for message in messages:
-            self._process_message(message)
+    def _get_issues(self, failures: Iterable[str]) -> Iterator[IssueTupleType]:
+        for failure in failures:
+            for message in failure.split("\n"):
+                issue = self._get_issue(message)
+                if issue is not None:
+                    yield issue
 
     @abstractmethod
-    def _process_message(self, message: str) -> None:
-        pass
+    def _get_issue(self, message: str) -> Optional[IssueTupleType]:
+        """The issue of one line of a failure, None if the line isn't an issue."""
 
 
 def validate_schema(request: str, schema: Optional[SchemaType]) -> bool:
@@ -162,6 +260,55 @@ def validate_schema(request: str, schema: Optional[SchemaType]) -> bool:
     return result
 
 
+def matches_schema(document: Document, schema_filename: str) -> bool:
+    """Like validate_schema, but with the compiled validator kept in the process-wide cache."""
+    validator = get_json_validator(schema_filename)
+    if validator is None:
+        return False
+    try:
+        return validator.is_valid(document.json)
+    except json.JSONDecodeError:
+        return False
+
+
+@cache
+def get_json_validator(schema_filename: str) -> Optional[Validator]:
+    """Compile a bundled JSON schema once per process.
+
+    Formats are not asserted, as with `jsonschema.validate`.
+    """
+    schema = load_schema(schema_filename)
+    if schema is None:
+        return None
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    validator: Validator = validator_class(schema)
+    return validator
+
+
+@cache
+def get_xml_schema(schema_filename: str) -> XMLSchema:
+    """Compile a bundled XSD once per process."""
+    # lxml is only imported by the XML handlers
+    # pylint:disable=import-error,import-outside-toplevel
+    from lxml.etree import XMLSchema, parse as lxml_parse # nosec
+    schema_doc = lxml_parse(os.path.join(_schemas_path(), schema_filename)) # nosec
+    return XMLSchema(schema_doc.getroot())
+
+
+def warm_schema_cache() -> None:
+    """Compile every bundled schema, so no parse has to read a schema file afterwards."""
+    for schema_filename in sorted(os.listdir(_schemas_path())):
+        if schema_filename.endswith(".json"):
+            get_json_validator(schema_filename)
+        elif schema_filename.endswith(".xsd"):
+            get_xml_schema(schema_filename)
+
+
+def _schemas_path() -> str:
+    return os.path.join(Path(__file__).parent, "schemas/")
+
+
 def load_schema(schema_path: str) -> Optional[SchemaType]:
     """Load the JSON schema at the given path as a Python object.
 
@@ -173,11 +320,9 @@ def load_schema(schema_path: str) -> Optional[SchemaType]:
 
     """
     schema: Optional[SchemaType] = None
-    current_path = Path(__file__).parent
-    schemas_path = os.path.join(current_path, "schemas/")
     try:
         with open(
-            os.path.join(schemas_path, schema_path), "r", encoding="utf-8"
+            os.path.join(_schemas_path(), schema_path), "r", encoding="utf-8"
         ) as schema_file:
             schema = json.load(schema_file)
     except ValueError as error:
@@ -0,0 +1,132 @@
+"""
+Compact storage for many issues of one linter.
+
+An IssueBatch keeps its issues column by column instead of as one tuple each:
+severities and line numbers are machine integers in arrays, file paths and rule
+ids are stored once per batch (and interned) and referenced by index. Iterating
+a batch gives back the same tuples that were added, so a batch can be passed
+wherever an iterable of IssueTupleType is expected, like Observer.add_issues.
+"""
+from __future__ import annotations
+from array import array
+from typing import Any, Hashable, Iterable, Iterator
+import sys
+
+from you_shall_not_parse.base_classes import IssueTupleType, Severity
+
+_SEVERITIES = {severity.value: severity for severity in Severity}
+
+# How the location of an issue is stored
+_LINE = 0        # an int, kept in _lines
+_LINE_TEXT = 1   # a line number as text ("12"), kept as an int in _lines
+_OTHER = 2       # anything else, kept as is in _other_locations
+
+# Types are compared with type() on purpose: True isn't stored as line 1, nor
+# a str subclass as a plain str
+# pylint:disable=unidiomatic-typecheck
+
+_MIN_LINE = -2 ** 63
+_MAX_LINE = 2 ** 63 - 1
+
+
+class IssueBatch:
+    """Issues of one linter, in the order they were added."""
+    # pylint:disable=too-many-instance-attributes
+    __slots__ = ("linter_name", "_severities", "_paths", "_path_ids", "_rules", "_rule_ids",
+                 "_messages", "_lines", "_location_kinds", "_other_locations")
+
+    def __init__(self, linter_name: str, issues: Iterable[IssueTupleType] = ()) -> None:
+        self.linter_name = sys.intern(linter_name)
+        self._severities = array("B")
+        self._paths = _StringTable()
+        self._path_ids = array("I")
+        self._rules = _StringTable()
+        self._rule_ids = array("I")
+        self._messages: list[Any] = []
+        self._lines = array("q")
+        self._location_kinds = array("B")
+        self._other_locations: dict[int, Any] = {}
+        self.extend(issues)
+
+    def append(self, issue: IssueTupleType) -> None:
+        severity, path, rule, message, location = issue
+        self._severities.append(severity.value)
+        self._path_ids.append(self._paths.encode(path))
+        self._rule_ids.append(self._rules.encode(rule))
+        self._messages.append(message)
+        self._append_location(location)
+
+    def extend(self, issues: Iterable[IssueTupleType]) -> None:
+        for issue in issues:
+            self.append(issue)
+
+    def _append_location(self, location: Any) -> None:
+        kind, line = _OTHER, 0
+        if type(location) is int and _MIN_LINE <= location <= _MAX_LINE:
+            kind, line = _LINE, location
+        elif type(location) is str and location.isdecimal() and location.isascii():
+            line = int(location)
+            # Only when the text comes back the same ("012" doesn't)
+            if str(line) == location and line <= _MAX_LINE:
+                kind = _LINE_TEXT
+        if kind == _OTHER:
+            self._other_locations[len(self._lines)] = location
+            line = 0
+        self._lines.append(line)
+        self._location_kinds.append(kind)
+
+    def _location(self, index: int) -> Any:
+        kind = self._location_kinds[index]
+        if kind == _LINE:
+            return self._lines[index]
+        if kind == _LINE_TEXT:
+            return str(self._lines[index])
+        return self._other_locations[index]
+
+    def __len__(self) -> int:
+        return len(self._severities)
+
+    def __iter__(self) -> Iterator[IssueTupleType]:
+        paths = self._paths.values
+        rules = self._rules.values
+        for index, severity in enumerate(self._severities):
+            yield (
+                _SEVERITIES[severity],
+                paths[self._path_ids[index]],
+                rules[self._rule_ids[index]],
+                self._messages[index],
+                self._location(index),
+            )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IssueBatch):
+            return NotImplemented
+        return self.linter_name == other.linter_name and list(self) == list(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"IssueBatch({self.linter_name!r}, {len(self)} issues)"
+
+
+class _StringTable:
+    """Each distinct value stored once, referenced by its index."""
+    # pylint:disable=too-few-public-methods
+    __slots__ = ("values", "_indexes")
+
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self._indexes: dict[Hashable, int] = {}
+
+    def encode(self, value: Any) -> int:
+        # 1, 1.0 and True are equal keys, other types are told apart
+        key = value if type(value) is str else (type(value), value)
+        try:
+            return self._indexes[key]
+        except KeyError:
+            index = self._indexes[key] = len(self.values)
+        except TypeError:
+            # Unhashable values aren't shared
+            index = len(self.values)
+        self.values.append(sys.intern(value) if type(value) is str else value)
+        return index
@@ -0,0 +1,92 @@
+"""
+Incremental reading of JUnit XML reports.
+
+The report is walked once with lxml iterparse: every element is checked against
+the JUnit structure as soon as it ends, the text of each failure is handed out
+then, and finished test cases and suites are cleared, so memory doesn't grow
+with the number of test cases. The parser has the same protections as
+Document.xml: no network access, entities are never expanded and documents
+declaring entities are refused.
+"""
+from __future__ import annotations
+from typing import Any, BinaryIO, Iterator
+
+from you_shall_not_parse.document import EntitiesForbiddenError
+
+
+class InvalidJunitError(ValueError):
+    pass
+
+
+# Elements allowed in each element, as in junit_schema.xsd
+_CHILDREN: dict[str, frozenset[str]] = {
+    "testsuites": frozenset({"testsuite"}),
+    "testsuite": frozenset({"properties", "testcase", "system-out", "system-err"}),
+    "properties": frozenset({"property"}),
+    "testcase": frozenset({"skipped", "error", "failure", "system-out", "system-err"}),
+}
+_ROOTS = frozenset({"testsuites", "testsuite"})
+_REQUIRED_ATTRIBUTES: dict[str, tuple[str, ...]] = {
+    "testsuite": ("name", "tests"),
+    "testcase": ("name",),
+    "property": ("name", "value"),
+}
+# Finished elements that are dropped from the tree
+_CLEARED = frozenset({"testcase", "testsuite"})
+
+
+def read_failures(stream: BinaryIO) -> Iterator[str]:
+    """
+    Yield the text of every failure in document order. Raises InvalidJunitError
+    when the report isn't JUnit XML, maybe after some failures were yielded.
+    """
+    # lxml is only imported once a report is read as XML
+    # pylint:disable=import-error,import-outside-toplevel
+    from lxml.etree import LxmlError, iterparse # nosec
+    # huge_tree: mypy writes all its messages in one failure, often over the 10 MB
+    # libxml2 allows in a text node. Entities are refused anyway.
+    events = iterparse(stream, resolve_entities=False, no_network=True, load_dtd=False, # nosec
+                       huge_tree=True)
+    entities_checked = False
+    try:
+        for _, element in events:
+            if not entities_checked:
+                _refuse_entities(element)
+                entities_checked = True
+            _check_element(element)
+            if element.tag == "failure":
+                yield element.text or ""
+            elif element.tag in _CLEARED:
+                _clear(element)
+    except LxmlError as error:
+        raise InvalidJunitError(str(error)) from error
+
+
+def _refuse_entities(element: Any) -> None:
+    dtd = element.getroottree().docinfo.internalDTD
+    if dtd is not None and any(True for _ in dtd.iterentities()):
+        raise EntitiesForbiddenError("Entity declarations are not allowed in reports")
+
+
+def _check_element(element: Any) -> None:
+    parent = element.getparent()
+    if parent is None:
+        if element.tag not in _ROOTS:
+            raise InvalidJunitError(f"Unexpected root element {element.tag!r}")
+    elif element.tag not in _CHILDREN.get(parent.tag, ()):
+        raise InvalidJunitError(f"Unexpected element {element.tag!r} in {parent.tag!r}")
+    elif parent.getparent() is None and parent.tag not in _ROOTS:
+        # The root is only checked when it ends, its children tell it early
+        raise InvalidJunitError(f"Unexpected root element {parent.tag!r}")
+    for attribute in _REQUIRED_ATTRIBUTES.get(element.tag, ()):
+        if attribute not in element.attrib:
+            raise InvalidJunitError(f"Missing attribute {attribute!r} in {element.tag!r}")
+
+
+def _clear(element: Any) -> None:
+    element.clear()
+    # The cleared siblings before it are still referenced by the parent
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
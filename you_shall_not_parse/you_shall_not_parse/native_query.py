@@ -0,0 +1,198 @@
+"""
+JMESPath queries turned into plain Python functions.
+
+The parsed query is compiled once into nested closures, so running it over a
+report doesn't go through the jmespath tree interpreter for each element. Only
+the expressions handlers use are supported (fields, projections, flatten,
+filters, multiselects, pipes and functions), the results are the same as
+jmespath.search. Any other query is left to jmespath.
+"""
+from __future__ import annotations
+from typing import Any, Callable, MutableMapping, Optional, cast
+
+# pylint:disable=import-error
+import jmespath
+from jmespath.functions import Functions, REVERSE_TYPES_MAP
+
+Search = Callable[[Any], Any]
+ParsedNode = dict[str, Any]
+
+
+class UnsupportedQueryError(ValueError):
+    pass
+
+
+def compile_query(query: str, options: Optional[jmespath.Options] = None) -> Optional[Search]:
+    """The query as a Python function, None if it uses expressions not supported here."""
+    try:
+        return _Compiler(options).compile(cast(ParsedNode, jmespath.compile(query).parsed))
+    except UnsupportedQueryError:
+        return None
+
+
+class _Compiler:
+    # pylint:disable=too-few-public-methods
+    def __init__(self, options: Optional[jmespath.Options]) -> None:
+        self._functions: Functions = Functions()
+        self._dict_cls: Callable[[], MutableMapping[str, Any]] = dict
+        if options is not None:
+            if options.custom_functions is not None:
+                self._functions = options.custom_functions
+            if options.dict_cls is not None:
+                self._dict_cls = options.dict_cls
+
+    def compile(self, node: ParsedNode) -> Search:
+        compile_node = getattr(self, f"_compile_{node['type']}", None)
+        if compile_node is None:
+            raise UnsupportedQueryError(node["type"])
+        search: Search = compile_node(node)
+        return search
+
+    def _children(self, node: ParsedNode) -> list[Search]:
+        return [self.compile(child) for child in node["children"]]
+
+    def _compile_field(self, node: ParsedNode) -> Search:
+        key = node["value"]
+        return lambda value: value.get(key) if isinstance(value, dict) else None
+
+    def _compile_identity(self, node: ParsedNode) -> Search:
+        # pylint:disable=unused-argument
+        return lambda value: value
+
+    _compile_current = _compile_identity
+
+    def _compile_literal(self, node: ParsedNode) -> Search:
+        literal = node["value"]
+        return lambda value: literal
+
+    def _compile_subexpression(self, node: ParsedNode) -> Search:
+        children = self._children(node)
+        if len(children) == 2:
+            first, second = children
+            return lambda value: second(first(value))
+
+        def chain(value: Any) -> Any:
+            for child in children:
+                value = child(value)
+            return value
+        return chain
+
+    _compile_pipe = _compile_subexpression
+    _compile_index_expression = _compile_subexpression
+
+    def _compile_key_val_pair(self, node: ParsedNode) -> Search:
+        return self.compile(node["children"][0])
+
+    def _compile_flatten(self, node: ParsedNode) -> Search:
+        base = self.compile(node["children"][0])
+
+        def flatten(value: Any) -> Any:
+            elements = base(value)
+            if not isinstance(elements, list):
+                return None
+            merged: list[Any] = []
+            for element in elements:
+                if isinstance(element, list):
+                    merged.extend(element)
+                else:
+                    merged.append(element)
+            return merged
+        return flatten
+
+    def _compile_projection(self, node: ParsedNode) -> Search:
+        base, project = self._children(node)
+
+        def projection(value: Any) -> Any:
+            elements = base(value)
+            if not isinstance(elements, list):
+                return None
+            return [current for current in map(project, elements) if current is not None]
+        return projection
+
+    def _compile_value_projection(self, node: ParsedNode) -> Search:
+        base, project = self._children(node)
+
+        def value_projection(value: Any) -> Any:
+            elements = base(value)
+            if not isinstance(elements, dict):
+                return None
+            return [current for current in map(project, elements.values()) if current is not None]
+        return value_projection
+
+    def _compile_filter_projection(self, node: ParsedNode) -> Search:
+        base, project, condition = self._children(node)
+
+        def filter_projection(value: Any) -> Any:
+            elements = base(value)
+            if not isinstance(elements, list):
+                return None
+            collected = []
+            for element in elements:
+                if not _is_false(condition(element)):
+                    current = project(element)
+                    if current is not None:
+                        collected.append(current)
+            return collected
+        return filter_projection
+
+    def _compile_multi_select_list(self, node: ParsedNode) -> Search:
+        children = self._children(node)
+        return lambda value: None if value is None else [child(value) for child in children]
+
+    def _compile_multi_select_dict(self, node: ParsedNode) -> Search:
+        children = [(child["value"], self.compile(child)) for child in node["children"]]
+        dict_cls = self._dict_cls
+
+        def multi_select_dict(value: Any) -> Any:
+            if value is None:
+                return None
+            collected = dict_cls()
+            for key, child in children:
+                collected[key] = child(value)
+            return collected
+        return multi_select_dict
+
+    def _compile_function_expression(self, node: ParsedNode) -> Search:
+        name = node["value"]
+        arguments = self._children(node)
+        functions = self._functions
+        spec = functions.FUNCTION_TABLE.get(name)
+        if spec is None:
+            raise UnsupportedQueryError(name)
+        allowed = _allowed_types(spec["signature"], len(arguments))
+
+        def function_expression(value: Any) -> Any:
+            resolved = [argument(value) for argument in arguments]
+            if allowed is not None and all(
+                    types is None or type(argument).__name__ in types
+                    for argument, types in zip(resolved, allowed)):
+                return spec["function"](functions, *resolved)
+            # jmespath checks the arguments and raises its own errors
+            return functions.call_function(name, resolved)
+        return function_expression
+
+
+def _allowed_types(signature: Any, arity: int) -> Optional[list[Optional[set[str]]]]:
+    """
+    Python type names accepted by each argument, None when the arguments need
+    more checks than that (arity, variadic or typed arrays) and the call goes
+    through jmespath.
+    """
+    if len(signature) != arity or any(argument.get("variadic") for argument in signature):
+        return None
+    allowed: list[Optional[set[str]]] = []
+    for argument in signature:
+        types = argument.get("types")
+        if not types:
+            allowed.append(None)
+        elif any("-" in jmespath_type for jmespath_type in types):
+            return None
+        else:
+            allowed.append({name for jmespath_type in types
+                            for name in REVERSE_TYPES_MAP[jmespath_type]})
+    return allowed
+
+
+def _is_false(value: Any) -> bool:
+    # JMESPath truth values: 0 is true, empty containers and strings are false
+    return value == '' or value == [] or value == {} or value is None or value is False
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Iterable
 from you_shall_not_parse.base_classes import IssueTupleType
 
 
@@ -8,3 +9,19 @@ class Observer(ABC):
     @abstractmethod
     def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
         pass
+
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        """
+        Add a batch of issues of one linter, in order. Handlers call it with
+        chunks of a report, the issues are consumed before it returns.
+
+        It falls back to add_issue, observers override it to store a whole batch at once.
+        """
+        for issue in issues:
+            self.add_issue(linter_name, issue)
+
+    def flush(self) -> None:
+        """
+        The parser calls it once every issue of a parse was added, observers
+        buffering issues write them then.
+        """
@@ -0,0 +1,39 @@
+from __future__ import annotations
+from typing import Iterable
+# pylint:disable=import-error
+from overrides import overrides
+from you_shall_not_parse.observer import Observer
+from you_shall_not_parse.base_classes import IssueTupleType
+from you_shall_not_parse.issue_batch import IssueBatch
+
+IssueBatches = list[IssueBatch]
+
+
+class BatchObserver(Observer):
+    """
+    Keeps the issues grouped in batches of consecutive issues of the same linter,
+    so they can be sent to another process and replayed into any observer.
+    """
+    def __init__(self) -> None:
+        self.batches: IssueBatches = []
+
+    @overrides(check_signature=False)
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        self._last_batch(linter_name).append(issue)
+
+    @overrides(check_signature=False)
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        self._last_batch(linter_name).extend(issues)
+
+    def _last_batch(self, linter_name: str) -> IssueBatch:
+        if not self.batches or self.batches[-1].linter_name != linter_name:
+            self.batches.append(IssueBatch(linter_name))
+        return self.batches[-1]
+
+    def replay(self, observer: Observer) -> None:
+        replay_batches(self.batches, observer)
+
+
+def replay_batches(batches: IssueBatches, observer: Observer) -> None:
+    for batch in batches:
+        observer.add_issues(batch.linter_name, batch)
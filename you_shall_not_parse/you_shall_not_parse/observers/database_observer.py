@@ -1,16 +1,19 @@
 from __future__ import annotations
-from typing import Optional, Any
+from itertools import islice
+from typing import Iterable, Optional, Any
 import json
 # pylint:disable=import-error
 from overrides import overrides
 # pylint:disable=import-error
 import sqlalchemy as sa
 from sqlalchemy import func
+from sqlalchemy.pool import StaticPool
 # mypy: disable_error_code="attr-defined, misc"
 # Mypy saying DeclarativeBase isn't in sqlalchemy.orm. This should be an issue of an old version
 # sqlalchemy stubs deprecated, missing types for DeclarativeBase
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from you_shall_not_parse.observer import Observer
+from you_shall_not_parse.observers.sqlite_observer import FILE_PRAGMAS
 from you_shall_not_parse.base_classes import Severity, IssueTupleType
 
 
@@ -33,35 +36,83 @@ class Issue(Base):
 
 
 class Database:
+    """
+    Issues are buffered and written INSERT_CHUNK rows at a time, each chunk with
+    a single executemany in its own transaction. The rows still buffered are
+    written by flush, which the queries call first, and by close.
+
+    The _INDEXES are built by the first query, after the bulk load, and the
+    database files get the FILE_PRAGMAS, like SqliteDatabase.
+    """
+    INSERT_CHUNK = 10000
+
     def __init__(self, filename: Optional[str] = None) -> None:
         if filename:
             self.engine = sa.create_engine(f'sqlite:///{filename}')
+            sa.event.listen(self.engine, "connect", _set_file_pragmas)
         else:
-            self.engine = sa.create_engine('sqlite:///:memory:')
+            # One connection for every thread: the database is the same whichever
+            # thread uses it, or the garbage collector closes it from
+            self.engine = sa.create_engine('sqlite:///:memory:', poolclass=StaticPool,
+                                           connect_args={"check_same_thread": False})
 
         Base.metadata.create_all(self.engine)
         self.session = sessionmaker(bind=self.engine)
+        self._pending: list[RowType] = []
+        self._indexed = False
 
     def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
-        session = self.session()
-        session.add(Issue(linter_name=linter_name,
-                          severity=issue[0].name,
-                          file_path=issue[1],
-                          name=issue[2],
-                          message=issue[3],
-                          location=issue[4]))
-        session.commit()
+        self._pending.append(_as_row(linter_name, issue))
+        if len(self._pending) >= self.INSERT_CHUNK:
+            self.flush()
+
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        remaining = iter(issues)
+        while True:
+            self._pending.extend(_as_row(linter_name, issue) for issue in
+                                 islice(remaining, self.INSERT_CHUNK - len(self._pending)))
+            if len(self._pending) < self.INSERT_CHUNK:
+                return
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered issues, in one transaction."""
+        if not self._pending:
+            return
+        with self.engine.begin() as connection:
+            # Straight to the driver: the rows are already in the types of the columns
+            connection.exec_driver_sql(_INSERT, self._pending)
+        # Only once committed: after a rollback the next flush writes them again
+        self._pending = []
+
+    def close(self) -> None:
+        """Write the buffered issues and close the connections."""
+        self.flush()
+        self.engine.dispose()
+
+    def create_indexes(self) -> None:
+        """Write the buffered issues and build the indexes, if not built yet."""
+        self.flush()
+        if self._indexed:
+            return
+        with self.engine.begin() as connection:
+            for index in _INDEXES:
+                connection.exec_driver_sql(index)
+        self._indexed = True
 
     def query(self, query_str: str, parameters: Optional[dict[str, str]] = None) -> Any:
+        self.create_indexes()
         session = self.session()
         return session.execute(sa.sql.text(query_str), parameters).fetchall()
 
     def count(self, condition: str) -> Any:
+        self.create_indexes()
         session = self.session()
         # pylint:disable=not-callable
         return session.query(func.count(Issue.id)).filter(sa.sql.text(condition)).scalar()
 
     def as_json(self) -> str:
+        self.flush()
         session = self.session()
         issues = session.query(Issue).all()
         return json.dumps([i.as_dict() for i in issues], default=str)
@@ -81,3 +132,36 @@ class DBObserver(Observer):
     @overrides(check_signature=False)
     def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
         self.database.add_issue(linter_name, issue)
+
+    @overrides(check_signature=False)
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        self.database.add_issues(linter_name, issues)
+
+    @overrides(check_signature=False)
+    def flush(self) -> None:
+        self.database.flush()
+
+    def close(self) -> None:
+        self.database.close()
+
+
+# The values of the columns of _INSERT
+RowType = tuple[str, str, Any, Any, Any, Any]
+_INSERT = ("INSERT INTO issues (linter_name, severity, file_path, name, message, location) "
+           "VALUES (?, ?, ?, ?, ?, ?)")
+# The issues of a linter, of a file of a linter, grouped by severity, read from the index alone
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_issues_linter_file_severity "
+    "ON issues (linter_name, file_path, severity)",
+)
+
+
+def _as_row(linter_name: str, issue: IssueTupleType) -> RowType:
+    return (linter_name, issue[0].name, issue[1], issue[2], issue[3], issue[4])
+
+
+def _set_file_pragmas(connection: Any, _record: Any) -> None:
+    cursor = connection.cursor()
+    for pragma in FILE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Iterable, Optional
 from typing_extensions import TypedDict
 # pylint:disable=import-error
 from overrides import overrides
@@ -43,52 +43,58 @@ SarifType = TypedDict('SarifType', {
 
 
 class SarifObserver(Observer):
-    tools: Runs = {
-        "tool": {
-            "driver": {
-                "name": None,
-                "rules": []
-            }
-        },
-        "results": [],
+    def __init__(self) -> None:
+        self.sarif: SarifType = {
+            "$schema": "https://json.schemastore.org/sarif-2.1.0-rtm.5.json",
+            "runs": []
         }
-    sarif: SarifType = {
-        "$schema": "https://json.schemastore.org/sarif-2.1.0-rtm.5.json",
-        "runs": []
-    }
-    index = 0
-    seen_linters: list[str] = []
+        # Results of the run of each linter, in the order the linters were seen
+        self.results: dict[str, list[Results]] = {}
 
     def get_sarif_json(self) -> SarifType:
         return self.sarif
 
     @overrides(check_signature=False)
     def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
-        result: Results = {
-            'ruleId': issue[2],
-            'level': issue[0].name.lower(),
-            'message': {
-                'text': issue[3]
-            },
-            'locations': [{
-                'physicalLocation': {
-                    'artifactLocation': {
-                        'uri': issue[1]
-                    },
-                    'region': {
-                        'startLine': issue[4]
+        self._get_results(linter_name).append(_as_result(issue))
+
+    @overrides(check_signature=False)
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        self._get_results(linter_name).extend(map(_as_result, issues))
+
+    def _get_results(self, linter_name: str) -> list[Results]:
+        results = self.results.get(linter_name)
+        if results is None:
+            results = self.results[linter_name] = []
+            run: Runs = {
+                "tool": {
+                    "driver": {
+                        "name": linter_name,
+                        "rules": []
                     }
+                },
+                "results": results,
+            }
+            self.sarif['runs'].append(run)
+        return results
+
+
+def _as_result(issue: IssueTupleType) -> Results:
+    return {
+        'ruleId': issue[2],
+        'level': issue[0].name.lower(),
+        'message': {
+            'text': issue[3]
+        },
+        'locations': [{
+            'physicalLocation': {
+                'artifactLocation': {
+                    'uri': issue[1]
+                },
+                'region': {
+                    'startLine': issue[4]
                 }
             }
-            ]
         }
-        if linter_name in self.seen_linters:
-            self.index = self.seen_linters.index(linter_name)
-            self.sarif['runs'][self.index]['results'].append(result)
-        else:
-            self.index = len(self.seen_linters)
-            self.seen_linters.append(linter_name)
-            run: Runs = self.tools
-            run['tool']['driver']['name'] = linter_name
-            run['results'] = [result]
-            self.sarif['runs'].append(run)
+        ]
+    }
@@ -0,0 +1,250 @@
+"""
+The database of DBObserver on the sqlite3 module alone.
+
+SqliteDatabase has the interface of Database (add_issue, add_issues, flush,
+close, query, count and as_json), but it holds a single connection for its
+whole life and runs its SQL straight on it: no SQLAlchemy import at startup, no
+session per query, and sqlite3 keeps the statements already prepared (up to
+CACHED_STATEMENTS of them) for the next calls. The rows of query can be read by
+attribute, index or unpacking, like the rows of SQLAlchemy.
+
+The issues are stored normalized: the linters, files and rules, repeated by
+many issues, are kept once each in a lookup table and the issue_rows refer to
+them by id, with the value of their Severity as severity. The issues view joins
+them back into the columns of the issues table of Database, for the queries
+written for it, while the queries filtering or grouping by linter, file or
+severity compare integers on issue_rows alone.
+"""
+from __future__ import annotations
+from collections import namedtuple
+from functools import cache
+from itertools import islice
+from typing import Any, Iterable, Optional
+import json
+import sqlite3
+# pylint:disable=import-error
+from overrides import overrides
+from you_shall_not_parse.observer import Observer
+from you_shall_not_parse.base_classes import Severity, IssueTupleType
+
+# The lookup tables, of ids and names
+LINTERS = "linters"
+FILES = "files"
+RULES = "rules"
+SEVERITIES = "severities"
+
+_CREATE_TABLES = (
+    *(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE)"
+      for table in (LINTERS, FILES, RULES, SEVERITIES)),
+    f"""
+    CREATE TABLE IF NOT EXISTS issue_rows (
+        id INTEGER PRIMARY KEY,
+        linter_id INTEGER NOT NULL REFERENCES {LINTERS} (id),
+        file_id INTEGER REFERENCES {FILES} (id),
+        severity INTEGER REFERENCES {SEVERITIES} (id),
+        rule_id INTEGER REFERENCES {RULES} (id),
+        message VARCHAR,
+        location VARCHAR
+    )
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS issues AS
+    SELECT issue_rows.id AS id, linters.name AS linter_name, files.name AS file_path,
+           severities.name AS severity, rules.name AS name, message, location
+    FROM issue_rows
+    JOIN linters ON linters.id = issue_rows.linter_id
+    LEFT JOIN files ON files.id = issue_rows.file_id
+    LEFT JOIN severities ON severities.id = issue_rows.severity
+    LEFT JOIN rules ON rules.id = issue_rows.rule_id
+    """,
+)
+_INSERT = ("INSERT INTO issue_rows (linter_id, severity, file_id, rule_id, message, location) "
+           "VALUES (?, ?, ?, ?, ?, ?)")
+_SELECT_ALL = ("SELECT id, linter_name, file_path, severity, name, message, location "
+               "FROM issues ORDER BY id")
+
+# The filters of DatabaseManager: the issues of a linter, of a file of a linter,
+# grouped by file and severity, read from the index alone
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_issue_rows_linter_file_severity "
+    "ON issue_rows (linter_id, file_id, severity)",
+)
+# For the database files: the issues are written once and read by one process,
+# a crash may lose the last transactions but never corrupts the file
+FILE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# The values of the columns of _INSERT
+RowType = tuple[Optional[int], int, Optional[int], Optional[int], Any, Any]
+
+
+class _LookupTable:
+    """The ids of the names of a lookup table, and the names not committed to it yet."""
+    def __init__(self, connection: sqlite3.Connection, table: str) -> None:
+        self.table = table
+        self.ids: dict[str, int] = {
+            row[1]: row[0] for row in connection.execute(f"SELECT id, name FROM {table}")} # nosec
+        self.new: list[tuple[int, str]] = []
+
+    def id_of(self, name: Optional[str]) -> Optional[int]:
+        if name is None:
+            return None
+        key = self.ids.get(name)
+        if key is None:
+            key = self.ids[name] = len(self.ids) + 1
+            self.new.append((key, name))
+        return key
+
+    def write(self, connection: sqlite3.Connection) -> None:
+        """Insert the new names, they stay new until committed()."""
+        if self.new:
+            connection.executemany(f"INSERT INTO {self.table} (id, name) VALUES (?, ?)", # nosec
+                                   self.new)
+
+    def committed(self) -> None:
+        self.new = []
+
+
+class SqliteDatabase:
+    """
+    Issues are buffered and written INSERT_CHUNK rows at a time, each chunk with
+    a single executemany in its own transaction, after the names they brought
+    to the lookup tables. The rows still buffered are written by flush, which
+    the queries call first, and by close.
+
+    The INDEXES are built by the first query, after the bulk load: building them
+    once over every row is cheaper than updating them at each insert. Issues
+    added after that update them.
+    """
+    INSERT_CHUNK = 10000
+    CACHED_STATEMENTS = 256
+
+    def __init__(self, filename: Optional[str] = None) -> None:
+        # The connection may be closed by the garbage collector of another thread
+        self.connection = sqlite3.connect(filename or ":memory:", check_same_thread=False,
+                                          cached_statements=self.CACHED_STATEMENTS)
+        self.connection.row_factory = _as_named_row
+        if filename:
+            for pragma in FILE_PRAGMAS:
+                self.connection.execute(pragma)
+        with self.connection:
+            for statement in _CREATE_TABLES:
+                self.connection.execute(statement)
+            self.connection.executemany(
+                f"INSERT OR IGNORE INTO {SEVERITIES} (id, name) VALUES (?, ?)",
+                [(severity.value, severity.name) for severity in Severity])
+        self._linters = _LookupTable(self.connection, LINTERS)
+        self._files = _LookupTable(self.connection, FILES)
+        self._rules = _LookupTable(self.connection, RULES)
+        self._pending: list[RowType] = []
+        self._indexed = False
+
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        self._pending.append(self._as_row(self._linters.id_of(linter_name), issue))
+        if len(self._pending) >= self.INSERT_CHUNK:
+            self.flush()
+
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        remaining = iter(issues)
+        linter_id = self._linters.id_of(linter_name)
+        while True:
+            self._pending.extend(self._as_row(linter_id, issue) for issue in
+                                 islice(remaining, self.INSERT_CHUNK - len(self._pending)))
+            if len(self._pending) < self.INSERT_CHUNK:
+                return
+            self.flush()
+
+    def _as_row(self, linter_id: Optional[int], issue: IssueTupleType) -> RowType:
+        return (linter_id, issue[0].value, self._files.id_of(issue[1]),
+                self._rules.id_of(issue[2]), issue[3], issue[4])
+
+    def flush(self) -> None:
+        """Write the buffered issues, in one transaction."""
+        if not self._pending:
+            return
+        tables = (self._linters, self._files, self._rules)
+        with self.connection:
+            for table in tables:
+                table.write(self.connection)
+            self.connection.executemany(_INSERT, self._pending)
+        # Only once committed: after a rollback the next flush writes them again
+        self._pending = []
+        for table in tables:
+            table.committed()
+
+    def close(self) -> None:
+        """Write the buffered issues and close the connection."""
+        self.flush()
+        self.connection.close()
+
+    def create_indexes(self) -> None:
+        """Write the buffered issues and build the indexes, if not built yet."""
+        self.flush()
+        if self._indexed:
+            return
+        with self.connection:
+            for index in INDEXES:
+                self.connection.execute(index)
+        self._indexed = True
+
+    def query(self, query_str: str, parameters: Optional[dict[str, str]] = None) -> Any:
+        """The rows of the query, whose parameters are named (:name)."""
+        self.create_indexes()
+        return self.connection.execute(query_str, parameters or {}).fetchall()
+
+    def count(self, condition: str) -> Any:
+        self.create_indexes()
+        return self.connection.execute(
+            f"SELECT count(issues.id) FROM issues WHERE {condition}").fetchone()[0] # nosec
+
+    def as_json(self) -> str:
+        self.flush()
+        issues = [row._asdict() for row in self.connection.execute(_SELECT_ALL)]
+        for issue in issues:
+            if issue["severity"] is not None:
+                # Like the enum column of Database
+                issue["severity"] = Severity[issue["severity"]]
+        return json.dumps(issues, default=str)
+
+
+class SqliteObserver(Observer):
+    """DBObserver on a SqliteDatabase."""
+    # pylint:disable=duplicate-code
+    def __init__(self, old_db: Optional[SqliteDatabase] = None,
+                 filename: Optional[str] = None) -> None:
+        if old_db:
+            self.database = old_db
+        else:
+            self.database = SqliteDatabase(filename)
+
+    def get_database(self) -> SqliteDatabase:
+        return self.database
+
+    @overrides(check_signature=False)
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        self.database.add_issue(linter_name, issue)
+
+    @overrides(check_signature=False)
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        self.database.add_issues(linter_name, issues)
+
+    @overrides(check_signature=False)
+    def flush(self) -> None:
+        self.database.flush()
+
+    def close(self) -> None:
+        self.database.close()
+
+
+def _as_named_row(cursor: sqlite3.Cursor, row: tuple[Any, ...]) -> Any:
+    return _row_class(tuple(column[0] for column in cursor.description))(*row)
+
+
+@cache
+def _row_class(columns: tuple[str, ...]) -> Any:
+    """A named tuple of the columns of a query, columns that aren't identifiers are renamed."""
+    return namedtuple("Row", columns, rename=True)
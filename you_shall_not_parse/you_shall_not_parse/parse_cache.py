@@ -0,0 +1,262 @@
+"""
+On-disk cache of parsed reports.
+
+A report is looked up by a hash of its bytes and of the handlers that would
+parse it (their names, modules and versions, the source of their modules and
+of this package, the version of this package and the validation mode) and of
+their settings (see ParserHandler.settings), so an unchanged report is replayed
+into any observer without being validated nor converted again, and a changed
+or reconfigured handler never replays stale issues.
+
+The issues are stored column by column as in an IssueBatch: the severities as
+bytes, and for each other field a table of its distinct values followed by the
+index of each issue in that table. Values are tagged scalars (None, booleans,
+ints, floats, strings), a report whose issues hold anything else isn't cached.
+"""
+from __future__ import annotations
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Optional, TYPE_CHECKING
+from array import array
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+
+from you_shall_not_parse.base_classes import IssueTupleType, Severity
+from you_shall_not_parse.issue_batch import IssueBatch
+from you_shall_not_parse.registry import get_specs
+
+if TYPE_CHECKING:
+    from you_shall_not_parse.document import Buffer
+    from you_shall_not_parse.observers.batch_observer import IssueBatches
+
+# Changes whenever the layout of the files changes
+CACHE_FORMAT = 1
+_MAGIC = b"YSNP-ISSUES\x00"
+_SUFFIX = ".issues"
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR = range(6)
+_COUNT = struct.Struct("<I")
+_DOUBLE = struct.Struct("<d")
+_SEVERITIES = {severity.value: severity for severity in Severity}
+# Fields of an issue after the severity: path, rule, message, location
+_FIELDS = 4
+
+
+class UncacheableError(ValueError):
+    pass
+
+
+class ParseCache:
+    """Parsed reports stored in a directory, which is created if needed."""
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, content: Buffer, validation: str) -> str:
+        """The key of a report: the same content parsed the same way has the same key."""
+        digest = hashlib.sha256(handlers_version(validation).encode("utf-8"))
+        digest.update(handlers_settings().encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[IssueBatches]:
+        """The issues stored under the key, None if there are none or they can't be read."""
+        try:
+            with open(self._path(key), 'rb') as file:
+                return decode_batches(file.read())
+        except (OSError, ValueError, IndexError, KeyError, struct.error):
+            return None
+
+    def store(self, key: str, batches: IssueBatches) -> None:
+        """Store the issues, unless they can't be encoded. Failing to write is not an error."""
+        try:
+            content = encode_batches(batches)
+        except UncacheableError:
+            return
+        try:
+            # Written aside and renamed, so a reader never sees half a file
+            with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as file:
+                file.write(content)
+            os.replace(file.name, self._path(key))
+        except OSError:
+            return
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+
+@cache
+def handlers_version(validation: str) -> str:
+    """What changes with the code of the handlers, once per process."""
+    try:
+        package = version("you_shall_not_parse")
+    except PackageNotFoundError:
+        package = ""
+    handlers = [(spec.name, spec.module, spec.version, _module_hash(spec.module))
+                for spec in get_specs()]
+    return f"{CACHE_FORMAT}:{package}:{_package_hash()}:{validation}:{handlers}"
+
+
+def handlers_settings() -> str:
+    """The settings of the handlers, which may change at any time."""
+    # A handler whose module was never imported can't have been configured
+    return repr([(spec.name, spec.load().settings()) for spec in get_specs()
+                 if spec.module in sys.modules])
+
+
+def _package_hash() -> str:
+    """A hash of the files of this package: the code and schemas every handler relies on."""
+    root = Path(__file__).parent
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*")):
+        if path.is_file() and "__pycache__" not in path.parts:
+            digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _module_hash(module: str) -> str:
+    """A hash of the source of the module, found without importing it."""
+    spec = find_spec(module)
+    if spec is None or spec.origin is None or not os.path.isfile(spec.origin):
+        return ""
+    return hashlib.sha256(Path(spec.origin).read_bytes()).hexdigest()
+
+
+def encode_batches(batches: IssueBatches) -> bytes:
+    """The binary form of the batches, UncacheableError when they hold other values than scalars."""
+    writer = _Writer()
+    writer.buffer += _MAGIC
+    writer.count(len(batches))
+    for batch in batches:
+        writer.value(batch.linter_name)
+        issues = list(batch)
+        writer.count(len(issues))
+        writer.buffer += bytes(issue[0].value for issue in issues)
+        for field in range(1, _FIELDS + 1):
+            writer.column([issue[field] for issue in issues])
+    return bytes(writer.buffer)
+
+
+def decode_batches(content: bytes) -> IssueBatches:
+    """The batches of encode_batches. Raises ValueError when the content isn't one of them."""
+    if not content.startswith(_MAGIC):
+        raise ValueError("Not a cache file")
+    reader = _Reader(content, len(_MAGIC))
+    batches: IssueBatches = []
+    for _ in range(reader.count()):
+        linter_name = reader.value()
+        size = reader.count()
+        severities = [_SEVERITIES[value] for value in reader.take(size)]
+        columns = [reader.column(size) for _ in range(_FIELDS)]
+        issues: list[IssueTupleType] = list(zip(severities, *columns))
+        batches.append(IssueBatch(linter_name, issues))
+    if reader.offset != len(content):
+        raise ValueError("Trailing data in cache file")
+    return batches
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def count(self, count: int) -> None:
+        self.buffer += _COUNT.pack(count)
+
+    def column(self, values: list[Any]) -> None:
+        table: dict[tuple[type, Any], int] = {}
+        indexes = []
+        for value in values:
+            try:
+                # Equal values of other types (1, 1.0, True) are told apart
+                index = table.setdefault((type(value), value), len(table))
+            except TypeError as error:
+                raise UncacheableError(f"Unhashable value {value!r}") from error
+            indexes.append(index)
+        self.count(len(table))
+        for _, value in table:
+            self.value(value)
+        typecode = _index_typecode(len(table))
+        column = array(typecode, indexes)
+        if sys.byteorder == "big":
+            column.byteswap()
+        self.buffer += typecode.encode("ascii")
+        self.buffer += column.tobytes()
+
+    def value(self, value: Any) -> None:
+        # pylint:disable=unidiomatic-typecheck
+        # type() and not isinstance(): subclasses (Enum members...) aren't scalars
+        if value is None:
+            self.buffer.append(_NONE)
+        elif type(value) is bool:
+            self.buffer.append(_TRUE if value else _FALSE)
+        elif type(value) is int:
+            self._text(_INT, str(value))
+        elif type(value) is float:
+            self.buffer.append(_FLOAT)
+            self.buffer += _DOUBLE.pack(value)
+        elif type(value) is str:
+            self._text(_STR, value)
+        else:
+            raise UncacheableError(f"Value of type {type(value).__name__}")
+
+    def _text(self, tag: int, text: str) -> None:
+        encoded = text.encode("utf-8", "surrogatepass")
+        self.buffer.append(tag)
+        self.count(len(encoded))
+        self.buffer += encoded
+
+
+class _Reader:
+    def __init__(self, content: bytes, offset: int = 0) -> None:
+        self.content = content
+        self.offset = offset
+
+    def take(self, size: int) -> bytes:
+        end = self.offset + size
+        if end > len(self.content):
+            raise ValueError("Truncated cache file")
+        chunk = self.content[self.offset:end]
+        self.offset = end
+        return chunk
+
+    def count(self) -> int:
+        count: int = _COUNT.unpack(self.take(_COUNT.size))[0]
+        return count
+
+    def column(self, size: int) -> list[Any]:
+        table = [self.value() for _ in range(self.count())]
+        typecode = self.take(1).decode("ascii")
+        indexes = array(typecode)
+        indexes.frombytes(self.take(size * indexes.itemsize))
+        if sys.byteorder == "big":
+            indexes.byteswap()
+        return [table[index] for index in indexes]
+
+    def value(self) -> Any:
+        tag = self.take(1)[0]
+        if tag == _NONE:
+            return None
+        if tag in (_FALSE, _TRUE):
+            return tag == _TRUE
+        if tag == _FLOAT:
+            return _DOUBLE.unpack(self.take(_DOUBLE.size))[0]
+        text = str(self.take(self.count()), "utf-8", "surrogatepass")
+        if tag == _INT:
+            return int(text)
+        if tag == _STR:
+            return sys.intern(text)
+        raise ValueError(f"Unknown value tag {tag}")
+
+
+def _index_typecode(size: int) -> str:
+    if size <= 0x100:
+        return "B"
+    if size <= 0x10000:
+        return "H"
+    return "I"
@@ -0,0 +1,140 @@
+"""
+Where the time of a parse goes.
+
+Parser(stats=ParseStats()) records for each report its size, how long it took,
+every handler tried on it in order and the issues it gave. The time of each
+handler is split between validation (deciding whether the report is theirs)
+and extraction (converting it to issues), so a slow report can be traced to the
+handler and the phase responsible for it.
+"""
+from __future__ import annotations
+from time import perf_counter
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from you_shall_not_parse.document import Document
+    from you_shall_not_parse.observers.batch_observer import IssueBatches
+
+
+class HandlerAttempt:
+    """One handler tried on one report, accepted once it converted the report."""
+    __slots__ = ("handler", "accepted", "validation", "extraction", "_mark")
+
+    def __init__(self, handler: str) -> None:
+        self.handler = handler
+        self.accepted = False
+        self.validation = 0.0
+        self.extraction = 0.0
+        self._mark = perf_counter()
+
+    def validated(self) -> None:
+        """The handler decided whether the report is theirs."""
+        now = perf_counter()
+        self.validation = now - self._mark
+        self._mark = now
+
+    def extracted(self) -> None:
+        """The handler sent the issues of the report."""
+        self.extraction = perf_counter() - self._mark
+        self.accepted = True
+
+
+class _NoAttempt(HandlerAttempt):
+    __slots__ = ()
+
+    def validated(self) -> None:
+        pass
+
+    def extracted(self) -> None:
+        pass
+
+
+_NO_ATTEMPT = _NoAttempt("")
+
+
+def start_attempt(document: Document, handler: object) -> HandlerAttempt:
+    """Handlers call it first in try_handle, it records nothing when the parse has no stats."""
+    if document.stats is None:
+        return _NO_ATTEMPT
+    return document.stats.attempt(type(handler).__name__)
+
+
+class ReportStats:
+    """
+    One report: its size in bytes as read from disk, the seconds it took and
+    the issues it gave. A cached report was replayed from the parse cache,
+    without trying any handler.
+    """
+    __slots__ = ("filename", "size", "seconds", "issues", "cached", "attempts")
+
+    def __init__(self, filename: str, size: int, cached: bool = False) -> None:
+        self.filename = filename
+        self.size = size
+        self.seconds = 0.0
+        self.issues = 0
+        self.cached = cached
+        self.attempts: list[HandlerAttempt] = []
+
+    def attempt(self, handler: str) -> HandlerAttempt:
+        attempt = HandlerAttempt(handler)
+        self.attempts.append(attempt)
+        return attempt
+
+    def finish(self, batches: IssueBatches, start: float) -> None:
+        self.issues = sum(len(batch) for batch in batches)
+        self.seconds = perf_counter() - start
+
+    @property
+    def handler(self) -> Optional[str]:
+        """The handler that converted the report, None if none did."""
+        for attempt in self.attempts:
+            if attempt.accepted:
+                return attempt.handler
+        return None
+
+    @property
+    def rejected(self) -> list[str]:
+        """
+        The handlers tried that didn't convert the report, in order. One may be
+        tried twice: first as a likely handler, then along the chain.
+        """
+        return [attempt.handler for attempt in self.attempts if not attempt.accepted]
+
+
+class HandlerTotals:
+    """The attempts of one handler over every report."""
+    # pylint:disable=too-few-public-methods
+    __slots__ = ("tried", "accepted", "validation", "extraction", "issues")
+
+    def __init__(self) -> None:
+        self.tried = 0
+        self.accepted = 0
+        self.validation = 0.0
+        self.extraction = 0.0
+        self.issues = 0
+
+
+class ParseStats:
+    """The reports of every parse of the Parsers given this instance, in parsing order."""
+    def __init__(self) -> None:
+        self.reports: list[ReportStats] = []
+
+    def add(self, report: ReportStats) -> None:
+        self.reports.append(report)
+
+    def slowest(self, count: int) -> list[ReportStats]:
+        return sorted(self.reports, key=lambda report: report.seconds, reverse=True)[:count]
+
+    def handlers(self) -> dict[str, HandlerTotals]:
+        """The totals of each handler tried, in the order they were first tried."""
+        totals: dict[str, HandlerTotals] = {}
+        for report in self.reports:
+            for attempt in report.attempts:
+                handler = totals.setdefault(attempt.handler, HandlerTotals())
+                handler.tried += 1
+                handler.validation += attempt.validation
+                handler.extraction += attempt.extraction
+                if attempt.accepted:
+                    handler.accepted += 1
+                    handler.issues += report.issues
+        return totals
@@ -1,72 +1,259 @@
 from __future__ import annotations
-from typing import Optional
-import importlib.util
-import importlib.machinery
+from contextlib import contextmanager
+from time import perf_counter
+from typing import BinaryIO, Iterator, Optional, Union, TYPE_CHECKING
+import functools
+import mmap
 import os
-from pathlib import Path
-import types
 
 from you_shall_not_parse.observer import Observer
-from you_shall_not_parse.handler_classes import ParserHandler, ReturnHandleType
+from you_shall_not_parse.observers.batch_observer import BatchObserver, IssueBatches, replay_batches
+from you_shall_not_parse.document import Document, Buffer, FAST_VALIDATION, VALIDATIONS
+from you_shall_not_parse.sniffer import sniff_document, likely_handlers
+from you_shall_not_parse.registry import get_specs, get_chain
+from you_shall_not_parse.parse_stats import ParseStats, ReportStats
+from you_shall_not_parse.pipeline import Pipeline
+from you_shall_not_parse import chunks
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+    from you_shall_not_parse.handler_classes import ParserHandler, ReturnHandleType
+    from you_shall_not_parse.parse_cache import ParseCache
 
-InitialAndPreviousModuleType = tuple[Optional[ParserHandler], Optional[ParserHandler]]
 Filename = str
 
 class Parser():
-    # pylint:disable=too-few-public-methods
-    def __init__(self) -> None:
-        self.chain = _get_chain()
+    """
+    Handlers are imported the first time a report needs them and shared by every
+    Parser of the process, so creating a Parser is cheap.
+
+    With FAST_VALIDATION handlers only check the parts of a report they read,
+    STRICT_VALIDATION validates reports against the whole schema of their format.
+
+    With a cache, the issues of each file are stored under a hash of its content
+    and replayed when the same content is parsed again, and a file with the same
+    content as a file already parsed by the same call is skipped.
+
+    With stats, every file parsed is recorded in them (see parse_stats.py).
+
+    Pipelined, the files of a sequential parse are read, parsed and sent to the
+    observer by three threads at once (see pipeline.py).
+    """
+    def __init__(self, validation: str = FAST_VALIDATION,
+                 cache: Optional[ParseCache] = None,
+                 stats: Optional[ParseStats] = None,
+                 pipelined: bool = False) -> None:
+        if validation not in VALIDATIONS:
+            raise ValueError(f"Unknown validation {validation!r}, expected one of {VALIDATIONS}")
+        self.validation = validation
+        self.cache = cache
+        self.stats = stats
+        self.pipelined = pipelined
         self.observer: Observer
+        # The pool of the handlers splitting a report, shared by the whole parse
+        self._pool: Optional[Executor] = None
+
+    @property
+    def handlers(self) -> list[ParserHandler]:
+        """Every handler, in the order of the chain. It imports all of them."""
+        return [spec.load() for spec in get_specs()]
+
+    @property
+    def chain(self) -> Optional[ParserHandler]:
+        return get_chain()
 
-    def parse_from_filenames(self, file_names_lists: list[Filename], observer: Observer) -> None:
+    def parse_from_filenames(self, file_names_lists: list[Filename], observer: Observer,
+                             jobs: int = 1) -> None:
+        """
+        Parse every file and send its issues to the observer, in the order of the list.
+
+        With jobs other than 1 the files are parsed by a pool of that many
+        processes (0 uses every CPU). A single file is split instead, by the
+        handlers that can convert chunks of one report in parallel, all in the
+        same pool.
+
+        The observer is flushed once every file was parsed.
+        """
+        _check_jobs(jobs)
         self.observer = observer
-        for filename in file_names_lists:
-            with open(filename, 'r', encoding="utf-8") as file:
-                res = file.read()
-                self._parse_str(res)
+        self._parse_files(file_names_lists, jobs)
+        observer.flush()
+
+    def _parse_files(self, file_names_lists: list[Filename], jobs: int) -> None:
+        if jobs != 1 and len(file_names_lists) > 1:
+            self._parse_in_pool(file_names_lists, jobs)
+            return
+        parsed: set[str] = set()
+        if self.pipelined and len(file_names_lists) > 1:
+            # The pipeline only runs the parse of each file in the parser thread
+            parse = functools.partial(self._parse_read_file, parsed=parsed)
+            Pipeline(parse).run(file_names_lists, self.observer)
+            return
+        with self._shared_pool(jobs):
+            for filename in file_names_lists:
+                self._parse_file(filename, jobs, parsed)
+
+    @contextmanager
+    def _shared_pool(self, jobs: int) -> Iterator[None]:
+        with chunks.shared_pool(jobs) as pool:
+            self._pool = pool
+            try:
+                yield
+            finally:
+                self._pool = None
+
+    def _parse_file(self, filename: Filename, jobs: int = 1,
+                    parsed: Optional[set[str]] = None) -> None:
+        with open(filename, 'rb') as file, _map_file(file) as content:
+            self._parse_content(filename, content, self.observer, jobs, parsed)
+
+    def _parse_read_file(self, filename: Filename, content: Optional[bytes], observer: Observer,
+                         parsed: Optional[set[str]] = None) -> None:
+        """Parse a file read by the pipeline, or mapped here when it wasn't read."""
+        if content is not None:
+            self._parse_content(filename, content, observer, parsed=parsed)
+            return
+        with open(filename, 'rb') as file, _map_file(file) as mapped:
+            self._parse_content(filename, mapped, observer, parsed=parsed)
+
+    def _parse_content(self, filename: Filename, content: Buffer, observer: Observer,
+                       jobs: int = 1, parsed: Optional[set[str]] = None) -> None:
+        # pylint:disable=too-many-arguments,too-many-positional-arguments
+        start = perf_counter()
+        cache = self.cache
+        document = Document(content, filename, jobs, self.validation)
+        document.pool = self._pool
+        if cache is None and self.stats is None:
+            self._parse_document(document, observer)
+            return
+        key = cache.key(content, self.validation) if cache is not None else ""
+        if parsed is not None and key:
+            if key in parsed:
+                # The same report given twice
+                return
+            parsed.add(key)
+        batches = cache.load(key) if cache is not None else None
+        report = ReportStats(filename, len(content), cached=batches is not None)
+        if batches is None:
+            document.stats = report
+            recorder = BatchObserver()
+            self._parse_document(document, recorder)
+            batches = recorder.batches
+            if cache is not None:
+                cache.store(key, batches)
+        replay_batches(batches, observer)
+        if self.stats is not None:
+            report.finish(batches, start)
+            self.stats.add(report)
 
-    def parse_from_str(self, content_to_parse: str, observer: Observer) -> None:
+    def _parse_in_pool(self, file_names_lists: list[Filename], jobs: int) -> None:
+        # Most runs are sequential, they don't pay for importing multiprocessing
+        # pylint:disable=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor
+        # Each file is parsed once per content with a cache, once per name without
+        sources = {filename: self._file_key(filename) for filename in set(file_names_lists)}
+        # Biggest reports first, so the last busy worker isn't stuck with a big one
+        by_size = sorted(sources, key=os.path.getsize, reverse=True)
+        with ProcessPoolExecutor(max_workers=jobs or None, initializer=_warm_worker) as pool:
+            results: dict[str, Union[IssueBatches, Future[_ParsedFile]]] = {}
+            for filename in by_size:
+                source = sources[filename]
+                if source not in results:
+                    cached = self.cache.load(source) if self.cache is not None else None
+                    results[source] = cached if cached is not None else pool.submit(
+                        _parse_file_batches, filename, self.validation, self.stats is not None)
+            replayed: set[str] = set()
+            for filename in file_names_lists:
+                source = sources[filename]
+                if self.cache is not None and source in replayed:
+                    continue
+                replayed.add(source)
+                result = results[source]
+                report = None
+                if isinstance(result, list):
+                    batches = result
+                    if self.cache is not None:
+                        report = ReportStats(filename, os.path.getsize(filename), cached=True)
+                        report.finish(batches, perf_counter())
+                else:
+                    batches, report = result.result()
+                    results[source] = batches
+                    if self.cache is not None:
+                        self.cache.store(source, batches)
+                replay_batches(batches, self.observer)
+                if self.stats is not None and report is not None:
+                    self.stats.add(report)
+
+    def _file_key(self, filename: Filename) -> str:
+        if self.cache is None:
+            return filename
+        with open(filename, 'rb') as file, _map_file(file) as content:
+            return self.cache.key(content, self.validation)
+
+    def parse_from_str(self, content_to_parse: str, observer: Observer, jobs: int = 1) -> None:
+        _check_jobs(jobs)
         self.observer = observer
-        self._parse_str(content_to_parse)
+        with self._shared_pool(jobs):
+            self._parse_str(content_to_parse, jobs=jobs)
+        observer.flush()
 
-    def _parse_str(self, content: str) -> Optional[ReturnHandleType]:
+    def _parse_str(self, content: str, filename: Filename = "",
+                   jobs: int = 1) -> Optional[ReturnHandleType]:
+        document = Document(content, filename, jobs, self.validation)
+        document.pool = self._pool
+        return self._parse_document(document, self.observer)
+
+    def _parse_document(self, document: Document,
+                        observer: Observer) -> Optional[ReturnHandleType]:
+        for spec in likely_handlers(get_specs(), sniff_document(document)):
+            if spec.load().try_handle(document, observer):
+                return None
         result = None
-        if self.chain:
-            result = self.chain.handle(content, self.observer)
+        chain = get_chain()
+        if chain:
+            # The handlers read the document, its text is only decoded if one needs it
+            result = chain.handle("", observer, document)
         return result
 
 
-def _get_chain() -> Optional[ParserHandler]:
-    current_path = Path(__file__).parent
-    parsers_path = os.path.join(current_path, "parsers/")
-    prev: Optional[ParserHandler] = None
-    initial: Optional[ParserHandler] = None
-    for module in os.listdir(parsers_path):
-        module_path = parsers_path + module
-        if os.path.isfile(module_path):
-            initial, prev = _load_module(module, module_path, initial, prev)
-    return initial
-
-
-def _load_module(module: str, module_path: str, initial: Optional[ParserHandler],
-                 prev: Optional[ParserHandler]) -> InitialAndPreviousModuleType:
-    rule_module = _helper_loader(module, module_path)
-    rule = rule_module.HANDLER
-    instance = rule()
-    if prev is None:
-        initial = instance
-        prev = instance
-    else:
-        prev = prev.set_next(instance)
-    return (initial, prev)
-
-
-def _helper_loader(module: str, path: str) -> types.ModuleType:
-    spec = importlib.util.spec_from_file_location(module, path)
-    if spec and spec.loader:
-        rule_module = importlib.util.module_from_spec(spec)
-        if rule_module:
-            spec.loader.exec_module(rule_module)
-            return rule_module
-        raise ValueError
-    raise ValueError
+def _check_jobs(jobs: int) -> None:
+    if jobs < 0:
+        raise ValueError(f"jobs must be 0 (every CPU) or more, not {jobs}")
+
+
+@functools.cache
+def _worker_parser(validation: str) -> Parser:
+    return Parser(validation)
+
+
+def _warm_worker() -> None:
+    """A worker may parse any kind of report, all the handlers and schemas are loaded upfront."""
+    # pylint:disable=import-outside-toplevel
+    from you_shall_not_parse.handler_classes import warm_schema_cache
+    get_chain()
+    warm_schema_cache()
+
+
+# The issues of a file parsed in a worker, with its stats when the parse has some
+_ParsedFile = tuple[IssueBatches, Optional[ReportStats]]
+
+
+def _parse_file_batches(filename: Filename, validation: str,
+                        with_stats: bool = False) -> _ParsedFile:
+    """Runs in the pool workers, the issues go back to the parent process in batches."""
+    observer = BatchObserver()
+    parser = _worker_parser(validation)
+    parser.stats = ParseStats() if with_stats else None
+    parser.parse_from_filenames([filename], observer)
+    return observer.batches, parser.stats.reports[0] if parser.stats else None
+
+
+@contextmanager
+def _map_file(file: BinaryIO) -> Iterator[Buffer]:
+    """Map the file in memory, handlers read it in place instead of a decoded copy."""
+    if os.fstat(file.fileno()).st_size == 0:
+        # An empty file can't be mapped
+        yield b""
+        return
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        yield content
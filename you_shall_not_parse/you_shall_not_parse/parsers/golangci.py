@@ -20,6 +20,7 @@ class GolangCiHandler(JmespathParserHandler):
 
     JMESPATHQUERY = "Issues[].[Severity, Pos.Filename, FromLinter, Text, Pos.Line]"
     LINTER_NAME = "golangci"
+    SPLIT_KEY = "Issues"
 
     SCHEMA_FILENAME = "golangci_schema.json"
 
@@ -1,62 +1,84 @@
+from typing import Iterable, Iterator, NamedTuple, Optional
 import csv
 import io
-from you_shall_not_parse.handler_classes import (
-    ParserHandlerImplementation,
-    ReturnHandleType
-)
+from you_shall_not_parse.handler_classes import ParserHandlerImplementation
 from you_shall_not_parse.base_classes import Severity, IssueTupleType
 from you_shall_not_parse.observer import Observer
+from you_shall_not_parse.document import Document
+from you_shall_not_parse.issue_batch import IssueBatch
+from you_shall_not_parse.sniffer import SNIFF_SIZE
+
+# nloc, ccn, token, param, length, name, file_path, function_name, signature, start_line, end_line
+COLUMNS = 11
+_NLOC, _CCN, _TOKENS, _PARAMETERS = 0, 1, 2, 3
+_FILE_PATH, _FUNCTION_NAME, _START_LINE, _END_LINE = 6, 7, 9, 10
+SNIFFED_ROWS = 5
+
+
+class LizardThresholds(NamedTuple):
+    """
+    A function gets an issue for each of its metrics at or above its threshold,
+    None doesn't check the metric.
+    """
+    ccn: Optional[int] = 5
+    nloc: Optional[int] = None
+    tokens: Optional[int] = None
+    parameters: Optional[int] = None
+
+
+# column, threshold field, rule id, message
+_CHECKS = (
+    (_CCN, "ccn", "high-complexity", "Function '{}' has high cyclomatic complexity: {}"),
+    (_NLOC, "nloc", "long-function", "Function '{}' has too many lines of code: {}"),
+    (_TOKENS, "tokens", "too-many-tokens", "Function '{}' has too many tokens: {}"),
+    (_PARAMETERS, "parameters", "too-many-parameters", "Function '{}' has too many parameters: {}"),
+)
 
 
 class LizardHandler(ParserHandlerImplementation):
     linter_name: str = "lizard"
+    THRESHOLDS: LizardThresholds = LizardThresholds()
 
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
-        # Check if it looks like lizard CSV format
-        if not self._is_lizard_csv(request):
-            return super().handle(request, observer)
-            
-        # Try to parse as lizard CSV
+    def try_handle(self, document: Document, observer: Observer) -> bool:
+        # A CSV that breaks while parsing is left to the next handler
         try:
-            self.observer = observer
-            self._parse_lizard_csv(request)
-            return None
-                
+            return super().try_handle(document, observer)
         except (csv.Error, ValueError, IndexError):
-            return super().handle(request, observer)
-
-    def _is_lizard_csv(self, request: str) -> bool:
-    #Check if the content is a valid lizard CSV format.
-        if ',' not in request or not request.strip():
             return False
-        
-        try:
-            lines = request.strip().split('\n')[:5]
-            csv_reader = csv.reader(lines)
 
-            valid_rows = sum(1 for row in csv_reader if self._is_valid_row(row))
-            return valid_rows > 0
-        except (csv.Error, UnicodeDecodeError):
+    def settings(self) -> str:
+        return "" if self.THRESHOLDS == LizardThresholds() else repr(self.THRESHOLDS)
+
+    def accepts(self, document: Document) -> bool:
+        head = document.head(SNIFF_SIZE)
+        lines = head.lstrip().split("\n")
+        if document.longer_than(SNIFF_SIZE):
+            # The last line may be cut. Not len(head): it counts characters, the head is bytes
+            lines.pop()
+        return self._is_lizard_csv(lines[:SNIFFED_ROWS])
+
+    def parse(self, document: Document) -> None:
+        # Sent once the whole report was read: a report that breaks on the way is
+        # left to the next handler without any of its issues
+        with io.TextIOWrapper(document.stream(), encoding="utf-8", newline="") as text:
+            issues = IssueBatch(self.linter_name, self.get_issues(csv.reader(text)))
+        self.observer.add_issues(self.linter_name, issues)
+
+    def _is_lizard_csv(self, lines: list[str]) -> bool:
+        try:
+            return any(self._is_valid_row(row) for row in csv.reader(lines))
+        except csv.Error:
             return False
 
     def _is_valid_row(self, row: list[str]) -> bool:
-        #check if row follow the lizard CSV formart
-        if len(row) != 11:
-            return False
-        # Validate first 5 numeric columns
-        if not all(self._is_int(row[i]) for i in range(5)): return False
-            
-       # Validate start and end lines
-        if not self._is_valid_lines(row[9], row[10]):  return False
-            
-        # Validate file path
-        if not self._is_valid_path(row[6]):  return False
-            
-        # Validate function name
-        if not row[7].strip():  return False
-            
-        return True
-    # Validate if value are int
+        return (
+            len(row) == COLUMNS
+            and all(self._is_int(row[i]) for i in range(5))
+            and self._is_valid_lines(row[_START_LINE], row[_END_LINE])
+            and self._is_valid_path(row[_FILE_PATH])
+            and bool(row[_FUNCTION_NAME].strip())
+        )
+
     def _is_int(self, value: str) -> bool:
         try:
             int(value)
@@ -64,7 +86,6 @@ class LizardHandler(ParserHandlerImplementation):
         except (ValueError, TypeError):
             return False
 
-    # Check ....
     def _is_valid_lines(self, start: str, end: str) -> bool:
         try:
             start_int = int(start)
@@ -73,40 +94,34 @@ class LizardHandler(ParserHandlerImplementation):
         except ValueError:
             return False
 
+    def _is_valid_path(self, path: str) -> bool:
+        return bool(path and ('/' in path or '\\' in path))
 
-    def _is_valid_path(self, path: str) -> bool: return bool(path and ('/' in path or '\\' in path))
-    
-    def _parse_lizard_csv(self, csv_content: str) -> None:
-         # Parse the CSV content
-        csv_reader = csv.reader(io.StringIO(csv_content))
-        for row in csv_reader:
-                if len(row) < 11:  # Ensure we have enough columns
-                    continue            
-                try:
-                    # nloc, ccn, token, param, length, name, file_path, function_name, signature, start_line, end_line
-                    nloc = int(row[0])
-                    ccn = int(row[1])
-                    token = int(row[2])
-                    param = int(row[3])
-                    length = int(row[4])
-                    name = row[5]
-                    file_path = row[6]
-                    function_name = row[7]
-                    signature = row[8]
-                    start_line = row[9]
-                
-                    if ccn >= 5 and int(start_line) > 0:
-                        issue = (
-                            Severity.HIGH,
-                            file_path,
-                            "high-complexity", 
-                            f"Function '{function_name}' has high cyclomatic complexity: {ccn}",
-                            start_line
-                        )
-                        self.observer.add_issue(self.linter_name, issue)
-                        
-                except (ValueError, IndexError):
+    def get_issues(self, rows: Iterable[list[str]]) -> Iterator[IssueTupleType]:
+        """Issues of the functions over the thresholds, rows that aren't functions are skipped."""
+        checks = [
+            (column, threshold, rule, message)
+            for column, field, rule, message in _CHECKS
+            if (threshold := getattr(self.THRESHOLDS, field)) is not None
+        ]
+        for row in rows:
+            if len(row) < COLUMNS:
+                continue
+            for column, threshold, rule, message in checks:
+                value = row[column]
+                # Checked with isdecimal so int() never raises: rows that aren't
+                # functions are skipped without handling an exception per row
+                if not value.isdecimal() or int(value) < threshold:
                     continue
+                start_line = row[_START_LINE]
+                if start_line.isdecimal() and int(start_line) > 0:
+                    yield (
+                        Severity.HIGH,
+                        row[_FILE_PATH],
+                        rule,
+                        message.format(row[_FUNCTION_NAME], int(value)),
+                        start_line,
+                    )
 
 
-HANDLER = LizardHandler
\ No newline at end of file
+HANDLER = LizardHandler
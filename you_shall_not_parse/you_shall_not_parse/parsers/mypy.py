@@ -1,21 +1,24 @@
+from typing import Optional
 import re
 
 from you_shall_not_parse.handler_classes import JunitHandler
-from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.base_classes import Severity, IssueTupleType
+
+MESSAGE_PATTERN = re.compile(r"(.*):(\d+): (error|note): (.*)")
 
 
 class MypyHandler(JunitHandler):
     linter_name: str = "mypy"
 
-    def _process_message(self, message: str) -> None:
-        match = re.match(r"(.*):(\d+): (error|note): (.*)", message)
-        if match:
-            file, location, issue_type, issue_message = match.groups()
-            severity: Severity = (
-                Severity.HIGH if issue_type == "error" else Severity.NOTE
-            )
-            issue = (severity, file, issue_type, issue_message, location)
-            self.observer.add_issue(self.linter_name, issue)
+    def _get_issue(self, message: str) -> Optional[IssueTupleType]:
+        match = MESSAGE_PATTERN.match(message)
+        if not match:
+            return None
+        file, location, issue_type, issue_message = match.groups()
+        severity: Severity = (
+            Severity.HIGH if issue_type == "error" else Severity.NOTE
+        )
+        return (severity, file, issue_type, issue_message, location)
 
 
 HANDLER = MypyHandler
@@ -18,6 +18,7 @@ class NpmHandler(JmespathParserHandler):
 
     JMESPATHQUERY = "vulnerabilities.*.via[].[severity, name, source, title, range]"
     LINTER_NAME = "npm"
+    SPLIT_KEY = "vulnerabilities"
     SCHEMA_FILENAME = "npm_schema.json"
 
 
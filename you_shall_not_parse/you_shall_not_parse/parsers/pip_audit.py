@@ -26,6 +26,7 @@ class PipAuditHandler(JmespathParserHandler):
     """
     SCHEMA_FILENAME = "pipaudit_schema.json"
     LINTER_NAME = "pip-audit"
+    SPLIT_KEY = "dependencies"
     OPTIONS = jmespath.Options(custom_functions=CustomFunctions())
 
 
@@ -27,6 +27,7 @@ class PoetryAuditHandler(JmespathParserHandler):
     """
     SCHEMA_FILENAME = "poetryaudit_schema.json"
     LINTER_NAME = "poetry-audit"
+    SPLIT_KEY = "vulnerabilities"
     OPTIONS = jmespath.Options(custom_functions=CustomFunctions())
 
 
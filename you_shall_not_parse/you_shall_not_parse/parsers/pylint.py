@@ -1,32 +1,30 @@
-import json
-from typing import Optional
+from typing import Iterator, Optional
 from you_shall_not_parse.handler_classes import (
     ParserHandlerImplementation,
-    validate_schema,
-    load_schema,
-    ReturnHandleType
+    matches_schema
 )
+from you_shall_not_parse.document import Document
 from you_shall_not_parse.base_classes import IssueTupleType, Severity
-from you_shall_not_parse.observer import Observer
 
 RequestType = list[dict[str, str]]
 IssueType = dict[str, str]
 
 class PylintHandler(ParserHandlerImplementation):
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
-        schema = load_schema("pylint_schema.json")
-        self.observer = observer
-        if not validate_schema(request, schema):
-            return super().handle(request, observer)
-        pylint = json.loads(request)
-        self._parse_pylint(pylint)
-        return None
+
+    def accepts(self, document: Document) -> bool:
+        return matches_schema(document, "pylint_schema.json")
+
+    def parse(self, document: Document) -> None:
+        self._parse_pylint(document.json)
 
     def _parse_pylint(self, res: RequestType) -> None:
+        self.observer.add_issues("pylint", self._get_issues(res))
+
+    def _get_issues(self, res: RequestType) -> Iterator[IssueTupleType]:
         for issue in res:
             pylint_issue = self._get_issue(issue)
             if pylint_issue is not None:
-                self.observer.add_issue("pylint", pylint_issue)
+                yield pylint_issue
 
     def _get_issue(self, issue: IssueType) -> Optional[IssueTupleType]:
         msg = issue['message']
@@ -1,14 +1,11 @@
-import json
-from typing import Optional
+from typing import Iterator, Optional
 
 from you_shall_not_parse.handler_classes import (
     ParserHandlerImplementation,
-    validate_schema,
-    load_schema,
-    ReturnHandleType
+    matches_schema
 )
+from you_shall_not_parse.document import Document
 from you_shall_not_parse.base_classes import IssueTupleType, Severity
-from you_shall_not_parse.observer import Observer
 
 IssueType = dict[str, str]
 ListIssueType = list['IssueType']
@@ -16,22 +13,22 @@ RequestType = dict[str, 'ListIssueType']
 THRESHOLD = "A5"
 
 class RadonHandler(ParserHandlerImplementation):
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
-        schema = load_schema("radon_schema.json")
-        self.observer = observer
-        if not validate_schema(request, schema):
-            return super().handle(request, observer)
-        radon = json.loads(request)
-        self.parse_radon(radon)
-        return None
+
+    def accepts(self, document: Document) -> bool:
+        return matches_schema(document, "radon_schema.json")
+
+    def parse(self, document: Document) -> None:
+        self.parse_radon(document.json)
 
     def parse_radon(self, res: RequestType) -> None:
+        self.observer.add_issues("radon", self.get_issues(res))
+
+    def get_issues(self, res: RequestType) -> Iterator[IssueTupleType]:
         for depn in res:
             for issue in res[depn]:
                 radon_issue = self.get_issue(issue, depn)
                 if radon_issue is not None:
-                    self.observer.add_issue("radon", radon_issue)
-                continue
+                    yield radon_issue
 
     def get_issue(self, issue: IssueType, filename: str) -> Optional[IssueTupleType]:
         msg = issue['rank'] + str(issue['complexity'])
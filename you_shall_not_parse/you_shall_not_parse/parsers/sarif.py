@@ -1,14 +1,23 @@
-from typing import Union
+from __future__ import annotations
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
 import json
 
 from you_shall_not_parse.handler_classes import (
     ParserHandlerImplementation,
-    validate_schema,
-    load_schema,
-    ReturnHandleType
+    matches_schema
 )
-from you_shall_not_parse.base_classes import Severity
+from you_shall_not_parse.document import Document, STRICT_VALIDATION
 from you_shall_not_parse.observer import Observer
+from you_shall_not_parse.base_classes import Severity, IssueTupleType
+from you_shall_not_parse.issue_batch import IssueBatch
+from you_shall_not_parse.sniffer import sniff_document, match_score
+from you_shall_not_parse.registry import get_spec
+from you_shall_not_parse.sarif_stream import (
+    read_runs, SarifResult, SarifRule, DriverName, StreamError
+)
+from you_shall_not_parse import chunks
 
 MessageType = dict[str, str]
 LocationType = list[dict[str, dict[str, dict[str, str]]]]
@@ -18,77 +27,201 @@ IssuesType = dict[str, str | dict[str, str]]
 RulesType = list['IssuesType']
 
 
+class RuleIndex:
+    """The rules of one run by ruleIndex and by ruleId, to resolve what a result leaves out."""
+    def __init__(self, rules: Iterable[SarifRule] = ()) -> None:
+        self._rules: list[SarifRule] = []
+        self._by_id: dict[str, SarifRule] = {}
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_rules(cls, rules: Any) -> RuleIndex:
+        """The index of the rules of a driver, as in the report."""
+        if not isinstance(rules, list):
+            return cls()
+        return cls(_as_rule(rule) for rule in rules)
+
+    def add(self, rule: SarifRule) -> None:
+        self._rules.append(rule)
+        # The first rule with an id wins, as a lookup by scanning would do
+        self._by_id.setdefault(rule.rule_id, rule)
+
+    def find(self, rule_id: Any, rule_index: Any) -> Optional[SarifRule]:
+        if type(rule_index) is int and 0 <= rule_index < len(self._rules): # pylint:disable=unidiomatic-typecheck
+            return self._rules[rule_index]
+        if isinstance(rule_id, str):
+            return self._by_id.get(rule_id)
+        return None
+
+    def __iter__(self) -> Iterator[SarifRule]:
+        return iter(self._rules)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
 class SarifHandler(ParserHandlerImplementation):
+    """
+    A streamed report is accepted on its fingerprint alone, so a report that
+    turns out not to be JSON, or to be cut, is only found while reading it: it
+    is then left to the next handler, but the issues of the results read before
+    the error were already sent to the observer.
+    """
     linter_name: str = ""
+    # Reports from this size on are streamed instead of loaded, None never streams
+    STREAMING_THRESHOLD: Optional[int] = 64 * 1024 * 1024
+    # Results converted by each pool worker when the document allows several jobs
+    CHUNK_SIZE: int = 10000
 
-    def handle(self, request: str, observer: Observer) -> ReturnHandleType:
-        schema = load_schema("sarif_schema.json")
-        self.observer = observer
-        if validate_schema(request, schema):
-            self.parse(request)
-            return None
-        return super().handle(request, observer)
+    def try_handle(self, document: Document, observer: Observer) -> bool:
+        try:
+            return super().try_handle(document, observer)
+        except StreamError:
+            return False
+
+    def accepts(self, document: Document) -> bool:
+        if self._is_streamed(document):
+            # The schema needs the whole tree, a streamed report is only fingerprinted
+            signature = get_spec("sarif").signature
+            return signature is not None and match_score(signature, sniff_document(document)) > 0
+        if document.validation == STRICT_VALIDATION:
+            return matches_schema(document, "sarif_schema.json")
+        try:
+            return _is_readable_sarif(document.json)
+        except json.JSONDecodeError:
+            return False
 
-    def parse(self, request: str) -> None:
-        sarif = json.loads(request)['runs'][0]
+    def parse(self, document: Document) -> None:
+        if self._is_streamed(document):
+            self.parse_stream(document.stream(), document.jobs, document.pool)
+            return
+        for run in document.json['runs']:
+            self.parse_run(run, document.jobs, document.pool)
+
+    def parse_run(self, sarif: dict[str, Any], jobs: int = 1,
+                  pool: Optional[Executor] = None) -> None:
         runned = False
         if sarif['tool']['driver']['name']:
             self.linter_name = sarif['tool']['driver']['name']
         if 'results' in sarif:
             if sarif['results']:
                 runned = True
-                self.parse_results(sarif['results'])
+                rules = RuleIndex.from_rules(sarif['tool']['driver'].get('rules'))
+                self.parse_results(sarif['results'], jobs, rules, pool)
         if 'rules' in sarif['tool']['driver'] and not runned:
             if sarif['tool']['driver']['rules']:
                 self.parse_rules(sarif['tool']['driver']['rules'])
 
-    def parse_results(self, res: ResultsType) -> None:
+    def parse_stream(self, stream: BinaryIO, jobs: int = 1,
+                     pool: Optional[Executor] = None) -> None:
+        """
+        Same issues as parse, reading the runs one result at a time. The results
+        are converted CHUNK_SIZE at a time, by the pool while the next ones are
+        read when jobs isn't 1.
+        """
+        for issues in chunks.convert_stream(self._stream_chunks(stream), jobs, pool):
+            if issues:
+                self.observer.add_issues(issues.linter_name, issues)
+
+    def _stream_chunks(self, stream: BinaryIO) -> Iterator[tuple[chunks.ChunkConverter, Any]]:
+        """The results of the stream in chunks, and the rules of the runs without results."""
+        pending: list[SarifResult] = []
+        rules = RuleIndex()
+        named = False
+        has_results = False
+        for item in read_runs(stream):
+            if isinstance(item, SarifResult):
+                has_results = True
+                pending.append(item)
+            elif isinstance(item, SarifRule):
+                rules.add(item)
+            elif isinstance(item, DriverName):
+                named = True
+                if item.name:
+                    self.linter_name = item.name
+            else:
+                if pending:
+                    yield self._stream_converter(rules), pending
+                    pending = []
+                if not has_results:
+                    yield partial(_convert_stream_rules, type(self), self.linter_name), list(rules)
+                rules = RuleIndex()
+                named = has_results = False
+            # Results listed before the tool wait for its name and rules
+            if named and len(pending) >= self.CHUNK_SIZE:
+                yield self._stream_converter(rules), pending
+                pending = []
+
+    def _stream_converter(self, rules: RuleIndex) -> chunks.ChunkConverter:
+        return partial(_convert_stream_results, type(self), self.linter_name, rules)
+
+    def get_stream_result_issue(self, result: SarifResult, rules: RuleIndex) -> IssueTupleType:
+        rule = rules.find(result.rule_id, result.rule_index)
+        return (
+            self.parse_level(_resolve(result.level, rule, "level")),
+            result.uri,
+            _resolve(result.rule_id, rule, "rule_id"),
+            _resolve(result.message, rule, "description"),
+            result.start_line,
+        )
+
+    def _is_streamed(self, document: Document) -> bool:
+        return self.STREAMING_THRESHOLD is not None and document.size >= self.STREAMING_THRESHOLD
+
+    def parse_results(self, res: ResultsType, jobs: int = 1,
+                      rules: Optional[RuleIndex] = None,
+                      pool: Optional[Executor] = None) -> None:
+        if jobs == 1:
+            self.observer.add_issues(self.linter_name, self.get_result_issues(res, rules))
+            return
+        converter = partial(_convert_results, type(self), self.linter_name, rules)
+        for issues in chunks.convert(converter, res, self.CHUNK_SIZE, jobs, pool):
+            self.observer.add_issues(self.linter_name, issues)
+
+    def get_result_issues(self, res: ResultsType,
+                          rules: Optional[RuleIndex] = None) -> Iterator[IssueTupleType]:
+        rules = rules or RuleIndex()
         for issue in res:
-            if isinstance(issue['ruleId'], str):
-                issue_id = issue['ruleId']
-            level = self.get_level_from_result(issue)
-            fn_msg_loc = self.parse_issue_in_result(issue)
-            self.observer.add_issue(
-                self.linter_name,
-                (self.parse_level(level), fn_msg_loc[0], issue_id, fn_msg_loc[1], fn_msg_loc[2])
-            )
-
-    def get_level_from_result(self, issue: InsideResultsType) -> str:
-        level = ""
-        try:
-            if isinstance(issue['level'], str):
-                level = issue['level']
-        except KeyError:
-            pass
-        return level
+            rule = rules.find(issue.get('ruleId'), issue.get('ruleIndex'))
+            issue_id = _resolve(issue.get('ruleId'), rule, "rule_id")
+            level = self.get_level_from_result(issue, rule)
+            fn_msg_loc = self.parse_issue_in_result(issue, rule)
+            yield (self.parse_level(level), fn_msg_loc[0], issue_id, fn_msg_loc[1], fn_msg_loc[2])
 
-    def parse_issue_in_result(self, issue: InsideResultsType) -> tuple[str, str, str]:
-        if isinstance(issue['message'], dict):
-            message = issue['message']['text']
+    def get_level_from_result(self, issue: InsideResultsType,
+                              rule: Optional[SarifRule] = None) -> str:
+        return _resolve(issue.get('level'), rule, "level")
+
+    def parse_issue_in_result(self, issue: InsideResultsType,
+                              rule: Optional[SarifRule] = None) -> tuple[str, str, str]:
+        message = _resolve(_get_path(issue, 'message', 'text'), rule, "description")
         res = self.get_location_and_filename(issue)
         location = res[0]
         filename = res[1]
         return (filename, message, location)
 
     def get_location_and_filename(self, issue: InsideResultsType) -> tuple[str, str]:
-        if isinstance(issue['locations'], list):
-            location = issue['locations'][0]['physicalLocation']['region']['startLine']
-            filename = issue['locations'][0]['physicalLocation']['artifactLocation']['uri']
+        # No location gives an empty one, as in a streamed report
+        locations = issue.get('locations')
+        if isinstance(locations, list) and locations:
+            location = locations[0]['physicalLocation']['region']['startLine']
+            filename = locations[0]['physicalLocation']['artifactLocation']['uri']
         else:
             location = ""
             filename = ""
         return (location, filename)
 
     def parse_rules(self, res: RulesType) -> None:
+        self.observer.add_issues(self.linter_name, self.get_rule_issues(res))
+
+    def get_rule_issues(self, res: RulesType) -> Iterator[IssueTupleType]:
         for issue in res:
             if isinstance(issue['fullDescription'], dict):
                 message = issue['fullDescription']['text']
             issue_loc = self.get_issueid_and_location(issue)
             level = self.get_level(issue)
-            self.observer.add_issue(
-                self.linter_name,
-                (self.parse_level(level), issue_loc[0], issue_loc[0], message, issue_loc[1])
-            )
+            yield (self.parse_level(level), issue_loc[0], issue_loc[0], message, issue_loc[1])
 
     def get_issueid_and_location(self, issue: IssuesType) -> tuple[str, str]:
         issue_id = ""
@@ -120,4 +253,103 @@ class SarifHandler(ParserHandlerImplementation):
                 return Severity.UNDEFINED
 
 
+def _is_readable_sarif(sarif: Any) -> bool:
+    """
+    Checks only what parse reads: the tool name of every run, and the results
+    or, for a run without results, the rules. It stands for the SARIF schema
+    unless the validation is strict.
+    """
+    runs = sarif.get("runs") if isinstance(sarif, dict) else None
+    return isinstance(runs, list) and bool(runs) and all(_is_readable_run(run) for run in runs)
+
+
+def _is_readable_run(run: Any) -> bool:
+    driver = _get_path(run, "tool", "driver")
+    if not isinstance(driver, dict) or not isinstance(driver.get("name"), str):
+        return False
+    results = run.get("results")
+    if results:
+        index = RuleIndex.from_rules(driver.get("rules"))
+        return isinstance(results, list) and all(
+            _is_readable_result(result, index) for result in results
+        )
+    rules = driver.get("rules")
+    return not rules or isinstance(rules, list) and all(_is_readable_rule(rule) for rule in rules)
+
+
+def _is_readable_result(result: Any, rules: RuleIndex) -> bool:
+    if not isinstance(result, dict):
+        return False
+    # The rule id and message may come from the rule of the result
+    rule = rules.find(result.get("ruleId"), result.get("ruleIndex"))
+    if rule is None and not (isinstance(result.get("ruleId"), str)
+                             and isinstance(_get_path(result, "message", "text"), str)):
+        return False
+    locations = result.get("locations")
+    if not isinstance(locations, list) or not locations:
+        return True
+    return all(
+        _get_path(locations[0], "physicalLocation", *path) is not None
+        for path in (("region", "startLine"), ("artifactLocation", "uri"))
+    )
+
+
+def _is_readable_rule(rule: Any) -> bool:
+    return (
+        isinstance(rule, dict) and "id" in rule and "name" in rule
+        and _get_path(rule, "fullDescription", "text") is not None
+    )
+
+
+def _get_path(tree: Any, *keys: str) -> Any:
+    for key in keys:
+        if not isinstance(tree, dict):
+            return None
+        tree = tree.get(key)
+    return tree
+
+
+def _resolve(value: Any, rule: Optional[SarifRule], field: str) -> str:
+    """The value given by the result, else the one of its rule."""
+    if isinstance(value, str):
+        return value
+    fallback = getattr(rule, field, "")
+    return fallback if isinstance(fallback, str) else ""
+
+
+def _as_rule(rule: Any) -> SarifRule:
+    if not isinstance(rule, dict):
+        # Kept in the index so the ruleIndex of the next rules stays right
+        return SarifRule()
+    return SarifRule(*(
+        value if isinstance(value, str) else ""
+        for value in (rule.get("id"), rule.get("name"), _get_path(rule, "fullDescription", "text"),
+                      _get_path(rule, "defaultConfiguration", "level"))
+    ))
+
+
+def _convert_results(handler_class: type[SarifHandler], linter_name: str,
+                     rules: Optional[RuleIndex], res: ResultsType) -> IssueBatch:
+    """Runs in the pool workers: the issues of one chunk of results."""
+    return IssueBatch(linter_name, handler_class().get_result_issues(res, rules))
+
+
+def _convert_stream_results(handler_class: type[SarifHandler], linter_name: str,
+                            rules: RuleIndex, results: list[SarifResult]) -> IssueBatch:
+    """The issues of one chunk of streamed results, in the pool workers with jobs."""
+    handler = handler_class()
+    return IssueBatch(linter_name, (handler.get_stream_result_issue(result, rules)
+                                    for result in results))
+
+
+def _convert_stream_rules(handler_class: type[SarifHandler], linter_name: str,
+                          rules: list[SarifRule]) -> IssueBatch:
+    """The issues of a streamed run without results: its rules."""
+    handler = handler_class()
+    return IssueBatch(linter_name, (
+        (handler.parse_level(rule.level), rule.rule_id, rule.rule_id, rule.description, rule.name)
+        for rule in rules
+    ))
+
+
 HANDLER = SarifHandler
@@ -0,0 +1,166 @@
+"""
+Pipelined parse of many reports.
+
+Three stages run at once, connected by bounded queues: a reader thread reads
+the next reports while a parser thread converts the current one to issues,
+and the thread that called the parse sends the issues of the previous batches
+to the observer. A full queue blocks the stage feeding it, so a slow observer
+holds back the parse and a slow parse holds back the reads: at most PREFETCH
+reports and QUEUED_BATCHES batches of BATCH_SIZE issues wait in memory.
+
+The observer is only called from the calling thread: observers like DBObserver
+hold connections (an in-memory SQLite database) that belong to their thread.
+An error in any stage stops the other ones and is raised in the calling thread.
+"""
+from __future__ import annotations
+from itertools import islice
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+import os
+import queue
+import threading
+
+from you_shall_not_parse.base_classes import IssueTupleType
+from you_shall_not_parse.issue_batch import IssueBatch
+from you_shall_not_parse.observer import Observer
+
+# Parses one report into the observer. The content is None for the reports
+# bigger than Pipeline.MAX_READ_SIZE, the parse reads them itself.
+ParseReport = Callable[[str, Optional[bytes], Observer], None]
+
+# How often a stage blocked on a queue checks whether the pipeline stopped
+_POLL_SECONDS = 0.1
+
+
+# Sent by a stage after its last item
+_DONE = object()
+
+
+class _Failed(NamedTuple):
+    error: BaseException
+
+
+class _Stopped(Exception):
+    """The pipeline stopped, the stage returns without finishing its work."""
+
+
+class Pipeline:
+    """Runs the reading, the parse and the observer of many reports at once."""
+    # pylint:disable=too-few-public-methods
+    # Reports read ahead of the parse
+    PREFETCH: int = 2
+    # Batches of issues waiting for the observer
+    QUEUED_BATCHES: int = 8
+    BATCH_SIZE: int = 5000
+    # Bigger reports aren't read ahead, holding them whole in memory costs more
+    # than the parse saves: they are memory-mapped by the parse instead
+    MAX_READ_SIZE: int = 64 * 1024 * 1024
+
+    def __init__(self, parse: ParseReport) -> None:
+        self._parse_report = parse
+        self._stop = threading.Event()
+
+    def run(self, filenames: list[str], observer: Observer) -> None:
+        """Parse the reports, their issues reach the observer in the order of the list."""
+        self._stop.clear()
+        reports: queue.Queue[Any] = queue.Queue(self.PREFETCH)
+        batches: queue.Queue[Any] = queue.Queue(self.QUEUED_BATCHES)
+        stages = [
+            threading.Thread(target=self._stage, args=(self._read, filenames, reports),
+                             name="ysnp-reader", daemon=True),
+            threading.Thread(target=self._stage, args=(self._parse, reports, batches),
+                             name="ysnp-parser", daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+        try:
+            while (item := self._get(batches)) is not _DONE:
+                if isinstance(item, _Failed):
+                    raise item.error
+                observer.add_issues(item.linter_name, item)
+        finally:
+            self._stop.set()
+            for stage in stages:
+                stage.join()
+
+    def _stage(self, work: Callable[[Any, queue.Queue[Any]], None], source: Any,
+               output: queue.Queue[Any]) -> None:
+        try:
+            work(source, output)
+            self._put(output, _DONE)
+        except _Stopped:
+            pass
+        except BaseException as error: # pylint:disable=broad-exception-caught
+            # Raised again in the calling thread
+            try:
+                self._put(output, _Failed(error))
+            except _Stopped:
+                pass
+
+    def _read(self, filenames: list[str], reports: queue.Queue[Any]) -> None:
+        for filename in filenames:
+            with open(filename, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                content = file.read() if size <= self.MAX_READ_SIZE else None
+            self._put(reports, (filename, content))
+
+    def _parse(self, reports: queue.Queue[Any], batches: queue.Queue[Any]) -> None:
+        observer = _QueueObserver(lambda batch: self._put(batches, batch), self.BATCH_SIZE)
+        while (item := self._get(reports)) is not _DONE:
+            if isinstance(item, _Failed):
+                raise item.error
+            filename, content = item
+            self._parse_report(filename, content, observer)
+            observer.flush()
+
+    def _put(self, output: queue.Queue[Any], item: Any) -> None:
+        while True:
+            try:
+                output.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    raise _Stopped() from None
+
+    def _get(self, source: queue.Queue[Any]) -> Any:
+        while True:
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise _Stopped() from None
+
+
+class _QueueObserver(Observer):
+    """Groups the issues of the parser thread in batches of at most size issues."""
+    def __init__(self, put: Callable[[IssueBatch], None], size: int) -> None:
+        self._put = put
+        self._size = size
+        self._batch: Optional[IssueBatch] = None
+
+    def add_issue(self, linter_name: str, issue: IssueTupleType) -> None:
+        batch = self._pending(linter_name)
+        batch.append(issue)
+        if len(batch) >= self._size:
+            self.flush()
+
+    def add_issues(self, linter_name: str, issues: Iterable[IssueTupleType]) -> None:
+        remaining = iter(issues)
+        while True:
+            batch = self._pending(linter_name)
+            batch.extend(islice(remaining, self._size - len(batch)))
+            if len(batch) < self._size:
+                return
+            self.flush()
+
+    def _pending(self, linter_name: str) -> IssueBatch:
+        if self._batch is not None and self._batch.linter_name != linter_name:
+            self.flush()
+        if self._batch is None:
+            self._batch = IssueBatch(linter_name)
+        return self._batch
+
+    def flush(self) -> None:
+        """Send the pending batch, even empty: the observer still sees the linter."""
+        if self._batch is not None:
+            self._put(self._batch)
+            self._batch = None
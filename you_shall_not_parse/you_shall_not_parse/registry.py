@@ -0,0 +1,102 @@
+"""
+The handlers the parser knows about.
+
+Each handler is declared with the signature of its reports, so a report can be
+routed before any handler module (and jmespath, lxml or jsonschema behind them)
+is imported. A handler is imported and instantiated the first time a report
+needs it, and then kept for the rest of the process.
+
+Other packages add handlers through the "you_shall_not_parse.handlers" entry
+point group. An entry point names a HandlerSpec, which should live in a module
+light enough to be imported by every run: the module of the handler itself is
+only imported when a report matches its signature (or the chain is walked).
+"""
+from __future__ import annotations
+from functools import cache
+from importlib.metadata import entry_points
+from typing import NamedTuple, Optional, TYPE_CHECKING
+import importlib
+
+from you_shall_not_parse.sniffer import Signature, JSON, XML, CSV
+
+if TYPE_CHECKING:
+    from you_shall_not_parse.handler_classes import ParserHandler
+
+_PARSERS = f"{__package__}.parsers"
+ENTRY_POINT_GROUP = "you_shall_not_parse.handlers"
+
+
+class HandlerSpec(NamedTuple):
+    """
+    name: short name of the report format.
+    module: module defining the handler class in its HANDLER variable.
+    signature: how the reports of the handler start, used to route them.
+    version: changed when the handler gives other issues for the same reports,
+    so the issues cached by an older handler aren't replayed.
+    """
+    name: str
+    module: str
+    signature: Optional[Signature] = None
+    version: str = ""
+
+    def load(self) -> ParserHandler:
+        """The handler instance of this process, importing its module the first time."""
+        return _load_handler(self.module)
+
+
+# In the order of the chain, which is walked when the signatures don't tell
+HANDLERS: tuple[HandlerSpec, ...] = (
+    HandlerSpec("radon", f"{_PARSERS}.radon", Signature(JSON, root=("object",))),
+    HandlerSpec("golangci", f"{_PARSERS}.golangci",
+                Signature(JSON, keys=("Issues",), key_type="array")),
+    HandlerSpec("mypy", f"{_PARSERS}.mypy",
+                Signature(XML, root=("testsuites", "testsuite"), extensions=(".xml",))),
+    HandlerSpec("pip-audit", f"{_PARSERS}.pip_audit",
+                Signature(JSON, keys=("dependencies",), key_type="array")),
+    HandlerSpec("pylint", f"{_PARSERS}.pylint", Signature(JSON, root=("array",))),
+    HandlerSpec("poetry-audit", f"{_PARSERS}.poetry_audit",
+                Signature(JSON, keys=("vulnerabilities",), key_type="array")),
+    HandlerSpec("lizard", f"{_PARSERS}.lizard", Signature(CSV, columns=11, extensions=(".csv",))),
+    HandlerSpec("npm", f"{_PARSERS}.npm",
+                Signature(JSON, keys=("vulnerabilities",), key_type="object")),
+    HandlerSpec("sarif", f"{_PARSERS}.sarif",
+                Signature(JSON, keys=("runs",), key_type="array", extensions=(".sarif",))),
+)
+
+
+@cache
+def get_specs() -> tuple[HandlerSpec, ...]:
+    """
+    The bundled handlers followed by the ones of the installed plugins. A plugin
+    handler with the name of a bundled one replaces it in its place.
+    """
+    specs = {spec.name: spec for spec in HANDLERS}
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        spec = entry_point.load()
+        if not isinstance(spec, HandlerSpec):
+            raise TypeError(f"Entry point {entry_point.name} of {ENTRY_POINT_GROUP} "
+                            f"must be a HandlerSpec, not {type(spec).__name__}")
+        specs[spec.name] = spec
+    return tuple(specs.values())
+
+
+def get_spec(name: str) -> HandlerSpec:
+    for spec in get_specs():
+        if spec.name == name:
+            return spec
+    raise KeyError(name)
+
+
+@cache
+def get_chain() -> Optional[ParserHandler]:
+    """Every handler linked in a chain, built once per process."""
+    handlers = [spec.load() for spec in get_specs()]
+    for handler, next_handler in zip(handlers, handlers[1:]):
+        handler.set_next(next_handler)
+    return handlers[0] if handlers else None
+
+
+@cache
+def _load_handler(module: str) -> ParserHandler:
+    handler: ParserHandler = importlib.import_module(module).HANDLER()
+    return handler
@@ -0,0 +1,136 @@
+"""
+Incremental reading of SARIF reports.
+
+The report is walked as a stream of JSON events, only the fields SarifHandler
+uses are kept and every other subtree (codeFlows, threadFlows, snippets...) is
+skipped without being built, so memory doesn't grow with the report size.
+"""
+from __future__ import annotations
+from typing import Any, BinaryIO, Iterator, NamedTuple, Optional, Union
+
+# pylint:disable=import-error
+import ijson  # type: ignore
+
+# Raised by read_runs when the report isn't JSON or is cut
+StreamError = ijson.JSONError
+
+_RUN = "runs.item"
+_DRIVER = "runs.item.tool.driver"
+_DRIVER_NAME = "runs.item.tool.driver.name"
+_RESULT = "runs.item.results.item"
+_LOCATIONS = "runs.item.results.item.locations"
+_LOCATION = "runs.item.results.item.locations.item"
+_RULE = "runs.item.tool.driver.rules.item"
+
+_RESULT_FIELDS = {
+    "runs.item.results.item.ruleId": "rule_id",
+    "runs.item.results.item.ruleIndex": "rule_index",
+    "runs.item.results.item.level": "level",
+    "runs.item.results.item.message.text": "message",
+}
+_LOCATION_FIELDS = {
+    "runs.item.results.item.locations.item.physicalLocation.artifactLocation.uri": "uri",
+    "runs.item.results.item.locations.item.physicalLocation.region.startLine": "start_line",
+}
+_RULE_FIELDS = {
+    "runs.item.tool.driver.rules.item.id": "rule_id",
+    "runs.item.tool.driver.rules.item.name": "name",
+    "runs.item.tool.driver.rules.item.fullDescription.text": "description",
+    "runs.item.tool.driver.rules.item.defaultConfiguration.level": "level",
+}
+_SCALARS = {"string", "number", "boolean", "null"}
+# Events under any other prefix belong to subtrees nobody reads
+_WATCHED = {
+    _RUN, _DRIVER, _DRIVER_NAME, _RESULT, _LOCATIONS, _LOCATION, _RULE,
+    *_RESULT_FIELDS, *_LOCATION_FIELDS, *_RULE_FIELDS,
+}
+
+
+class SarifResult(NamedTuple):
+    """A field missing from the result is None, and is resolved with its rule."""
+    rule_id: Optional[str] = None
+    level: Optional[str] = None
+    message: Optional[str] = None
+    uri: str = ""
+    start_line: Any = ""
+    rule_index: Optional[int] = None
+
+
+class SarifRule(NamedTuple):
+    rule_id: str = ""
+    name: str = ""
+    description: str = ""
+    level: str = ""
+
+
+class DriverName(NamedTuple):
+    """Given once the whole driver was read, after all the rules of the run."""
+    name: str
+
+
+class RunEnd(NamedTuple):
+    pass
+
+
+SarifItem = Union[SarifResult, SarifRule, DriverName, RunEnd]
+
+
+def read_runs(stream: BinaryIO) -> Iterator[SarifItem]:
+    """
+    Yield the driver name, rules and results of every run in document order,
+    each run followed by a RunEnd.
+
+    Results keep only the first physical location, as SarifHandler does.
+    Raises StreamError once it reaches the part of the report that isn't JSON.
+    """
+    reader = _RunReader()
+    for prefix, event, value in ijson.parse(stream):
+        if prefix not in _WATCHED:
+            continue
+        if prefix == _RUN:
+            if event == "start_map":
+                reader = _RunReader()
+            elif event == "end_map":
+                yield RunEnd()
+        else:
+            item = reader.feed(prefix, event, value)
+            if item is not None:
+                yield item
+
+
+class _RunReader:
+    # pylint:disable=too-few-public-methods
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self.locations = 0
+        self.driver_name = ""
+
+    def feed(self, prefix: str, event: str, value: Any) -> Optional[SarifItem]:
+        if event in _SCALARS:
+            self._scalar(prefix, value)
+        if event == "start_map":
+            if prefix == _LOCATION:
+                self.locations += 1
+            elif prefix in (_RESULT, _RULE):
+                self.fields = {}
+        elif event == "end_map":
+            if prefix == _RESULT:
+                return SarifResult(**self.fields)
+            if prefix == _RULE:
+                return SarifRule(**self.fields)
+            if prefix == _DRIVER:
+                return DriverName(self.driver_name)
+        elif event == "start_array" and prefix == _LOCATIONS:
+            self.locations = 0
+        return None
+
+    def _scalar(self, prefix: str, value: Any) -> None:
+        if prefix in _RESULT_FIELDS:
+            self.fields[_RESULT_FIELDS[prefix]] = value
+        elif prefix in _LOCATION_FIELDS:
+            if self.locations == 1:
+                self.fields[_LOCATION_FIELDS[prefix]] = value
+        elif prefix in _RULE_FIELDS:
+            self.fields[_RULE_FIELDS[prefix]] = value
+        elif prefix == _DRIVER_NAME:
+            self.driver_name = value
@@ -0,0 +1,140 @@
+"""
+Cheap fingerprinting of linter reports.
+
+Only the first bytes of a report are inspected, so a report can be routed to the
+handler that most likely understands it before any schema validation runs.
+"""
+from __future__ import annotations
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Sequence, TYPE_CHECKING
+import csv
+import os
+import re
+
+from you_shall_not_parse.compression import SUFFIXES as COMPRESSED_SUFFIXES
+
+if TYPE_CHECKING:
+    from you_shall_not_parse.document import Document
+    from you_shall_not_parse.registry import HandlerSpec
+
+SNIFF_SIZE = 4096
+
+JSON = "json"
+XML = "xml"
+CSV = "csv"
+
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"(?:(?=\s*:\s*(.))|)|[{}\[\]]', re.S)
+_XML_ROOT = re.compile(r"<(?![?!])([^\s/>]+)")
+_JSON_TYPES = {"{": "object", "[": "array", '"': "string"}
+_NO_KEYS: Mapping[str, str] = MappingProxyType({})
+
+
+class Signature(NamedTuple):
+    """
+    What a handler expects to see at the start of a report.
+
+    kind: "json", "xml" or "csv".
+    keys: top-level JSON keys, one of them must be present.
+    key_type: JSON type ("object", "array", ...) the matched key must hold.
+    root: JSON root type or XML root tag names.
+    columns: number of CSV columns.
+    extensions: file extensions usually used by the linter.
+    """
+    kind: str
+    keys: tuple[str, ...] = ()
+    key_type: Optional[str] = None
+    root: tuple[str, ...] = ()
+    columns: Optional[int] = None
+    extensions: tuple[str, ...] = ()
+
+
+class Fingerprint(NamedTuple):
+    kind: Optional[str]
+    root: str = ""
+    keys: Mapping[str, str] = _NO_KEYS
+    columns: int = 0
+    extension: str = ""
+
+
+def sniff(content: str, filename: str = "") -> Fingerprint:
+    """Build the fingerprint of a report looking only at its first SNIFF_SIZE characters."""
+    head = content[:SNIFF_SIZE].lstrip("\ufeff \t\r\n")
+    extension = _report_extension(filename)
+    if not head:
+        return Fingerprint(None, extension=extension)
+    if head[0] == "{":
+        return Fingerprint(JSON, "object", _json_keys(head), extension=extension)
+    if head[0] == "[":
+        return Fingerprint(JSON, "array", extension=extension)
+    if head[0] == "<":
+        match = _XML_ROOT.search(head)
+        return Fingerprint(XML, match.group(1) if match else "", extension=extension)
+    first_line = head.split("\n", 1)[0]
+    if "," in first_line:
+        return Fingerprint(CSV, columns=len(next(csv.reader([first_line]))), extension=extension)
+    return Fingerprint(None, extension=extension)
+
+
+def sniff_document(document: Document) -> Fingerprint:
+    return sniff(document.head(SNIFF_SIZE), document.filename)
+
+
+def match_score(signature: Signature, fingerprint: Fingerprint) -> int:
+    """How well a fingerprint matches a signature, 0 means it does not match at all."""
+    if signature.kind != fingerprint.kind:
+        return 0
+    score = 0
+    if signature.keys:
+        if not any(_has_key(fingerprint, key, signature.key_type) for key in signature.keys):
+            return 0
+        score += 4
+    if signature.root:
+        if fingerprint.root not in signature.root:
+            return 0
+        score += 2
+    if signature.columns is not None:
+        if fingerprint.columns != signature.columns:
+            return 0
+        score += 2
+    if fingerprint.extension and fingerprint.extension in signature.extensions:
+        score += 1
+    return score
+
+
+def likely_handlers(specs: Sequence[HandlerSpec],
+                    fingerprint: Fingerprint) -> list[HandlerSpec]:
+    """The handlers whose signature best matches the fingerprint, in chain order."""
+    scores = [
+        match_score(spec.signature, fingerprint) if spec.signature else 0
+        for spec in specs
+    ]
+    best = max(scores, default=0)
+    if best == 0:
+        return []
+    return [spec for spec, score in zip(specs, scores) if score == best]
+
+
+def _report_extension(filename: str) -> str:
+    # report.sarif.gz is a SARIF report
+    root, extension = os.path.splitext(filename.lower())
+    if extension in COMPRESSED_SUFFIXES:
+        extension = os.path.splitext(root)[1]
+    return extension
+
+
+def _has_key(fingerprint: Fingerprint, key: str, key_type: Optional[str]) -> bool:
+    return key in fingerprint.keys and key_type in (None, fingerprint.keys[key])
+
+
+def _json_keys(head: str) -> dict[str, str]:
+    keys: dict[str, str] = {}
+    depth = 0
+    for token in _JSON_TOKEN.finditer(head):
+        text = token.group(0)
+        if text in "{[":
+            depth += 1
+        elif text in "}]":
+            depth -= 1
+        elif depth == 1 and token.group(1):
+            keys[text[1:-1]] = _JSON_TYPES.get(token.group(1), "scalar")
+    return keys